@@ -0,0 +1,271 @@
+import asyncio
+import random
+import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+
+import httpx
+from openai import (APIConnectionError, APITimeoutError, AsyncAzureOpenAI, InternalServerError, NotFoundError,
+                    RateLimitError)
+
+from client_config import add_connection_arguments, load_client_config
+
+# ====== ENGINE NOTES ======
+# Shared async engine for the non-interactive ingestion tools. One AsyncAzureOpenAI
+# client with a connection pool sized to the concurrency limit is shared by every
+# request; the engine bounds in-flight calls globally, spaces requests to a
+# maximum rate, retries rate limits and transient errors with backoff, and
+# reports progress and throughput.
+#
+# Configuration comes from flags or the environment variables of client_config.py.
+# ==========================
+
+DEFAULT_MAX_CONCURRENCY = 32            # In-flight API calls across the whole process
+DEFAULT_MAX_REQUESTS_PER_SECOND = 50    # 0 disables request spacing
+DEFAULT_MAX_RETRIES = 5
+RETRY_BASE_DELAY = 1.0                  # Seconds, doubled on every retry
+RETRY_MAX_DELAY = 60.0
+REQUEST_TIMEOUT = 600.0                 # Large uploads can take a while
+PROGRESS_INTERVAL = 5.0                 # Seconds between progress lines
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+def create_client(config: dict, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> AsyncAzureOpenAI:
+    """
+    Create the shared async client with a connection pool sized for the concurrency limit.
+    Retries are handled by the engine, so the client's own retries are disabled.
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        timeout=REQUEST_TIMEOUT
+    )
+    return AsyncAzureOpenAI(
+        api_key=config['api_key'],
+        api_version=config['api_version'],
+        azure_endpoint=config['azure_endpoint'],
+        max_retries=0,
+        http_client=http_client
+    )
+
+
+def get_retry_delay(error: Exception, attempt: int) -> float:
+    """
+    Use the service's retry-after header if present, otherwise exponential backoff with jitter.
+    """
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(RETRY_BASE_DELAY * (2.0 ** attempt), RETRY_MAX_DELAY) * random.uniform(0.5, 1.0)
+
+
+class Progress:
+    """
+    Counts finished items and bytes and prints throughput at most every PROGRESS_INTERVAL seconds.
+    """
+
+    def __init__(self, label: str, total: Optional[int] = None, interval: float = PROGRESS_INTERVAL):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.completed = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start_time = time.monotonic()
+        self.last_report = self.start_time
+
+    def advance(self, count: int = 1, bytes_done: int = 0, failed: bool = False):
+        if failed:
+            self.failed += count
+        else:
+            self.completed += count
+        self.bytes += bytes_done
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report()
+
+    def report(self):
+        summary = self.summary()
+        total = f"/{self.total}" if self.total is not None else ""
+        line = (f"  🔄 {self.label}: {summary['completed']}{total} done, {summary['failed']} failed, "
+                f"{summary['items_per_second']:.1f}/s")
+        if self.bytes:
+            line += f", {summary['bytes_per_second'] / (1024 * 1024):.2f} MB/s"
+        print(line, file=sys.stderr)
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self.start_time
+        processed = self.completed + self.failed
+        return {
+            'completed': self.completed,
+            'failed': self.failed,
+            'bytes': self.bytes,
+            'elapsed_seconds': elapsed,
+            'items_per_second': processed / elapsed if elapsed > 0 else 0.0,
+            'bytes_per_second': self.bytes / elapsed if elapsed > 0 else 0.0
+        }
+
+
+class AsyncEngine:
+    """
+    Shared client, global concurrency limit, request pacing, retries and pagination.
+    Pass client= to run against any object with the AsyncAzureOpenAI surface, such as a local stand-in.
+    Otherwise config= holds the connection settings; other keys, like an interactive script's options, are ignored.
+    """
+
+    def __init__(self, client: Any = None, config: Optional[dict] = None,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 max_requests_per_second: float = DEFAULT_MAX_REQUESTS_PER_SECOND,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        self.owns_client = client is None
+        if client is None:
+            config = config or {}
+            client = create_client(load_client_config(config.get('api_key'), config.get('azure_endpoint'),
+                                                      config.get('api_version')), max_concurrency)
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.request_interval = 1.0 / max_requests_per_second if max_requests_per_second else 0.0
+        self.next_request_slot = 0.0
+        self.retry_count = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self.owns_client:
+            await self.client.close()
+
+    async def _pace(self):
+        """
+        Space requests evenly; a rate-limit response pushes every later request back.
+        """
+        if not self.request_interval:
+            return
+        now = time.monotonic()
+        slot = max(self.next_request_slot, now)
+        self.next_request_slot = slot + self.request_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def call(self, method: Callable[..., Awaitable], *args, **kwargs):
+        """
+        Call an async client method under the concurrency limit, retrying rate limits and transient errors.
+        NotFoundError and other client errors are raised immediately.
+        """
+        for attempt in range(self.max_retries + 1):
+            async with self.semaphore:
+                await self._pace()
+                try:
+                    return await method(*args, **kwargs)
+                except NotFoundError:
+                    raise
+                except RETRYABLE_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = get_retry_delay(e, attempt)
+                    self.retry_count += 1
+                    if isinstance(e, RateLimitError) and self.request_interval:
+                        # Pacing pushes every later request back, this one included
+                        self.next_request_slot = max(self.next_request_slot, time.monotonic() + delay)
+                        continue
+            # Sleep outside the semaphore so a backing-off call doesn't hold a slot
+            await asyncio.sleep(delay)
+
+    async def paginate(self, method: Callable[..., Awaitable], page_size: int, **kwargs) -> AsyncIterator:
+        """
+        Yield every item of a cursor-paginated list endpoint, following 'after' until has_more is false.
+        """
+        after = None
+        while True:
+            if after:
+                response = await self.call(method, limit=page_size, after=after, **kwargs)
+            else:
+                response = await self.call(method, limit=page_size, **kwargs)
+
+            for item in response.data:
+                yield item
+
+            if not response.has_more or not response.data:
+                break
+            after = response.data[-1].id
+
+    async def map(self, func: Callable[[Any], Awaitable], items: Iterable,
+                  progress: Optional[Progress] = None, max_in_flight: Optional[int] = None) -> List:
+        """
+        Run func over items with a bounded number of tasks alive at a time, preserving order.
+        items may be a lazy iterable; it is consumed only as fast as tasks finish.
+        Exceptions are returned in place of results instead of being raised.
+        """
+        max_in_flight = max_in_flight or self.max_concurrency * 2
+        results = {}
+        pending: set = set()
+        index = 0
+
+        async def run(position, item):
+            try:
+                results[position] = await func(item)
+                if progress:
+                    progress.advance()
+            except Exception as e:
+                results[position] = e
+                if progress:
+                    progress.advance(failed=True)
+
+        for item in items:
+            if len(pending) >= max_in_flight:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.add(asyncio.create_task(run(index, item)))
+            index += 1
+        if pending:
+            await asyncio.wait(pending)
+        return [results[position] for position in range(index)]
+
+
+def add_engine_arguments(parser):
+    """
+    Add the connection and concurrency flags shared by every CLI.
+    """
+    add_connection_arguments(parser)
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f"In-flight API calls (default: {DEFAULT_MAX_CONCURRENCY})")
+    parser.add_argument("--max-requests-per-second", type=float, default=DEFAULT_MAX_REQUESTS_PER_SECOND,
+                        help=f"Request rate limit, 0 to disable (default: {DEFAULT_MAX_REQUESTS_PER_SECOND})")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f"Retries per call (default: {DEFAULT_MAX_RETRIES})")
+
+
+def create_engine(args, client: Any = None) -> AsyncEngine:
+    """
+    Build an engine from parsed CLI flags.
+    """
+    return AsyncEngine(
+        client=client,
+        config=None if client is not None else {
+            'api_key': args.api_key,
+            'azure_endpoint': args.endpoint,
+            'api_version': args.api_version
+        },
+        max_concurrency=args.max_concurrency,
+        max_requests_per_second=args.max_requests_per_second,
+        max_retries=args.max_retries
+    )
+
+
+def run_with_engine(config: dict, operation: Callable[[AsyncEngine], Awaitable], **engine_options):
+    """
+    Run one engine operation from a synchronous interactive script, on an engine built from its configuration.
+    """
+    async def run():
+        async with AsyncEngine(config=config, **engine_options) as engine:
+            return await operation(engine)
+
+    return asyncio.run(run())
@@ -0,0 +1,103 @@
+import os
+import threading
+from contextlib import contextmanager
+
+# ====== BATCH BUILDER NOTES ======
+# Files are discovered lazily with os.scandir, validated before anything is
+# uploaded, and grouped into vector store batches bounded by both file count
+# and total bytes. File handles are only opened while a file is being sent,
+# and never more than MAX_OPEN_FILES at a time.
+# =================================
+
+# File types accepted by the file_search tool
+SUPPORTED_EXTENSIONS = {
+    ".c", ".cpp", ".cs", ".css", ".doc", ".docx", ".go", ".html", ".java", ".js", ".json",
+    ".md", ".pdf", ".php", ".pptx", ".py", ".rb", ".sh", ".tex", ".ts", ".txt"
+}
+MAX_FILE_BYTES = 512 * 1024 * 1024      # Service limit for a single file
+MAX_BATCH_FILES = 250                   # Service limit for a single file batch
+MAX_BATCH_BYTES = 256 * 1024 * 1024     # Keeps each batch's indexing time predictable
+MAX_OPEN_FILES = 16
+
+_open_file_slots = threading.BoundedSemaphore(MAX_OPEN_FILES)
+
+
+def iter_files(directory_path):
+    """
+    Recursively yield (path, size) for every regular file below the directory.
+    Symlinked directories are not followed, so link cycles can't cause endless walks.
+    """
+    pending_directories = [directory_path]
+    while pending_directories:
+        current_directory = pending_directories.pop()
+        try:
+            with os.scandir(current_directory) as entries:
+                for entry in sorted(entries, key=lambda entry: entry.name):
+                    if entry.is_dir(follow_symlinks=False):
+                        pending_directories.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path, entry.stat().st_size
+        except OSError as e:
+            print(f"  ✗ Error reading directory {current_directory}: {e}")
+
+
+def validate_file(path, size):
+    """
+    Check a file against the upload limits before it is sent.
+    Returns None if the file can be uploaded, otherwise the reason it is rejected.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        return f"unsupported file type '{extension or 'none'}'"
+    if size == 0:
+        return "file is empty"
+    if size > MAX_FILE_BYTES:
+        return f"file exceeds {MAX_FILE_BYTES // (1024 * 1024)} MB limit"
+    return None
+
+
+@contextmanager
+def open_file_bounded(path):
+    """
+    Open a file for binary reading, waiting while MAX_OPEN_FILES handles are already open.
+    """
+    with _open_file_slots:
+        with open(path, "rb") as file_stream:
+            yield file_stream
+
+
+class BatchBuilder:
+    """
+    Groups items into batches limited by file count and total bytes.
+    """
+
+    def __init__(self, max_files=MAX_BATCH_FILES, max_bytes=MAX_BATCH_BYTES):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.items = []
+        self.total_bytes = 0
+
+    def add(self, item, size):
+        """
+        Add an item to the current batch.
+        Returns the batches completed by this addition (zero, one or two).
+        """
+        completed = []
+        if self.items and self.total_bytes + size > self.max_bytes:
+            completed.append(self.flush())
+
+        self.items.append(item)
+        self.total_bytes += size
+
+        if len(self.items) >= self.max_files or self.total_bytes >= self.max_bytes:
+            completed.append(self.flush())
+        return completed
+
+    def flush(self):
+        """
+        Return the current batch (possibly empty) and start a new one.
+        """
+        batch = self.items
+        self.items = []
+        self.total_bytes = 0
+        return batch
@@ -0,0 +1,202 @@
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+# The dashboard's modules live in src/ and use flat imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from azure_openai_client import AzureOpenAIClient
+from cassette_transport import MODE_RECORD, MODE_REPLAY, get_cassette
+from constants import (CASSETTE_MODE, CASSETTE_PATH, DEFAULT_CASSETTE_PATH, INITIAL_SUGGESTIONS,
+                       REPLAY_LATENCY_SCALE)
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Mode (record against the service, or replay from a cassette)
+# - Cassette Path
+# - Latency Scale (replay only; 1 = recorded latency, 0 = no upstream latency)
+# - Queries File (optional, one starting query per line; defaults to the initial suggestions)
+# - Turns per Flow and Results File Path
+#
+# Each flow replays what the dashboard does on submit: answer the query
+# (chained with previous_response_id), fetch the next suggestions, then
+# continue with the first suggestion. Run from the repository root so the
+# dashboard's .streamlit/secrets.toml is found; replay never contacts the endpoint.
+# ===================================
+
+DEFAULT_TURNS = 3
+DEFAULT_RESULTS_PATH = "chat_benchmark_results.jsonl"
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_flow(client: AzureOpenAIClient, cassette, query: str, turns: int, timings: Dict[str, List[Dict]]):
+    """
+    Run one conversation the way chat_dashboard.py's on_submit does, timing every call.
+    """
+    previous_response_id = None
+    search_context: Dict[str, Any] = {}
+    for _ in range(turns):
+        for operation in ("response", "suggestions"):
+            replayed_before = cassette.stats()['replayed_seconds']
+            start_time = time.perf_counter()
+            if operation == "response":
+                response = client.get_response_for_query(query, previous_response_id, search_context=search_context)
+            else:
+                suggestions = client.get_suggestions(query, search_context=search_context)
+            elapsed = time.perf_counter() - start_time
+            timings[operation].append({
+                'seconds': elapsed,
+                'upstream_seconds': cassette.stats()['replayed_seconds'] - replayed_before
+            })
+        previous_response_id = response.id
+        query = suggestions.suggestion1
+
+
+def summarize(samples: List[Dict], mode: str) -> Dict:
+    seconds = [sample['seconds'] for sample in samples]
+    summary = {
+        'calls': len(samples),
+        'p50_seconds': statistics.median(seconds),
+        'p95_seconds': percentile(seconds, 0.95),
+        'total_seconds': sum(seconds)
+    }
+    if mode == MODE_REPLAY:
+        # Everything beyond the replayed upstream time is spent in our own code and the SDK
+        overheads = [sample['seconds'] - sample['upstream_seconds'] for sample in samples]
+        summary['overhead_p50_seconds'] = statistics.median(overheads)
+        summary['overhead_p95_seconds'] = percentile(overheads, 0.95)
+    return summary
+
+
+def run_benchmark(mode: str, cassette_path: str, latency_scale: float, queries: List[str], turns: int,
+                  results_path: str) -> Dict:
+    """
+    Run every flow through AzureOpenAIClient with the cassette transport and append the results.
+    """
+    os.environ[CASSETTE_MODE.upper()] = mode
+    os.environ[CASSETTE_PATH.upper()] = cassette_path
+    os.environ[REPLAY_LATENCY_SCALE.upper()] = str(latency_scale)
+
+    client = AzureOpenAIClient()
+    cassette = get_cassette(cassette_path)
+    timings: Dict[str, List[Dict]] = {'response': [], 'suggestions': []}
+    failed_flows = 0
+    start_time = time.perf_counter()
+    for query in queries:
+        try:
+            run_flow(client, cassette, query, turns, timings)
+            print(f"  ✓ {query}")
+        except Exception as e:
+            failed_flows += 1
+            print(f"  ✗ {query}: {e}")
+    elapsed = time.perf_counter() - start_time
+    cassette.save()
+
+    run = {
+        'timestamp': time.time(),
+        'mode': mode,
+        'cassette': os.path.abspath(cassette_path),
+        'latency_scale': latency_scale if mode == MODE_REPLAY else None,
+        'flows': len(queries),
+        'failed_flows': failed_flows,
+        'turns': turns,
+        'elapsed_seconds': elapsed,
+        'operations': {operation: summarize(samples, mode) for operation, samples in timings.items() if samples},
+        'cassette_stats': cassette.stats()
+    }
+    with open(results_path, "a", encoding="utf-8") as results_file:
+        results_file.write(json.dumps(run) + "\n")
+    return run
+
+
+def print_results(run: Dict):
+    print(f"\n{'Operation':<14}{'Calls':>7}{'p50 (ms)':>10}{'p95 (ms)':>10}{'Overhead p50':>14}{'Overhead p95':>14}")
+    for operation, summary in run['operations'].items():
+        overhead_p50 = summary.get('overhead_p50_seconds')
+        overhead_p95 = summary.get('overhead_p95_seconds')
+        print(f"{operation:<14}{summary['calls']:>7}{summary['p50_seconds'] * 1000:>10.1f}"
+              f"{summary['p95_seconds'] * 1000:>10.1f}"
+              f"{f'{overhead_p50 * 1000:.1f} ms' if overhead_p50 is not None else '-':>14}"
+              f"{f'{overhead_p95 * 1000:.1f} ms' if overhead_p95 is not None else '-':>14}")
+    stats = run['cassette_stats']
+    print(f"\nCassette: {stats['interactions']} interactions, {stats['hits']} hits, {stats['misses']} misses")
+    print(f"Flows: {run['flows']} ({run['failed_flows']} failed) in {run['elapsed_seconds']:.2f}s")
+
+
+def get_user_configuration():
+    """
+    Get mode, cassette and flow configuration from user input.
+    """
+    print("🔧 Chat Flow Benchmark Configuration Setup")
+    print("-" * 40)
+
+    print("\n📼 Modes:")
+    print("1. Record flows against the service into a cassette")
+    print("2. Replay flows from a cassette")
+    choice = input("Select option (1 or 2): ").strip()
+    while choice not in ['1', '2']:
+        print("Invalid choice. Please enter 1 or 2.")
+        choice = input("Select option (1 or 2): ").strip()
+    mode = MODE_RECORD if choice == '1' else MODE_REPLAY
+
+    cassette_path = input(f"Enter cassette path (leave empty for '{DEFAULT_CASSETTE_PATH}'): ").strip()
+    cassette_path = cassette_path or DEFAULT_CASSETTE_PATH
+    if mode == MODE_REPLAY:
+        while not os.path.exists(cassette_path):
+            print(f"Cassette '{cassette_path}' does not exist. Record it first.")
+            cassette_path = input("Enter cassette path: ").strip()
+
+    latency_scale = 1.0
+    if mode == MODE_REPLAY:
+        while True:
+            raw_scale = input("Enter latency scale (leave empty for 1 = recorded latency, 0 = none): ").strip()
+            try:
+                latency_scale = float(raw_scale) if raw_scale else 1.0
+                if latency_scale >= 0:
+                    break
+            except ValueError:
+                pass
+            print("Please enter a non-negative number.")
+
+    queries_path = input("Enter queries file (one per line, leave empty for the initial suggestions): ").strip()
+    queries = INITIAL_SUGGESTIONS
+    if queries_path:
+        with open(queries_path, "r", encoding="utf-8") as queries_file:
+            queries = [line.strip() for line in queries_file if line.strip()]
+
+    turns = input(f"Enter turns per flow (leave empty for {DEFAULT_TURNS}): ").strip()
+    results_path = input(f"Enter results file path (leave empty for '{DEFAULT_RESULTS_PATH}'): ").strip()
+
+    return {
+        'mode': mode,
+        'cassette_path': cassette_path,
+        'latency_scale': latency_scale,
+        'queries': queries,
+        'turns': int(turns) if turns.isdigit() and int(turns) > 0 else DEFAULT_TURNS,
+        'results_path': results_path or DEFAULT_RESULTS_PATH
+    }
+
+
+if __name__ == "__main__":
+    print("\n")
+    print("=" * 50)
+    print("📼 Chat Flow Record/Replay Benchmark")
+    print("=" * 50)
+
+    config = get_user_configuration()
+
+    print(f"\n🔄 Running {len(config['queries'])} flow(s) in {config['mode']} mode...")
+    run = run_benchmark(**config)
+    print_results(run)
+    print(f"\nResults appended to: {config['results_path']}")
+    if run['failed_flows']:
+        print(f"\n❌ {run['failed_flows']} flow(s) failed.")
+        exit(1)
+    print(f"\n✅ Benchmark completed!")
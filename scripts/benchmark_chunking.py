@@ -0,0 +1,229 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from chunk_documents import chunk_markdown, tokenize
+from local_vector_store import LocalVectorStore
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Source Directory Path (Markdown files, e.g. the output of clean_html.py)
+# - Chunk Sizes to compare (tokens)
+# - Number of Results per query
+# - Results File Path (optional, JSON)
+#
+# Queries are derived from the section headings of the documents; a query is
+# answered if a retrieved chunk comes from the right document and contains the
+# heading. The breadcrumb comment of a pre-chunked section repeats its headings,
+# so it doesn't count towards a hit. Both strategies are indexed with the same
+# chunk size and overlap; only the pre-chunking differs. Answer latency is
+# modelled from the measured search time and the number of prompt tokens the
+# retrieved chunks add.
+# ===================================
+
+DEFAULT_CHUNK_SIZES = [200, 400, 800, 1600]
+DEFAULT_MAX_NUM_RESULTS = 10
+MAX_QUERIES = 200
+BASE_ANSWER_SECONDS = 2.0           # Model answer generation independent of prompt size
+PREFILL_SECONDS_PER_TOKEN = 0.0002  # Added time-to-first-token per prompt token
+
+
+def load_documents(source_dir: str) -> Dict[str, str]:
+    """
+    Load every Markdown file below source_dir, keyed by relative path.
+    """
+    source_path = Path(source_dir)
+    return {
+        str(markdown_file.relative_to(source_path)): markdown_file.read_text(encoding="utf-8")
+        for markdown_file in sorted(source_path.rglob("*.md"))
+    }
+
+
+def build_queries(documents: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """
+    Derive benchmark queries from section headings.
+
+    Returns:
+        List[Tuple[str, str, str]]: (query, relative path of the expected document, heading text)
+    """
+    queries = []
+    for relative_path, markdown in documents.items():
+        for section in chunk_markdown(markdown, relative_path):
+            if not section['heading_path']:
+                continue
+            heading = section['heading_path'][-1]
+            query = " ".join(section['heading_path'][-2:])
+            queries.append((query, relative_path, heading))
+    # Spread the sample evenly over all documents instead of taking the first ones
+    step = max(len(queries) // MAX_QUERIES, 1)
+    return queries[::step][:MAX_QUERIES]
+
+
+def build_store(documents: Dict[str, str], chunk_size: int,
+                pre_chunked: bool) -> Tuple[LocalVectorStore, Dict, Dict[str, str]]:
+    """
+    Index the documents into a local stand-in store with the service's default 50% overlap.
+    Pre-chunked sections are targeted at chunk_size and go through the same chunk limits.
+    Returns the store, a map of file name -> source document and a map of file name ->
+    breadcrumb as stored in the chunk text (pre-chunked sections only).
+    """
+    store = LocalVectorStore(max_chunk_size_tokens=chunk_size, chunk_overlap_tokens=chunk_size // 2)
+
+    sources = {}
+    breadcrumbs: Dict[str, str] = {}
+    for relative_path, markdown in documents.items():
+        if pre_chunked:
+            for section in chunk_markdown(markdown, relative_path, target_tokens=chunk_size):
+                file_name = f"{relative_path}#{section['id']}"
+                store.add_file(file_name, section['text'])
+                sources[file_name] = relative_path
+                breadcrumbs[file_name] = " ".join(tokenize(section['text'].split("\n", 1)[0])).lower()
+        else:
+            store.add_file(relative_path, markdown)
+            sources[relative_path] = relative_path
+    return store, sources, breadcrumbs
+
+
+def get_scored_text(result: Dict, breadcrumbs: Dict[str, str]) -> str:
+    """
+    Lower-cased chunk text without the section breadcrumb, which would match every heading query.
+    """
+    text: str = result['text'].lower()
+    breadcrumb = breadcrumbs.get(result['file_name'])
+    if breadcrumb and text.startswith(breadcrumb):
+        text = text[len(breadcrumb):]
+    return text
+
+
+def run_configuration(documents: Dict[str, str], queries: List[Tuple[str, str, str]], chunk_size: int,
+                      pre_chunked: bool, max_num_results: int) -> Dict:
+    """
+    Run all queries against one chunking configuration and collect the metrics.
+    """
+    store, sources, breadcrumbs = build_store(documents, chunk_size, pre_chunked)
+    retrieved_tokens = []
+    search_seconds = []
+    hits = 0
+
+    for query, expected_path, heading in queries:
+        start_time = time.perf_counter()
+        results = store.search(query, max_num_results=max_num_results)
+        search_seconds.append(time.perf_counter() - start_time)
+        retrieved_tokens.append(sum(result['tokens'] for result in results))
+
+        # Chunk text is stored token-joined, so normalize the heading the same way
+        heading_text = " ".join(tokenize(heading)).lower()
+        if any(sources[result['file_name']] == expected_path and heading_text in get_scored_text(result, breadcrumbs)
+               for result in results):
+            hits += 1
+
+    query_count = len(queries) or 1
+    average_tokens = sum(retrieved_tokens) / query_count
+    average_search = sum(search_seconds) / query_count
+    return {
+        'strategy': 'sections' if pre_chunked else 'documents',
+        'chunk_size': chunk_size,
+        'chunks': len(store.chunks),
+        'queries': len(queries),
+        'hit_rate': hits / query_count,
+        'average_retrieved_tokens': average_tokens,
+        'average_search_ms': average_search * 1000,
+        'modelled_answer_seconds': average_search + BASE_ANSWER_SECONDS + average_tokens * PREFILL_SECONDS_PER_TOKEN
+    }
+
+
+def run_benchmark(source_dir: str, chunk_sizes: List[int], max_num_results: int = DEFAULT_MAX_NUM_RESULTS) -> List[Dict]:
+    """
+    Compare whole-document and section pre-chunked indexing across chunk sizes.
+
+    Args:
+        source_dir (str): Directory containing Markdown files
+        chunk_sizes (List[int]): Chunk sizes in tokens to compare
+        max_num_results (int): Chunks retrieved per query, like file_search's max_num_results
+
+    Returns:
+        List[Dict]: Metrics per configuration
+    """
+    documents = load_documents(source_dir)
+    queries = build_queries(documents)
+    print(f"Loaded {len(documents)} document(s), derived {len(queries)} queries")
+
+    results = []
+    for chunk_size in chunk_sizes:
+        for pre_chunked in (False, True):
+            result = run_configuration(documents, queries, chunk_size, pre_chunked, max_num_results)
+            results.append(result)
+            print(f"  ✓ {result['strategy']:<9} {chunk_size:>5} tokens: "
+                  f"{result['average_retrieved_tokens']:>8.0f} tokens/query, "
+                  f"hit rate {result['hit_rate']:.0%}, "
+                  f"search {result['average_search_ms']:.2f} ms, "
+                  f"answer ~{result['modelled_answer_seconds']:.2f} s")
+    return results
+
+
+def get_user_configuration():
+    """
+    Get benchmark configuration from user input.
+    """
+    print("📊 Chunking Benchmark Configuration Setup")
+    print("-" * 40)
+
+    # Get source directory
+    source_dir = input("Enter source directory path (containing Markdown files): ").strip()
+    while not source_dir:
+        print("Source directory path is required.")
+        source_dir = input("Enter source directory path (containing Markdown files): ").strip()
+
+    # Get chunk sizes
+    chunk_sizes = None
+    default_sizes = ",".join(str(size) for size in DEFAULT_CHUNK_SIZES)
+    while chunk_sizes is None:
+        raw_sizes = input(f"Enter chunk sizes in tokens, comma separated (leave empty for {default_sizes}): ").strip()
+        try:
+            chunk_sizes = [int(size) for size in raw_sizes.split(",")] if raw_sizes else DEFAULT_CHUNK_SIZES
+        except ValueError:
+            print("Chunk sizes must be numbers.")
+
+    # Get number of results
+    raw_results = input(f"Enter number of results per query (leave empty for {DEFAULT_MAX_NUM_RESULTS}): ").strip()
+    max_num_results = int(raw_results) if raw_results.isdigit() else DEFAULT_MAX_NUM_RESULTS
+
+    # Get results file path
+    results_path = input("Enter results file path (leave empty to skip saving): ").strip()
+
+    return {
+        'source_dir': source_dir,
+        'chunk_sizes': chunk_sizes,
+        'max_num_results': max_num_results,
+        'results_path': results_path
+    }
+
+
+def main():
+    """Main function to handle user input and execute the benchmark."""
+    print("\n")
+    print("=" * 50)
+    print("📊 Offline Chunking Benchmark")
+    print("=" * 50)
+
+    config = get_user_configuration()
+
+    if not os.path.exists(config['source_dir']):
+        print(f"❌ Source directory '{config['source_dir']}' does not exist.")
+        return
+
+    print(f"\n🔄 Running benchmark...")
+    results = run_benchmark(config['source_dir'], config['chunk_sizes'], config['max_num_results'])
+
+    if config['results_path']:
+        with open(config['results_path'], "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+        print(f"\nResults written to: {config['results_path']}")
+
+    print(f"\n✅ Benchmark completed!")
+
+
+if __name__ == "__main__":
+    main()
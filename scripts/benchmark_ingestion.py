@@ -0,0 +1,358 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bulk_upload_to_vector_store import upload_files_to_vector_store
+from extract_and_rename_html import find_html_files, sync_and_rename_files
+from async_engine import AsyncEngine
+from local_api import AsyncLocalAzureOpenAI, LatencyModel, LocalAPIState, LocalAzureOpenAI
+from upload_verification import verify_vector_store
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Number of Files and Directory Depth of the synthetic corpus
+# - Average File Size (KB)
+# - Injected API Latency (ms per call)
+# - Results File Path (JSON lines; every run is appended for later comparison)
+#
+# The corpus is generated in a temporary directory and run through
+# extract -> upload -> verify against the
+# in-process API stand-in from local_api.py. Nothing talks to Azure.
+# ===================================
+
+DEFAULT_FILE_COUNT = 2000
+DEFAULT_DEPTH = 3
+DEFAULT_AVERAGE_KB = 16
+DEFAULT_LATENCY_MS = 20
+DEFAULT_RESULTS_PATH = "benchmark_results.jsonl"
+MIN_POLL_INTERVAL = 0.001       # Batch status poll interval when no latency is injected
+DUPLICATE_RATIO = 0.05          # Share of pages that are exact copies of another page
+SAMPLE_INTERVAL = 0.01          # Seconds between memory/fd samples
+
+_WORDS = ("printer label media ribbon driver firmware network wireless calibrate sensor thermal "
+          "transfer direct darkness speed print head cleaning roll barcode configuration status "
+          "error alert power cable usb ethernet bluetooth settings menu display button").split()
+
+
+def generate_page(rng: random.Random, title: str, target_bytes: int) -> str:
+    """
+    Generate an HTML page with navigation chrome, headings, paragraphs and a table.
+    """
+    parts = [
+        "<html><head><title>", title, "</title><style>body{font-family:sans-serif}</style></head><body>",
+        "<nav class='navbar'><ul><li><a href='/'>Home</a></li><li><a href='/support'>Support</a></li></ul></nav>",
+        "<main><h1>", title, "</h1>"
+    ]
+    size = sum(len(part) for part in parts)
+    section = 0
+    while size < target_bytes:
+        section += 1
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 120)))
+        chunk = f"<h2>Section {section}</h2><p>{words}.</p>"
+        if section % 4 == 0:
+            chunk += ("<table><tr><th>Setting</th><th>Value</th></tr>"
+                      f"<tr><td>{rng.choice(_WORDS)}</td><td>{rng.randint(1, 30)}</td></tr></table>")
+        parts.append(chunk)
+        size += len(chunk)
+    parts.append("</main><footer>© Example</footer></body></html>")
+    return "".join(parts)
+
+
+def generate_corpus(root: str, file_count: int, depth: int, average_kb: int, seed: int = 42) -> Dict:
+    """
+    Write a synthetic HTML corpus of file_count pages nested depth directories deep.
+    Every leaf page is an index.html, like the downloaded documentation the extract step expects.
+
+    Returns:
+        dict: File count and total bytes written
+    """
+    rng = random.Random(seed)
+    total_bytes = 0
+    pages: List[str] = []
+    for number in range(file_count):
+        segments = [f"section-{rng.randint(0, 9)}" for _ in range(max(depth - 1, 0))]
+        page_dir = Path(root, *segments, f"page-{number:06d}")
+        page_dir.mkdir(parents=True, exist_ok=True)
+
+        if pages and rng.random() < DUPLICATE_RATIO:
+            html = rng.choice(pages)
+        else:
+            target = max(int(rng.gauss(average_kb, average_kb / 4) * 1024), 512)
+            html = generate_page(rng, f"Page {number}", target)
+            if len(pages) < 100:
+                pages.append(html)
+        (page_dir / "index.html").write_text(html, encoding="utf-8")
+        total_bytes += len(html)
+    return {'file_count': file_count, 'total_bytes': total_bytes}
+
+
+def count_open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def current_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StageMeter:
+    """
+    Measures wall time, peak RSS and peak open file descriptors of a stage by sampling
+    from a background thread. Falls back to the process's max RSS where /proc is unavailable.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.peak_rss = 0
+        self.peak_fds = 0
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while True:
+            rss = current_rss_bytes()
+            fds = count_open_fds()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+            if fds is not None:
+                self.peak_fds = max(self.peak_fds, fds)
+            if self._stop.wait(SAMPLE_INTERVAL):
+                break
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self._start
+        self._stop.set()
+        self._thread.join()
+        if not self.peak_rss:
+            self.peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def result(self, files: int, total_bytes: int, **extra) -> Dict:
+        return {
+            'stage': self.name,
+            'seconds': self.elapsed,
+            'files': files,
+            'bytes': total_bytes,
+            'files_per_second': files / self.elapsed if self.elapsed > 0 else 0.0,
+            'bytes_per_second': total_bytes / self.elapsed if self.elapsed > 0 else 0.0,
+            'peak_rss_mb': self.peak_rss / (1024 * 1024),
+            'peak_open_fds': self.peak_fds or None,
+            **extra
+        }
+
+
+def directory_bytes(directory: str) -> int:
+    return sum(entry.stat().st_size for entry in Path(directory).rglob("*") if entry.is_file())
+
+
+async def verify_in_process(state: LocalAPIState, vector_store_id: str, directory: str) -> Dict:
+    """
+    Run the verifier's engine path against the stand-in's state.
+    """
+    async with AsyncEngine(client=AsyncLocalAzureOpenAI(state)) as engine:
+        report: Dict = await verify_vector_store(engine, vector_store_id, directory)
+    return report
+
+
+def run_stages(work_dir: str, latency: LatencyModel) -> List[Dict]:
+    """
+    Run extract, upload and verification on the corpus in work_dir/source.
+    The scripts' own progress output is suppressed so it doesn't skew the timings.
+    """
+    source_dir = os.path.join(work_dir, "source")
+    extract_dir = os.path.join(work_dir, "extracted")
+    stages = []
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    with StageMeter("extract") as meter, quiet:
+        html_files = find_html_files(source_dir)
+        extract_result = sync_and_rename_files(html_files, extract_dir)
+    extracted_files = len(os.listdir(extract_dir))
+    stages.append(meter.result(len(html_files), directory_bytes(source_dir),
+                               deduplicated=extract_result.get('deduplicated_count')))
+    extracted_bytes = directory_bytes(extract_dir)
+
+    state = LocalAPIState(latency=latency)
+    client = LocalAzureOpenAI(state)
+    # The uploader's first poll waits POLL_INITIAL_INTERVAL, sized for the real service; against the
+    # stand-in that fixed wait would dominate the stage, so it scales with the injected latency instead
+    poll_interval = max(latency.request_latency, MIN_POLL_INTERVAL)
+    with StageMeter("upload") as meter, contextlib.redirect_stdout(io.StringIO()):
+        upload_result = upload_files_to_vector_store(client, extract_dir, vector_store_name="benchmark-sync",
+                                                     poll_interval=poll_interval)
+    stages.append(meter.result(extracted_files, extracted_bytes, failed=upload_result['failed_uploads'],
+                               api_calls=sum(state.call_counts.values()),
+                               upload_seconds=upload_result.get('upload_elapsed_seconds', 0.0),
+                               index_seconds=upload_result.get('elapsed_seconds', 0.0)
+                               - upload_result.get('upload_elapsed_seconds', 0.0)))
+    vector_store_id = upload_result['vector_store'].id if upload_result['vector_store'] else None
+
+    if vector_store_id:
+        calls_before = sum(state.call_counts.values())
+        with StageMeter("verify") as meter, contextlib.redirect_stdout(io.StringIO()), \
+                contextlib.redirect_stderr(io.StringIO()):
+            report = asyncio.run(verify_in_process(state, vector_store_id, extract_dir))
+        stages.append(meter.result(report['entry_count'], 0, missing=len(report['missing']),
+                                   api_calls=sum(state.call_counts.values()) - calls_before))
+    return stages
+
+
+def get_git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous_run(results_path: str, parameters: Dict) -> Optional[Dict]:
+    """
+    Find the most recent stored run with the same parameters.
+    """
+    previous = None
+    if not os.path.exists(results_path):
+        return None
+    with open(results_path, "r", encoding="utf-8") as results_file:
+        for line in results_file:
+            try:
+                run = json.loads(line)
+            except ValueError:
+                continue
+            if run.get('parameters') == parameters:
+                previous = run
+    return previous
+
+
+def print_results(run: Dict, previous: Optional[Dict]):
+    """
+    Print the stage table, with the change in files/s against the previous comparable run.
+    """
+    previous_stages = {stage['stage']: stage for stage in previous['stages']} if previous else {}
+    print(f"\n{'Stage':<14}{'Time (s)':>10}{'Files/s':>10}{'MB/s':>9}{'Peak RSS':>11}{'Peak fds':>10}{'vs prev':>10}")
+    for stage in run['stages']:
+        change = ""
+        earlier = previous_stages.get(stage['stage'])
+        if earlier and earlier['files_per_second']:
+            change = f"{(stage['files_per_second'] / earlier['files_per_second'] - 1) * 100:+.0f}%"
+        print(f"{stage['stage']:<14}{stage['seconds']:>10.2f}{stage['files_per_second']:>10.1f}"
+              f"{stage['bytes_per_second'] / (1024 * 1024):>9.2f}{stage['peak_rss_mb']:>9.0f}MB"
+              f"{stage['peak_open_fds'] or '-':>10}{change:>10}")
+    for stage in run['stages']:
+        if 'index_seconds' in stage:
+            print(f"\n{stage['stage']}: {stage['upload_seconds']:.2f}s uploading, "
+                  f"{stage['index_seconds']:.2f}s indexing and tagging")
+    if previous:
+        print(f"\nCompared with run of {time.ctime(previous['timestamp'])} (revision {previous.get('revision')})")
+
+
+def run_benchmark(file_count: int = DEFAULT_FILE_COUNT, depth: int = DEFAULT_DEPTH,
+                  average_kb: int = DEFAULT_AVERAGE_KB, latency_ms: float = DEFAULT_LATENCY_MS,
+                  results_path: str = DEFAULT_RESULTS_PATH) -> Dict:
+    """
+    Generate a corpus, run every stage against the stand-in and append the results to results_path.
+
+    Returns:
+        dict: The stored run with parameters, revision and per-stage metrics
+    """
+    parameters = {'file_count': file_count, 'depth': depth, 'average_kb': average_kb, 'latency_ms': latency_ms}
+    work_dir = tempfile.mkdtemp(prefix="ingestion-benchmark-")
+    try:
+        print(f"Generating {file_count} pages in {work_dir}...")
+        corpus = generate_corpus(os.path.join(work_dir, "source"), file_count, depth, average_kb)
+        print(f"Corpus: {corpus['total_bytes'] / (1024 * 1024):.1f} MB")
+
+        latency = LatencyModel(request_latency=latency_ms / 1000)
+        stages = run_stages(work_dir, latency)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    run = {
+        'timestamp': time.time(),
+        'revision': get_git_revision(),
+        'parameters': parameters,
+        'corpus_bytes': corpus['total_bytes'],
+        'stages': stages
+    }
+    previous = load_previous_run(results_path, parameters)
+    with open(results_path, "a", encoding="utf-8") as results_file:
+        results_file.write(json.dumps(run) + "\n")
+
+    print_results(run, previous)
+    return run
+
+
+def prompt_number(prompt: str, default, cast=int):
+    while True:
+        raw_value = input(f"{prompt} (leave empty for {default}): ").strip()
+        if not raw_value:
+            return default
+        try:
+            value = cast(raw_value)
+            if value >= 0:
+                return value
+        except ValueError:
+            pass
+        print("Please enter a non-negative number.")
+
+
+def get_user_configuration():
+    """
+    Get corpus, latency and results file configuration from user input.
+    """
+    print("⏱️  Ingestion Benchmark Configuration Setup")
+    print("-" * 40)
+
+    file_count = prompt_number("Enter number of files", DEFAULT_FILE_COUNT)
+    depth = prompt_number("Enter directory depth", DEFAULT_DEPTH)
+    average_kb = prompt_number("Enter average file size in KB", DEFAULT_AVERAGE_KB)
+    latency_ms = prompt_number("Enter injected API latency in ms", DEFAULT_LATENCY_MS, float)
+    results_path = input(f"Enter results file path (leave empty for '{DEFAULT_RESULTS_PATH}'): ").strip()
+
+    return {
+        'file_count': file_count,
+        'depth': depth,
+        'average_kb': average_kb,
+        'latency_ms': latency_ms,
+        'results_path': results_path or DEFAULT_RESULTS_PATH
+    }
+
+
+def main():
+    """Main function to handle user input and execute the benchmark."""
+    print("\n")
+    print("=" * 50)
+    print("⏱️  Ingestion Throughput Benchmark")
+    print("=" * 50)
+
+    config = get_user_configuration()
+
+    print(f"\n🔄 Running benchmark...")
+    run_benchmark(**config)
+    print(f"\nResults appended to: {config['results_path']}")
+    print(f"\n✅ Benchmark completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,121 +1,239 @@
-from openai import AzureOpenAI
-import getpass
+import fnmatch
+import json
+import sys
+import time
+from openai import NotFoundError
+
+from async_engine import Progress, run_with_engine
+from client_config import get_connection_configuration
+from upload_verification import FILES_PAGE_SIZE, VECTOR_STORE_FILES_PAGE_SIZE
 
 # ====== CONFIGURATION NOTES ======
 # This script will prompt for:
 # - Azure OpenAI API Key (masked input)
 # - API Version
 # - Azure Endpoint
+# - Filters (purpose, minimum age, filename pattern, vector store membership)
+# - Dry Run (only list what would be deleted)
+# - Result Log Path (JSON lines, one record per file)
 # ===================================
 
+# ====== DELETE TUNING ======
+# Deletes run on the shared engine of async_engine.py, which retries rate limits
+# and transient errors; the interactive flow uses these engine limits.
+MAX_DELETE_WORKERS = 8          # Concurrent delete calls
+MAX_DELETES_PER_SECOND = 20     # Stays below the service's request rate limit
+DEFAULT_RESULT_LOG_PATH = "delete_results.jsonl"
+# ===========================
+
 def get_user_configuration():
     """
     Get Azure OpenAI configuration from user input.
     """
-    print("🔧 Azure OpenAI Configuration Setup")
-    print("-" * 40)
+    connection = get_connection_configuration()
     
-    # Get API Key (masked input)
-    api_key = getpass.getpass("Enter your Azure OpenAI API Key: ")
+    # Get Filters (all empty deletes every file)
+    print("\n🔎 Filters (leave empty to match all files):")
+    purpose = input("Only files with purpose (e.g., assistants): ").strip()
     
-    # Show masked API key for confirmation (show last 5 digits)
-    if len(api_key) >= 5:
-        masked_key = "*" * (len(api_key) - 5) + api_key[-5:]
-    else:
-        masked_key = "*" * len(api_key)
+    older_than_days = None
+    while True:
+        raw_days = input("Only files older than N days: ").strip()
+        if not raw_days:
+            break
+        try:
+            older_than_days = float(raw_days)
+            break
+        except ValueError:
+            print("Age must be a number of days.")
     
-    print(f"API Key entered: {masked_key}")
+    filename_pattern = input("Only files whose name matches pattern (e.g., *.html): ").strip()
+    vector_store_ids = input("Only files attached to vector store IDs (comma separated): ").strip()
+    keep_vector_store_ids = input("Never delete files attached to vector store IDs (comma separated): ").strip()
     
-    # Get Azure Endpoint
-    azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
-    while not azure_endpoint:
-        print("Azure Endpoint is required.")
-        azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
+    # Get Dry Run
+    dry_run = input("Dry run (only list files that would be deleted)? (y/N): ").strip().lower()
     
-    # Get API Version
-    api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
-    while not api_version:
-        print("API Version is required.")
-        api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
+    # Get Result Log Path
+    result_log_path = input(f"Enter result log path (leave empty for '{DEFAULT_RESULT_LOG_PATH}'): ").strip()
     
     return {
-        'api_key': api_key,
-        'api_version': api_version,
-        'azure_endpoint': azure_endpoint
+        **connection,
+        'purpose': purpose or None,
+        'older_than_days': older_than_days,
+        'filename_pattern': filename_pattern or None,
+        'vector_store_ids': [vs_id.strip() for vs_id in vector_store_ids.split(",") if vs_id.strip()],
+        'keep_vector_store_ids': [vs_id.strip() for vs_id in keep_vector_store_ids.split(",") if vs_id.strip()],
+        'dry_run': dry_run in ['y', 'yes'],
+        'result_log_path': result_log_path or DEFAULT_RESULT_LOG_PATH
     }
 
-def initialize_client(config):
+def build_file_filter(older_than_days=None, filename_pattern=None, member_file_ids=None, keep_file_ids=None):
     """
-    Initialize the AzureOpenAI client with the provided configuration.
+    Build a predicate selecting the files to delete.
+    
+    Args:
+        older_than_days (float): Only files created more than this many days ago
+        filename_pattern (str): Only files whose name matches this glob pattern
+        member_file_ids (set): Only files attached to one of the selected vector stores
+        keep_file_ids (set): Never files attached to one of the protected vector stores
     """
-    try:
-        client = AzureOpenAI(
-            api_key=config['api_key'],
-            api_version=config['api_version'],
-            azure_endpoint=config['azure_endpoint']
-        )
-        return client
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {e}")
-        return None
+    cutoff = time.time() - older_than_days * 86400 if older_than_days else None
+    
+    def matches(file):
+        if cutoff is not None and file.created_at > cutoff:
+            return False
+        if filename_pattern and not fnmatch.fnmatch(file.filename, filename_pattern):
+            return False
+        if member_file_ids is not None and file.id not in member_file_ids:
+            return False
+        if keep_file_ids and file.id in keep_file_ids:
+            return False
+        return True
+    
+    return matches
 
-def get_all_files(client):
+async def get_vector_store_file_ids(engine, vector_store_ids):
     """
-    Retrieve all files from the Azure OpenAI service.
+    Collect the IDs of all files attached to the given vector stores.
     """
+    file_ids = set()
+    for vector_store_id in vector_store_ids:
+        async for file in engine.paginate(engine.client.vector_stores.files.list, VECTOR_STORE_FILES_PAGE_SIZE,
+                                          vector_store_id=vector_store_id):
+            file_ids.add(file.id)
+    return file_ids
+
+async def delete_file(engine, file):
+    """
+    Delete one file; the engine retries rate limits and transient errors.
+    A file that is already gone counts as deleted.
+    """
+    result = {'file_id': file.id, 'filename': file.filename, 'status': 'deleted', 'error': None}
     try:
-        response = client.files.list()
-        return response.data
+        await engine.call(engine.client.files.delete, file.id)
+    except NotFoundError:
+        result['status'] = 'not_found'
     except Exception as e:
-        print(f"Error retrieving files: {e}")
-        return []
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    return result
+
+def write_result_log(log_stream, record):
+    """
+    Append one JSON line to the result log.
+    """
+    log_stream.write(json.dumps({**record, 'timestamp': time.time()}) + "\n")
+    log_stream.flush()
 
-def delete_all_files(client):
+async def delete_files(engine, purpose=None, older_than_days=None, filename_pattern=None,
+                       vector_store_ids=None, keep_vector_store_ids=None, dry_run=False,
+                       result_log_path=DEFAULT_RESULT_LOG_PATH):
     """
-    Delete all files from the Azure OpenAI service.
-    Prints the name and ID of each file as it's being deleted.
+    Delete the files from the Azure OpenAI service that match the filters.
+    All pages are listed and filtered first, then the matches are deleted through the engine.
+    Every planned or finished deletion is written as a JSON line to the result log as it happens.
+    Progress goes to stderr, so a report on stdout stays parseable.
     """
-    print("Retrieving all files from Azure OpenAI service...")
-    files = get_all_files(client)
+    client = engine.client
+    print("Retrieving all files from Azure OpenAI service...", file=sys.stderr)
     
-    if not files:
-        print("No files found to delete.")
-        return {
-            'success': True,
-            'deleted_count': 0,
-            'failed_count': 0,
-            'total_files': 0
-        }
+    # Collect the plan before deleting anything, so deletions can't shift the listing cursor
+    member_file_ids = await get_vector_store_file_ids(engine, vector_store_ids) if vector_store_ids else None
+    keep_file_ids = await get_vector_store_file_ids(engine, keep_vector_store_ids) if keep_vector_store_ids else None
+    matches = build_file_filter(older_than_days, filename_pattern, member_file_ids, keep_file_ids)
     
-    print(f"Found {len(files)} files to delete.\n")
+    list_kwargs = {'purpose': purpose} if purpose else {}
+    scanned_count = 0
+    planned_files = []
+    async for file in engine.paginate(client.files.list, FILES_PAGE_SIZE, **list_kwargs):
+        scanned_count += 1
+        if matches(file):
+            planned_files.append(file)
+    print(f"Found {len(planned_files)} of {scanned_count} files to delete.", file=sys.stderr)
     
-    deleted_count = 0
-    failed_count = 0
+    progress = Progress("Deleted", total=len(planned_files))
     
-    for file in files:
-        try:
-            print(f"Deleting file: '{file.filename}' (ID: {file.id})")
-            client.files.delete(file.id)
-            print(f"✓ Successfully deleted: '{file.filename}' (ID: {file.id})")
-            deleted_count += 1
-        except Exception as e:
-            print(f"✗ Failed to delete: '{file.filename}' (ID: {file.id}) - Error: {e}")
-            failed_count += 1
-        print("-" * 50)
-    
-    print(f"\nDeletion Summary:")
-    print(f"Successfully deleted: {deleted_count} files")
-    print(f"Failed to delete: {failed_count} files")
-    print(f"Total files processed: {len(files)}")
+    with open(result_log_path, "a", encoding="utf-8") as log_stream:
+        if dry_run:
+            records = []
+            for file in planned_files:
+                record = {
+                    'file_id': file.id,
+                    'filename': file.filename,
+                    'bytes': getattr(file, 'bytes', None),
+                    'created_at': file.created_at,
+                    'status': 'planned',
+                    'error': None
+                }
+                write_result_log(log_stream, record)
+                records.append(record)
+                print(f"  - Would delete: '{file.filename}' (ID: {file.id})", file=sys.stderr)
+        else:
+            async def delete(file):
+                record = await delete_file(engine, file)
+                write_result_log(log_stream, record)
+                progress.advance(failed=record['status'] == 'failed')
+                if record['status'] == 'failed':
+                    print(f"✗ Failed to delete: '{file.filename}' (ID: {file.id}) - Error: {record['error']}",
+                          file=sys.stderr)
+                return record
+            
+            records = await engine.map(delete, planned_files)
     
+    summary = progress.summary()
+    failed_count = sum(1 for record in records if record['status'] == 'failed')
     return {
         'success': failed_count == 0,
-        'deleted_count': deleted_count,
+        'dry_run': dry_run,
+        'scanned_count': scanned_count,
+        'planned_count': len(planned_files),
+        'deleted_count': 0 if dry_run else len(records) - failed_count,
         'failed_count': failed_count,
-        'total_files': len(files)
+        'retry_count': engine.retry_count,
+        'elapsed_seconds': summary['elapsed_seconds'],
+        'deletes_per_second': 0.0 if dry_run else summary['items_per_second'],
+        'result_log_path': result_log_path
     }
 
+def print_delete_summary(result):
+    """
+    Print the summary of a delete_files run.
+    """
+    print(f"\nDeletion Summary:")
+    print(f"Files scanned: {result['scanned_count']}")
+    if result['dry_run']:
+        print(f"Files that would be deleted: {result['planned_count']}")
+    else:
+        print(f"Successfully deleted: {result['deleted_count']} files")
+        print(f"Failed to delete: {result['failed_count']} files")
+        print(f"Total files processed: {result['deleted_count'] + result['failed_count']}")
+        print(f"Throughput: {result['deletes_per_second']:.1f} deletes/s")
+    print(f"Result log: {result['result_log_path']}")
+
+def describe_filters(config):
+    """
+    Describe the active filters for the confirmation prompt.
+    """
+    filters = []
+    if config['purpose']:
+        filters.append(f"purpose is '{config['purpose']}'")
+    if config['older_than_days']:
+        filters.append(f"older than {config['older_than_days']:g} days")
+    if config['filename_pattern']:
+        filters.append(f"name matches '{config['filename_pattern']}'")
+    if config['vector_store_ids']:
+        filters.append(f"attached to {', '.join(config['vector_store_ids'])}")
+    if config['keep_vector_store_ids']:
+        filters.append(f"not attached to {', '.join(config['keep_vector_store_ids'])}")
+    return filters
+
 if __name__ == "__main__":
+    # With arguments, run unattended through the async engine instead of prompting
+    if len(sys.argv) > 1:
+        from ingest import main as ingest_main
+        exit(ingest_main(["delete", *sys.argv[1:]]))
+    
     print("\n")
     print("=" * 50)
     print("🗑️  Bulk Delete All Data Files from Azure OpenAI")
@@ -124,23 +242,45 @@ if __name__ == "__main__":
     # Get configuration from user
     config = get_user_configuration()
     
-    # Initialize client
-    print("\n🔄 Initializing Azure OpenAI client...")
-    client = initialize_client(config)
-    
-    if not client:
-        print("❌ Failed to initialize client. Please check your configuration.")
-        exit(1)
-    
-    print("✅ Client initialized successfully!")
+    filters = describe_filters(config)
     
     # Show warning and confirm before proceeding
-    print("\n⚠️  WARNING: This will delete ALL data files from your Azure OpenAI service!")
-    print("This action cannot be undone!")
+    if config['dry_run']:
+        print("\n📋 Dry run: matching files will only be listed and written to the result log.")
+    elif filters:
+        print("\n⚠️  WARNING: This will delete every data file that matches:")
+        for description in filters:
+            print(f"  - {description}")
+        print("This action cannot be undone!")
+    else:
+        print("\n⚠️  WARNING: This will delete ALL data files from your Azure OpenAI service!")
+        print("This action cannot be undone!")
     confirmation = input("\nAre you sure you want to proceed? Type 'YES' to confirm: ")
     
     if confirmation == "YES":
-        result = delete_all_files(client)
-        print(f"\n✅ Deletion process completed!")
+        try:
+            result = run_with_engine(
+                config,
+                lambda engine: delete_files(
+                    engine,
+                    purpose=config['purpose'],
+                    older_than_days=config['older_than_days'],
+                    filename_pattern=config['filename_pattern'],
+                    vector_store_ids=config['vector_store_ids'],
+                    keep_vector_store_ids=config['keep_vector_store_ids'],
+                    dry_run=config['dry_run'],
+                    result_log_path=config['result_log_path']
+                ),
+                max_concurrency=MAX_DELETE_WORKERS,
+                max_requests_per_second=MAX_DELETES_PER_SECOND
+            )
+        except Exception as e:
+            print(f"❌ Error retrieving files: {e}")
+            exit(1)
+        print_delete_summary(result)
+        if result['success']:
+            print(f"\n✅ Deletion process completed!")
+        else:
+            print(f"\n❌ Deletion process completed with {result['failed_count']} failure(s).")
     else:
-        print("Operation cancelled.")
\ No newline at end of file
+        print("Operation cancelled.")
@@ -1,6 +1,17 @@
+import itertools
 import os
-from openai import AzureOpenAI
-import getpass
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from openai import NotFoundError
+from client_config import get_connection_configuration, initialize_client
+from batch_builder import (
+    MAX_BATCH_BYTES, MAX_BATCH_FILES, BatchBuilder, iter_files, open_file_bounded, validate_file
+)
+from file_attributes import derive_file_attributes
+from upload_journal import UploadJournal
+from upload_manifest import UploadManifest, hash_files, plan_delta
 
 # ====== CONFIGURATION NOTES ======
 # This script will prompt for:
@@ -8,39 +19,48 @@ import getpass
 # - Azure Endpoint  
 # - API Version
 # - Directory Path
-# - Vector Store Option (Create new or use existing)
-# - Vector Store Name (if creating new) OR Vector Store ID (if using existing)
+# - Vector Store Option (Create new, use existing or sync with existing)
+# - Vector Store Name (if creating new) OR Vector Store ID (if using/syncing existing)
+# - Manifest Path and Dry Run Option (if syncing)
+# - Journal Path (for resuming interrupted uploads)
+# - Static Chunk Size and Overlap (optional, e.g. for pre-chunked sections)
 # ===================================
 
+# ====== UPLOAD TUNING ======
+MAX_UPLOAD_WORKERS = 8          # Files uploaded in parallel
+MAX_CONCURRENT_BATCHES = 4      # File batches indexed (and polled) at the same time
+MAX_TAG_WORKERS = 8             # Attribute updates per batch sent in parallel
+POLL_INITIAL_INTERVAL = 1.0     # Seconds before the first batch status poll
+POLL_MAX_INTERVAL = 30.0        # Upper bound for the polling backoff
+POLL_BACKOFF_FACTOR = 2.0
+DEFAULT_MANIFEST_PATH = "vector_store_manifest.db"
+DEFAULT_JOURNAL_PATH = "upload_journal.jsonl"
+MIN_CHUNK_SIZE_TOKENS = 100
+MAX_CHUNK_SIZE_TOKENS = 4096
+# ===========================
+
+def build_chunking_strategy(max_chunk_size_tokens, chunk_overlap_tokens=0):
+    """
+    Build an explicit static chunking strategy for vector store file batches.
+    The service accepts chunk sizes of 100-4096 tokens and an overlap of at most half the chunk size.
+    """
+    if not MIN_CHUNK_SIZE_TOKENS <= max_chunk_size_tokens <= MAX_CHUNK_SIZE_TOKENS:
+        raise ValueError(f"Chunk size must be between {MIN_CHUNK_SIZE_TOKENS} and {MAX_CHUNK_SIZE_TOKENS} tokens")
+    if not 0 <= chunk_overlap_tokens <= max_chunk_size_tokens // 2:
+        raise ValueError("Chunk overlap must be between 0 and half the chunk size")
+    return {
+        'type': 'static',
+        'static': {
+            'max_chunk_size_tokens': max_chunk_size_tokens,
+            'chunk_overlap_tokens': chunk_overlap_tokens
+        }
+    }
+
 def get_user_configuration():
     """
     Get Azure OpenAI configuration from user input.
     """
-    print("🔧 Azure OpenAI Configuration Setup")
-    print("-" * 40)
-    
-    # Get API Key (masked input)
-    api_key = getpass.getpass("Enter your Azure OpenAI API Key: ")
-    
-    # Show masked API key for confirmation (show last 5 digits)
-    if len(api_key) >= 5:
-        masked_key = "*" * (len(api_key) - 5) + api_key[-5:]
-    else:
-        masked_key = "*" * len(api_key)
-    
-    print(f"API Key entered: {masked_key}")
-    
-    # Get Azure Endpoint
-    azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
-    while not azure_endpoint:
-        print("Azure Endpoint is required.")
-        azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
-    
-    # Get API Version
-    api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
-    while not api_version:
-        print("API Version is required.")
-        api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
+    connection = get_connection_configuration()
     
     # Get Directory Path
     directory_path = input("Enter directory path containing files to upload: ").strip()
@@ -52,11 +72,12 @@ def get_user_configuration():
     print("\n📂 Vector Store Options:")
     print("1. Create a new vector store")
     print("2. Upload to existing vector store")
-    choice = input("Select option (1 or 2): ").strip()
+    print("3. Sync changes to existing vector store (uploads only new or changed files)")
+    choice = input("Select option (1, 2 or 3): ").strip()
     
-    while choice not in ['1', '2']:
-        print("Invalid choice. Please enter 1 or 2.")
-        choice = input("Select option (1 or 2): ").strip()
+    while choice not in ['1', '2', '3']:
+        print("Invalid choice. Please enter 1, 2 or 3.")
+        choice = input("Select option (1, 2 or 3): ").strip()
     
     if choice == '1':
         # Get Vector Store Name for new store
@@ -65,14 +86,13 @@ def get_user_configuration():
             print("Vector store name is required.")
             vector_store_name = input("Enter vector store name: ").strip()
         
-        return {
-            'api_key': api_key,
-            'api_version': api_version,
-            'azure_endpoint': azure_endpoint,
+        config = {
+            **connection,
             'directory_path': directory_path,
             'vector_store_name': vector_store_name,
             'vector_store_id': None,
-            'use_existing': False
+            'use_existing': False,
+            'sync': False
         }
     else:
         # Get Vector Store ID for existing store
@@ -81,76 +101,406 @@ def get_user_configuration():
             print("Vector store ID is required.")
             vector_store_id = input("Enter existing vector store ID: ").strip()
         
-        return {
-            'api_key': api_key,
-            'api_version': api_version,
-            'azure_endpoint': azure_endpoint,
+        config = {
+            **connection,
             'directory_path': directory_path,
             'vector_store_name': None,
             'vector_store_id': vector_store_id,
-            'use_existing': True
+            'use_existing': True,
+            'sync': choice == '3'
         }
+        
+        if config['sync']:
+            manifest_path = input(f"Enter manifest path (leave empty for '{DEFAULT_MANIFEST_PATH}'): ").strip()
+            config['manifest_path'] = manifest_path or DEFAULT_MANIFEST_PATH
+            dry_run = input("Dry run (only show planned changes)? (y/N): ").strip().lower()
+            config['dry_run'] = dry_run in ['y', 'yes']
+    
+    # Get Journal Path (lets an interrupted upload resume where it stopped)
+    journal_path = input(f"Enter journal path for resumable uploads (leave empty for '{DEFAULT_JOURNAL_PATH}'): ").strip()
+    config['journal_path'] = journal_path or DEFAULT_JOURNAL_PATH
+    
+    # Get Chunking Strategy (pre-chunked sections fit in one chunk and should not be split again)
+    config['chunking_strategy'] = None
+    while True:
+        chunk_size = input("Enter static chunk size in tokens (leave empty for the service default): ").strip()
+        if not chunk_size:
+            break
+        chunk_overlap = input("Enter chunk overlap in tokens (leave empty for 0): ").strip() or "0"
+        try:
+            config['chunking_strategy'] = build_chunking_strategy(int(chunk_size), int(chunk_overlap))
+            break
+        except ValueError as e:
+            print(f"Invalid chunking configuration: {e}")
+    
+    return config
 
-def initialize_client(config):
+def get_files_from_directory(directory_path):
     """
-    Initialize the AzureOpenAI client with the provided configuration.
+    Lazily yield (path, size) for every file in the specified directory and its subdirectories.
     """
+    if not os.path.exists(directory_path):
+        print(f"Error: Directory '{directory_path}' does not exist.")
+        return iter(())
+    return iter_files(directory_path)
+
+def upload_file(client, path, vector_store_id=None, journal=None):
+    """
+    Upload a single file to Azure OpenAI file storage.
+    Errors are captured in the returned result instead of being raised, so one bad file
+    never fails the rest of its batch.
+    """
+    result = {
+        'path': path,
+        'filename': os.path.basename(path),
+        'bytes': 0,
+        'file_id': None,
+        'status': 'pending',
+        'error': None,
+        'resumed': False
+    }
     try:
-        client = AzureOpenAI(
-            api_key=config['api_key'],
-            api_version=config['api_version'],
-            azure_endpoint=config['azure_endpoint']
-        )
-        return client
+        file_stat = os.stat(path)
+        result['bytes'] = file_stat.st_size
+        with open_file_bounded(path) as file_stream:
+            uploaded_file = client.files.create(file=file_stream, purpose="assistants")
+        result['file_id'] = uploaded_file.id
+        result['status'] = 'uploaded'
+        if journal:
+            journal.record('uploaded', vector_store_id, path=os.path.abspath(path), file_id=uploaded_file.id,
+                           size=file_stat.st_size, mtime=file_stat.st_mtime)
     except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {e}")
-        return None
+        result['status'] = 'upload_failed'
+        result['error'] = str(e)
+    return result
 
-def get_files_from_directory(directory_path):
+def poll_file_batch(client, vector_store_id, batch_id, stop_event=None, poll_interval=POLL_INITIAL_INTERVAL):
+    """
+    Poll a file batch until it is no longer in progress.
+    The polling interval starts at poll_interval and backs off exponentially so many
+    concurrent batches don't flood the API.
+    Raises InterruptedError if stop_event is set while waiting.
+    """
+    stop_event = stop_event or threading.Event()
+    interval = poll_interval
+    while True:
+        file_batch = client.vector_stores.file_batches.retrieve(batch_id, vector_store_id=vector_store_id)
+        if file_batch.status != "in_progress":
+            return file_batch
+        if stop_event.wait(interval):
+            raise InterruptedError(f"Polling of batch {batch_id} interrupted")
+        interval = min(interval * POLL_BACKOFF_FACTOR, POLL_MAX_INTERVAL)
+
+def get_batch_file_statuses(client, vector_store_id, batch_id):
+    """
+    Get the indexing status of every file in a batch, keyed by file ID.
+    """
+    statuses = {}
+    for vector_store_file in client.vector_stores.file_batches.list_files(
+        batch_id, vector_store_id=vector_store_id, limit=100
+    ):
+        last_error = vector_store_file.last_error.message if vector_store_file.last_error else None
+        statuses[vector_store_file.id] = (vector_store_file.status, last_error)
+    return statuses
+
+def tag_indexed_files(client, vector_store_id, file_results):
+    """
+    Set each indexed file's own attributes (file_result['attributes']) on its vector store entry.
+    A batch can only carry one attribute set, so files are tagged one by one after indexing
+    instead, which keeps batches as large as the limits allow.
+    Returns the number of files that couldn't be tagged; they stay searchable without attributes.
+    """
+    to_tag = [file_result for file_result in file_results
+              if file_result['status'] == 'completed' and file_result.get('attributes')]
+
+    def tag(file_result):
+        try:
+            client.vector_stores.files.update(file_result['file_id'], vector_store_id=vector_store_id,
+                                              attributes=file_result['attributes'])
+            return None
+        except Exception as e:
+            return e
+
+    untagged = 0
+    with ThreadPoolExecutor(max_workers=MAX_TAG_WORKERS) as executor:
+        for file_result, error in zip(to_tag, executor.map(tag, to_tag)):
+            if error:
+                untagged += 1
+                print(f"  ⚠️  Could not tag {file_result['filename']}: {error}")
+    return untagged
+
+def register_and_poll_batch(client, vector_store_id, batch_num, file_results, journal=None, batch_id=None,
+                            stop_event=None, chunking_strategy=None, poll_interval=POLL_INITIAL_INTERVAL):
     """
-    Get all file paths from the specified directory.
+    Register already uploaded files with the vector store as one batch and wait for indexing.
+    If batch_id is given, the batch was registered by an earlier run and is only reconciled;
+    it is registered again if the service no longer knows it.
+    Indexed files are then tagged with their attributes, if they have any.
+    Each entry of file_results is updated in place with its own indexing status.
     """
+    file_ids = [file_result['file_id'] for file_result in file_results]
     try:
-        if not os.path.exists(directory_path):
-            print(f"Error: Directory '{directory_path}' does not exist.")
-            return []
+        file_batch = None
+        if batch_id is not None:
+            print(f"  🔄 Batch {batch_num} resumed ({len(file_ids)} files, ID: {batch_id}), reconciling...")
+            try:
+                file_batch = poll_file_batch(client, vector_store_id, batch_id, stop_event, poll_interval)
+            except NotFoundError:
+                print(f"  ⚠️  Batch {batch_id} no longer exists, registering its files again...")
+        
+        if file_batch is None:
+            create_params = {'vector_store_id': vector_store_id, 'file_ids': file_ids}
+            if chunking_strategy:
+                create_params['chunking_strategy'] = chunking_strategy
+            file_batch = client.vector_stores.file_batches.create(**create_params)
+            if journal:
+                journal.record('attached', vector_store_id, batch_id=file_batch.id, file_ids=file_ids)
+            print(f"  🔄 Batch {batch_num} registered ({len(file_ids)} files, ID: {file_batch.id}), indexing...")
+            file_batch = poll_file_batch(client, vector_store_id, file_batch.id, stop_event, poll_interval)
         
-        file_paths = [
-            os.path.join(directory_path, filename) 
-            for filename in os.listdir(directory_path)
-            if os.path.isfile(os.path.join(directory_path, filename))
-        ]
-        return file_paths
+        statuses = get_batch_file_statuses(client, vector_store_id, file_batch.id)
+    except InterruptedError:
+        for file_result in file_results:
+            file_result['status'] = 'interrupted'
+        return None
     except Exception as e:
-        print(f"Error reading directory: {e}")
-        return []
+        print(f"  ✗ Error during batch {batch_num} registration: {e}")
+        for file_result in file_results:
+            file_result['status'] = 'attach_failed'
+            file_result['error'] = str(e)
+        return None
+
+    for file_result in file_results:
+        status, error = statuses.get(file_result['file_id'], (file_batch.status, None))
+        file_result['status'] = status
+        file_result['error'] = error
+        if journal:
+            journal.record('indexed', vector_store_id, file_id=file_result['file_id'], status=status, error=error)
 
-def upload_files_to_vector_store(client, directory_path, vector_store_name=None, vector_store_id=None):
+    untagged = tag_indexed_files(client, vector_store_id, file_results)
+    
+    print(f"  ✓ Batch {batch_num} Status: {file_batch.status}")
+    print(f"  ✓ Batch {batch_num} File counts: {file_batch.file_counts}")
+    if untagged:
+        print(f"  ⚠️  Batch {batch_num}: {untagged} file(s) indexed without attributes")
+    return file_batch
+
+def get_resumed_result(file_states, path):
     """
-    Upload all files from a directory to a new or existing vector store in Azure OpenAI.
-    Files are uploaded in batches of 250 to avoid API service limitations.
+    Get the file result recorded by an earlier run for this path, or None if it must be uploaded.
+    Files that were modified since they were journaled, or whose indexing failed, are uploaded again.
+    """
+    state = file_states.get(os.path.abspath(path))
+    if state is None or state['state'] not in ('uploaded', 'attached', 'completed'):
+        return None
+    
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    if file_stat.st_size != state['size'] or file_stat.st_mtime != state['mtime']:
+        return None
+    
+    return {
+        'path': path,
+        'filename': os.path.basename(path),
+        'bytes': state['size'],
+        'file_id': state['file_id'],
+        'status': state['state'],
+        'batch_id': state['batch_id'],
+        'error': None,
+        'resumed': True
+    }
+
+def upload_and_index_files(client, vector_store_id, files, max_batch_files=MAX_BATCH_FILES,
+                           max_batch_bytes=MAX_BATCH_BYTES, max_upload_workers=MAX_UPLOAD_WORKERS,
+                           max_concurrent_batches=MAX_CONCURRENT_BATCHES, journal=None,
+                           chunking_strategy=None, tag_attributes=True, poll_interval=POLL_INITIAL_INTERVAL):
+    """
+    Upload files in parallel and index them into the vector store in batches.
+    files is an iterable of (path, size) tuples that is consumed lazily, with only a bounded
+    number of uploads queued at a time. Batches are limited by file count and total bytes and
+    are indexed concurrently while the remaining uploads continue.
+    With a journal, files completed by an earlier run are skipped, uploaded files are attached
+    without re-uploading them and batches still processing remotely are reconciled.
+    chunking_strategy, if given, is applied to every batch instead of the service default.
+    With tag_attributes, each file is tagged with the product/model/doc_type/language attributes
+    derived from its name once its batch is indexed. poll_interval is the first wait between
+    batch status polls.
+    Returns the per-file results together with throughput statistics.
+    """
+    file_states = journal.get_file_states(vector_store_id) if journal else {}
+    if file_states:
+        print(f"\nResuming from journal: {len(file_states)} file(s) recorded by an earlier run")
+    
+    print(f"\nUploading files with {max_upload_workers} parallel uploads, registering batches of up to "
+          f"{max_batch_files} files or {max_batch_bytes // (1024 * 1024)} MB each...")
+    
+    start_time = time.monotonic()
+    stop_event = threading.Event()
+    batch_builder = BatchBuilder(max_batch_files, max_batch_bytes)
+    file_results = []
+    attached_results = {}
+    already_completed = 0
+    batch_futures = []
+    queued_uploads = set()
+    
+    # Uploads and batch indexing run in separate pools, so new files keep uploading
+    # while earlier batches are still being indexed by the service.
+    with ThreadPoolExecutor(max_workers=max_upload_workers) as upload_executor, \
+            ThreadPoolExecutor(max_workers=max_concurrent_batches) as batch_executor:
+        
+        def submit_batch(batch_results, batch_id=None):
+            batch_futures.append(batch_executor.submit(
+                register_and_poll_batch, client, vector_store_id, len(batch_futures) + 1, batch_results,
+                journal, batch_id, stop_event, chunking_strategy, poll_interval
+            ))
+        
+        def set_attributes(file_result):
+            file_result['attributes'] = derive_file_attributes(file_result['filename']) if tag_attributes else None
+        
+        def add_to_batch(file_result):
+            set_attributes(file_result)
+            for batch_results in batch_builder.add(file_result, file_result['bytes']):
+                submit_batch(batch_results)
+        
+        def collect_upload(future):
+            file_result = future.result()
+            file_results.append(file_result)
+            if file_result['status'] != 'uploaded':
+                print(f"  ✗ Error uploading file {file_result['filename']}: {file_result['error']}")
+                return
+            print(f"  ✓ Uploaded: {file_result['filename']} (ID: {file_result['file_id']})")
+            add_to_batch(file_result)
+        
+        try:
+            for path, size in files:
+                rejection = validate_file(path, size)
+                if rejection:
+                    print(f"  ⚠️  Skipping {os.path.basename(path)}: {rejection}")
+                    file_results.append({
+                        'path': path,
+                        'filename': os.path.basename(path),
+                        'bytes': size,
+                        'file_id': None,
+                        'status': 'rejected',
+                        'error': rejection,
+                        'resumed': False
+                    })
+                    continue
+                
+                resumed_result = get_resumed_result(file_states, path)
+                if resumed_result:
+                    file_results.append(resumed_result)
+                    if resumed_result['status'] == 'completed':
+                        already_completed += 1
+                    elif resumed_result['status'] == 'uploaded':
+                        add_to_batch(resumed_result)
+                    else:
+                        set_attributes(resumed_result)
+                        attached_results.setdefault(resumed_result['batch_id'], []).append(resumed_result)
+                    continue
+                
+                # Keep only a bounded number of uploads queued so the walk never runs far ahead
+                if len(queued_uploads) >= max_upload_workers * 2:
+                    done_uploads, queued_uploads = wait(queued_uploads, return_when=FIRST_COMPLETED)
+                    for future in done_uploads:
+                        collect_upload(future)
+                queued_uploads.add(upload_executor.submit(upload_file, client, path, vector_store_id, journal))
+            
+            for future in as_completed(queued_uploads):
+                collect_upload(future)
+            queued_uploads = set()
+            
+            upload_elapsed = time.monotonic() - start_time
+            
+            for batch_id, batch_results in attached_results.items():
+                submit_batch(batch_results, batch_id)
+            remaining_batch = batch_builder.flush()
+            if remaining_batch:
+                submit_batch(remaining_batch)
+            
+            file_batches = [batch_future.result() for batch_future in batch_futures]
+            file_batches = [file_batch for file_batch in file_batches if file_batch is not None]
+        except KeyboardInterrupt:
+            # Stop queued uploads and pollers; everything done so far is in the journal.
+            stop_event.set()
+            for future in queued_uploads:
+                future.cancel()
+            print("\n⚠️  Upload interrupted. Rerun with the same journal to resume.")
+            raise
+    
+    elapsed = time.monotonic() - start_time
+    successful_uploads = sum(1 for file_result in file_results if file_result['status'] == 'completed')
+    # Files the service would refuse (unsupported type, empty, too large) are reported but aren't failures
+    rejected_files = sum(1 for file_result in file_results if file_result['status'] == 'rejected')
+    indexed_this_run = successful_uploads - already_completed
+    uploaded_bytes = sum(file_result['bytes'] for file_result in file_results
+                         if file_result['file_id'] and not file_result['resumed'])
+    
+    failed_results = [file_result for file_result in file_results
+                      if file_result['status'] not in ('completed', 'rejected')]
+    if failed_results:
+        print(f"\nFailed files:")
+        for file_result in failed_results:
+            print(f"  ✗ {file_result['filename']} [{file_result['status']}]: {file_result['error']}")
+    
+    return {
+        'file_results': file_results,
+        'file_batches': file_batches,
+        'total_files': len(file_results),
+        'successful_uploads': successful_uploads,
+        'failed_uploads': len(file_results) - successful_uploads - rejected_files,
+        'rejected_files': rejected_files,
+        'upload_elapsed_seconds': upload_elapsed,
+        'elapsed_seconds': elapsed,
+        'files_per_second': indexed_this_run / elapsed if elapsed > 0 else 0.0,
+        'bytes_per_second': uploaded_bytes / elapsed if elapsed > 0 else 0.0
+    }
+
+def print_throughput(upload_result):
+    """
+    Print the timing and throughput statistics of an upload.
+    """
+    print(f"Upload phase: {upload_result['upload_elapsed_seconds']:.1f}s, "
+          f"total time: {upload_result['elapsed_seconds']:.1f}s")
+    print(f"Throughput: {upload_result['files_per_second']:.2f} files/s, "
+          f"{upload_result['bytes_per_second'] / 1024:.1f} KiB/s")
+
+def upload_files_to_vector_store(client, directory_path, vector_store_name=None, vector_store_id=None,
+                                 max_batch_files=MAX_BATCH_FILES, max_batch_bytes=MAX_BATCH_BYTES,
+                                 max_upload_workers=MAX_UPLOAD_WORKERS,
+                                 max_concurrent_batches=MAX_CONCURRENT_BATCHES, journal=None,
+                                 chunking_strategy=None, tag_attributes=True, poll_interval=POLL_INITIAL_INTERVAL):
+    """
+    Upload all files from a directory tree to a new or existing vector store in Azure OpenAI.
+    Files are uploaded in parallel and registered in batches of up to 250 files to avoid API
+    service limitations. With a journal, an interrupted upload resumes where it stopped.
     """
     print(f"Starting bulk upload from directory: {directory_path}")
     
-    # Get all file paths from the directory
-    file_paths = get_files_from_directory(directory_path)
+    # Walk the directory lazily; peek once so an empty tree doesn't create a vector store
+    files = get_files_from_directory(directory_path)
+    first_file = next(files, None)
     
-    if not file_paths:
+    if first_file is None:
         print("No files found to upload.")
         return {
             'success': False,
             'vector_store': None,
             'file_batches': [],
+            'file_results': [],
             'total_files': 0,
             'successful_uploads': 0,
-            'failed_uploads': 0
+            'failed_uploads': 0,
+            'rejected_files': 0
         }
     
-    print(f"Found {len(file_paths)} files to upload:")
-    for file_path in file_paths:
-        print(f"  - {os.path.basename(file_path)}")
-    
     try:
+        if not vector_store_id and journal:
+            # Reuse the store created by an interrupted run instead of creating another one
+            vector_store_id = journal.find_vector_store(vector_store_name)
+        
         if vector_store_id:
             # Use existing vector store
             print(f"\nUsing existing vector store with ID: {vector_store_id}")
@@ -163,87 +513,55 @@ def upload_files_to_vector_store(client, directory_path, vector_store_name=None,
                     'success': False,
                     'vector_store': None,
                     'file_batches': [],
-                    'total_files': len(file_paths),
+                    'file_results': [],
+                    'total_files': 0,
                     'successful_uploads': 0,
-                    'failed_uploads': len(file_paths)
+                    'failed_uploads': 0,
+                    'rejected_files': 0
                 }
         else:
             # Create new vector store
             print(f"\nCreating vector store: '{vector_store_name}'")
             vector_store = client.vector_stores.create(name=vector_store_name)
+            if journal:
+                journal.record('vector_store_created', vector_store.id, name=vector_store_name)
             print(f"✓ Vector store created with ID: {vector_store.id}")
         
-        # ...existing upload logic... Split files into batches of 250
-        batch_size = 250
-        total_files = len(file_paths)
-        total_batches = (total_files + batch_size - 1) // batch_size  # Ceiling division
-        
-        print(f"\nUploading {total_files} files in {total_batches} batch(es) of {batch_size} files each...")
-        
-        all_file_batches = []
-        successful_uploads = 0
-        failed_uploads = 0
-        
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, total_files)
-            batch_file_paths = file_paths[start_idx:end_idx]
-            
-            print(f"\n--- Processing Batch {batch_num + 1}/{total_batches} ({len(batch_file_paths)} files) ---")
-            
-            # Open the files in binary read mode for this batch
-            file_streams = []
-            for path in batch_file_paths:
-                try:
-                    file_streams.append(open(path, "rb"))
-                except Exception as e:
-                    print(f"  ✗ Error opening file {os.path.basename(path)}: {e}")
-                    failed_uploads += 1
-            
-            if not file_streams:
-                print(f"  ⚠️  No files could be opened for batch {batch_num + 1}, skipping...")
-                continue
-            
-            try:
-                print(f"  🔄 Uploading {len(file_streams)} files to vector store...")
-                # Use the upload and poll SDK helper to upload the files, add them to the vector store,
-                # and poll the status of the file batch for completion.
-                file_batch = client.vector_stores.file_batches.upload_and_poll(
-                    vector_store_id=vector_store.id, files=file_streams
-                )
-                
-                # Print the status and the file counts of the batch
-                print(f"  ✓ Batch {batch_num + 1} Status: {file_batch.status}")
-                print(f"  ✓ Batch {batch_num + 1} File counts: {file_batch.file_counts}")
-                
-                all_file_batches.append(file_batch)
-                successful_uploads += len(file_streams)
-                
-            except Exception as e:
-                print(f"  ✗ Error during batch {batch_num + 1} upload: {e}")
-                failed_uploads += len(file_streams)
-            finally:
-                # Close the file streams after uploading this batch
-                for file_stream in file_streams:
-                    try:
-                        file_stream.close()
-                    except:
-                        pass
+        upload_result = upload_and_index_files(
+            client, vector_store.id, itertools.chain([first_file], files), max_batch_files=max_batch_files,
+            max_batch_bytes=max_batch_bytes, max_upload_workers=max_upload_workers,
+            max_concurrent_batches=max_concurrent_batches, journal=journal,
+            chunking_strategy=chunking_strategy, tag_attributes=tag_attributes, poll_interval=poll_interval
+        )
+        total_files = upload_result['total_files']
+        successful_uploads = upload_result['successful_uploads']
+        failed_uploads = upload_result['failed_uploads']
+        rejected_files = upload_result['rejected_files']
+        if journal and failed_uploads == 0:
+            journal.record('run_completed', vector_store.id)
         
         print(f"\nFinal Upload Results:")
         print(f"Vector store ID: {vector_store.id}")
-        print(f"Total batches processed: {len(all_file_batches)}")
+        print(f"Total batches processed: {len(upload_result['file_batches'])}")
         print(f"Successfully uploaded: {successful_uploads} files")
         print(f"Failed uploads: {failed_uploads} files")
+        print(f"Rejected files: {rejected_files} files")
         print(f"Total files processed: {total_files}")
+        print_throughput(upload_result)
         
         return {
             'success': failed_uploads == 0,
             'vector_store': vector_store,
-            'file_batches': all_file_batches,
+            'file_batches': upload_result['file_batches'],
+            'file_results': upload_result['file_results'],
             'total_files': total_files,
             'successful_uploads': successful_uploads,
-            'failed_uploads': failed_uploads
+            'failed_uploads': failed_uploads,
+            'rejected_files': rejected_files,
+            'upload_elapsed_seconds': upload_result['upload_elapsed_seconds'],
+            'elapsed_seconds': upload_result['elapsed_seconds'],
+            'files_per_second': upload_result['files_per_second'],
+            'bytes_per_second': upload_result['bytes_per_second']
         }
         
     except Exception as e:
@@ -252,12 +570,222 @@ def upload_files_to_vector_store(client, directory_path, vector_store_name=None,
             'success': False,
             'vector_store': None,
             'file_batches': [],
-            'total_files': len(file_paths),
+            'file_results': [],
+            'total_files': 0,
             'successful_uploads': 0,
-            'failed_uploads': len(file_paths)
+            'failed_uploads': 0,
+            'rejected_files': 0
+        }
+
+def remove_file_from_vector_store(client, vector_store_id, file_id):
+    """
+    Detach a file from the vector store and delete it from file storage.
+    Returns None on success, or the error message. Files that are already gone count as removed.
+    """
+    try:
+        client.vector_stores.files.delete(file_id, vector_store_id=vector_store_id)
+    except NotFoundError:
+        pass
+    except Exception as e:
+        return f"detach failed: {e}"
+    
+    try:
+        client.files.delete(file_id)
+    except NotFoundError:
+        pass
+    except Exception as e:
+        return f"delete failed: {e}"
+    return None
+
+def build_local_files(directory_path, file_sizes):
+    """
+    Hash the given files and key them by their path relative to the directory, as the manifest does.
+    file_sizes maps each path to its size.
+    Returns the local files together with the relative paths of files that couldn't be read and of
+    files rejected by the upload limits. Neither is planned: unreadable files still exist, so their
+    manifest entries must not be deleted, and rejected files are never uploaded.
+    """
+    local_files = {}
+    unreadable = set()
+    rejected = set()
+    accepted_paths = []
+    for path, size in file_sizes.items():
+        if validate_file(path, size):
+            rejected.add(os.path.relpath(path, directory_path))
+        else:
+            accepted_paths.append(path)
+    for path, content_hash in hash_files(accepted_paths).items():
+        relative_path = os.path.relpath(path, directory_path)
+        if content_hash is None:
+            unreadable.add(relative_path)
+            continue
+        local_files[relative_path] = {
+            'path': path,
+            'content_hash': content_hash,
+            'size': file_sizes[path]
+        }
+    return local_files, unreadable, rejected
+
+def apply_delta(client, vector_store_id, manifest, manifest_entries, local_files, delta,
+                max_batch_files=MAX_BATCH_FILES, max_batch_bytes=MAX_BATCH_BYTES,
+                max_upload_workers=MAX_UPLOAD_WORKERS, max_concurrent_batches=MAX_CONCURRENT_BATCHES,
+                journal=None, chunking_strategy=None, tag_attributes=True):
+    """
+    Apply a planned delta to the vector store and the manifest.
+    New and changed files are uploaded; a changed file's previous version stays searchable
+    until its replacement has finished indexing. Files of the 'deleted' group are detached and deleted.
+    Returns the counts together with the outcome of each relative path
+    ('uploaded', 'replaced', 'deleted' or 'failed').
+    """
+    result = {
+        'uploaded_count': 0,
+        'replaced_count': 0,
+        'deleted_count': 0,
+        'failed_count': 0,
+        'outcomes': {}
+    }
+    
+    to_upload = delta['new'] + delta['changed']
+    stale_files = []
+    if to_upload:
+        relative_paths = {local_files[relative_path]['path']: relative_path for relative_path in to_upload}
+        upload_result = upload_and_index_files(
+            client, vector_store_id,
+            ((local_files[relative_path]['path'], local_files[relative_path]['size']) for relative_path in to_upload),
+            max_batch_files=max_batch_files, max_batch_bytes=max_batch_bytes,
+            max_upload_workers=max_upload_workers, max_concurrent_batches=max_concurrent_batches,
+            journal=journal, chunking_strategy=chunking_strategy, tag_attributes=tag_attributes
+        )
+        for file_result in upload_result['file_results']:
+            relative_path = relative_paths[file_result['path']]
+            if file_result['status'] != 'completed':
+                result['failed_count'] += 1
+                result['outcomes'][relative_path] = 'failed'
+                continue
+            local_file = local_files[relative_path]
+            manifest.upsert(vector_store_id, relative_path, local_file['content_hash'],
+                            file_result['file_id'], local_file['size'])
+            if relative_path in manifest_entries:
+                stale_files.append((relative_path, manifest_entries[relative_path]['file_id'], False))
+                result['replaced_count'] += 1
+                result['outcomes'][relative_path] = 'replaced'
+            else:
+                result['uploaded_count'] += 1
+                result['outcomes'][relative_path] = 'uploaded'
+        print_throughput(upload_result)
+    
+    stale_files.extend(
+        (relative_path, manifest_entries[relative_path]['file_id'], True) for relative_path in delta['deleted']
+    )
+    
+    if stale_files:
+        print(f"\nRemoving {len(stale_files)} outdated file(s) from the vector store...")
+        with ThreadPoolExecutor(max_workers=max_upload_workers) as executor:
+            errors = list(executor.map(
+                lambda stale_file: remove_file_from_vector_store(client, vector_store_id, stale_file[1]),
+                stale_files
+            ))
+        for (relative_path, file_id, deleted), error in zip(stale_files, errors):
+            if error:
+                print(f"  ✗ Error removing {relative_path} (ID: {file_id}): {error}")
+                result['failed_count'] += 1
+                result['outcomes'][relative_path] = 'failed'
+                continue
+            print(f"  ✓ Removed: {relative_path} (ID: {file_id})")
+            if deleted:
+                manifest.remove(vector_store_id, relative_path)
+                result['deleted_count'] += 1
+                result['outcomes'][relative_path] = 'deleted'
+    
+    return result
+
+def sync_directory_to_vector_store(client, directory_path, vector_store_id, manifest_path, dry_run=False,
+                                   max_batch_files=MAX_BATCH_FILES, max_batch_bytes=MAX_BATCH_BYTES,
+                                   max_upload_workers=MAX_UPLOAD_WORKERS,
+                                   max_concurrent_batches=MAX_CONCURRENT_BATCHES, journal=None,
+                                   chunking_strategy=None, tag_attributes=True):
+    """
+    Incrementally sync a directory with an existing vector store using the local manifest.
+    Only new or changed files are uploaded. Changed files replace their previous version once
+    the new one is indexed, and files that disappeared from the directory are detached and deleted.
+    With a journal, files already indexed by an interrupted sync are not uploaded again.
+    """
+    print(f"Starting delta sync from directory: {directory_path}")
+    
+    file_sizes = dict(get_files_from_directory(directory_path))
+    print(f"Hashing {len(file_sizes)} files...")
+    local_files, unreadable, rejected = build_local_files(directory_path, file_sizes)
+    
+    with UploadManifest(manifest_path) as manifest:
+        # Unreadable files are left as they are in the vector store and retried on the next sync
+        manifest_entries = {relative_path: entry for relative_path, entry in manifest.get_entries(vector_store_id).items()
+                            if relative_path not in unreadable and relative_path not in rejected}
+        delta = plan_delta(local_files, manifest_entries)
+        
+        print(f"\nPlanned changes for vector store {vector_store_id}:")
+        for relative_path in delta['new']:
+            print(f"  + {relative_path}")
+        for relative_path in delta['changed']:
+            print(f"  ~ {relative_path} (replaces {manifest_entries[relative_path]['file_id']})")
+        for relative_path in delta['deleted']:
+            print(f"  - {relative_path} ({manifest_entries[relative_path]['file_id']})")
+        for relative_path in sorted(unreadable):
+            print(f"  ! {relative_path} (unreadable, left as is)")
+        print(f"New: {len(delta['new'])}, changed: {len(delta['changed'])}, "
+              f"deleted: {len(delta['deleted'])}, unchanged: {len(delta['unchanged'])}, "
+              f"unreadable: {len(unreadable)}, rejected: {len(rejected)}")
+        
+        result = {
+            'success': not unreadable,
+            'delta': delta,
+            'uploaded_count': 0,
+            'replaced_count': 0,
+            'deleted_count': 0,
+            'failed_count': len(unreadable),
+            'rejected_count': len(rejected)
         }
+        
+        if dry_run:
+            print("\nDry run: no changes were made.")
+            return result
+        
+        try:
+            client.vector_stores.retrieve(vector_store_id)
+        except Exception as e:
+            print(f"✗ Error retrieving vector store with ID {vector_store_id}: {e}")
+            result['success'] = False
+            return result
+        
+        applied = apply_delta(
+            client, vector_store_id, manifest, manifest_entries, local_files, delta,
+            max_batch_files=max_batch_files, max_batch_bytes=max_batch_bytes,
+            max_upload_workers=max_upload_workers, max_concurrent_batches=max_concurrent_batches,
+            journal=journal, chunking_strategy=chunking_strategy, tag_attributes=tag_attributes
+        )
+        for key in ('uploaded_count', 'replaced_count', 'deleted_count', 'failed_count'):
+            result[key] += applied[key]
+    
+    result['success'] = result['failed_count'] == 0
+    if journal and result['success']:
+        journal.record('run_completed', vector_store_id)
+    
+    print(f"\nSync Results:")
+    print(f"Vector store ID: {vector_store_id}")
+    print(f"New files uploaded: {result['uploaded_count']}")
+    print(f"Changed files replaced: {result['replaced_count']}")
+    print(f"Deleted files removed: {result['deleted_count']}")
+    print(f"Unchanged files skipped: {len(delta['unchanged'])}")
+    print(f"Rejected files skipped: {result['rejected_count']}")
+    print(f"Failures: {result['failed_count']}")
+    
+    return result
 
 if __name__ == "__main__":
+    # With arguments, run unattended through the async engine instead of prompting
+    if len(sys.argv) > 1:
+        from ingest import main as ingest_main
+        exit(ingest_main(["upload", *sys.argv[1:]]))
+    
     print("\n")
     print("=" * 50)
     print("📁 Bulk File Upload to Azure OpenAI Vector Store")
@@ -283,22 +811,53 @@ if __name__ == "__main__":
         print(f"Vector Store ID: {config['vector_store_id']}")
     else:
         print(f"Vector Store Name: {config['vector_store_name']}")
+    if config['sync']:
+        print(f"Manifest: {config['manifest_path']}")
+        print(f"Dry run: {'Yes' if config['dry_run'] else 'No'}")
+    print(f"Journal: {config['journal_path']}")
+    if config['chunking_strategy']:
+        static = config['chunking_strategy']['static']
+        print(f"Chunking: static, {static['max_chunk_size_tokens']} tokens "
+              f"with {static['chunk_overlap_tokens']} overlap")
+    else:
+        print("Chunking: service default")
     confirmation = input("\nProceed with upload? Type 'YES' to confirm: ")
     
     if confirmation == "YES":
-        if config['use_existing']:
-            result = upload_files_to_vector_store(
-                client, 
-                config['directory_path'], 
-                vector_store_id=config['vector_store_id']
-            )
-        else:
-            result = upload_files_to_vector_store(
-                client, 
-                config['directory_path'], 
-                vector_store_name=config['vector_store_name']
-            )
-        if result['success']:
+        with UploadJournal(config['journal_path']) as journal:
+            if config['sync']:
+                result = sync_directory_to_vector_store(
+                    client,
+                    config['directory_path'],
+                    config['vector_store_id'],
+                    config['manifest_path'],
+                    dry_run=config['dry_run'],
+                    journal=journal,
+                    chunking_strategy=config['chunking_strategy']
+                )
+            elif config['use_existing']:
+                result = upload_files_to_vector_store(
+                    client, 
+                    config['directory_path'], 
+                    vector_store_id=config['vector_store_id'],
+                    journal=journal,
+                    chunking_strategy=config['chunking_strategy']
+                )
+            else:
+                result = upload_files_to_vector_store(
+                    client, 
+                    config['directory_path'], 
+                    vector_store_name=config['vector_store_name'],
+                    journal=journal,
+                    chunking_strategy=config['chunking_strategy']
+                )
+        
+        if config['sync']:
+            if result['success']:
+                print(f"\n✅ Sync completed successfully!")
+            else:
+                print(f"\n❌ Sync completed with {result['failed_count']} failure(s).")
+        elif result['success']:
             print(f"\n✅ Upload completed successfully!")
             print(f"Vector Store ID: {result['vector_store'].id}")
             print(f"Total files uploaded: {result['successful_uploads']}")
@@ -0,0 +1,294 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Source Directory Path (Markdown files, e.g. the output of clean_html.py)
+# - Destination Directory Path (one Markdown file per section)
+# - Target Section Size in tokens
+# ===================================
+
+DEFAULT_TARGET_TOKENS = 400     # Sections are packed up to this size
+MIN_SECTION_TOKENS = 80         # Smaller sibling sections are merged with their neighbour
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_SECTION_FILE_PATTERN = re.compile(r"\.[0-9a-f]{12}\.md$")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into word and punctuation tokens.
+    A cheap, dependency-free approximation of model tokens used for sizing chunks.
+    """
+    return _TOKEN_PATTERN.findall(text)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the number of model tokens in the text.
+    """
+    return len(tokenize(text))
+
+
+def split_into_sections(markdown: str) -> List[Tuple[List[str], str]]:
+    """
+    Split Markdown on heading boundaries, ignoring '#' lines inside code fences.
+
+    Args:
+        markdown (str): Markdown document
+
+    Returns:
+        List[Tuple[List[str], str]]: (heading path, body) per section, in document order
+    """
+    sections = []
+    heading_path: List[Tuple[int, str]] = []
+    body: List[str] = []
+    in_fence = False
+
+    def close_section():
+        text = "\n".join(body).strip()
+        if text:
+            sections.append(([heading for _, heading in heading_path], text))
+
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING_PATTERN.match(line)
+        if match is None:
+            body.append(line)
+            continue
+
+        close_section()
+        level = len(match.group(1))
+        heading_path = [(existing_level, heading) for existing_level, heading in heading_path if existing_level < level]
+        heading_path.append((level, match.group(2)))
+        body = [line]
+
+    close_section()
+    return sections
+
+
+def split_oversized(body: str, target_tokens: int) -> List[str]:
+    """
+    Split a section body on paragraph boundaries into parts of at most target_tokens.
+    Code fences and tables are kept whole; a single paragraph larger than the target is kept as is.
+    """
+    paragraphs = re.split(r"\n\s*\n", body)
+    # Re-join paragraphs that belong to an unterminated code fence
+    blocks: List[str] = []
+    for paragraph in paragraphs:
+        if blocks and blocks[-1].count("```") % 2 == 1:
+            blocks[-1] += "\n\n" + paragraph
+        else:
+            blocks.append(paragraph)
+
+    parts: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for block in blocks:
+        block_tokens = count_tokens(block)
+        if current and current_tokens + block_tokens > target_tokens:
+            parts.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += block_tokens
+    if current:
+        parts.append("\n\n".join(current))
+    return parts
+
+
+def make_section_id(relative_path: str, heading_path: List[str], occurrence: int, part_index: int) -> str:
+    """
+    Derive a stable section ID from the document path, heading path and part number.
+    occurrence tells apart sections whose heading paths are identical (e.g. repeated "Notes").
+    The ID doesn't depend on the section's content, so an edited section keeps its ID.
+    """
+    key = "\x00".join([relative_path.replace(os.sep, "/"), *heading_path, f"{occurrence}.{part_index}"])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def chunk_markdown(markdown: str, relative_path: str, target_tokens: int = DEFAULT_TARGET_TOKENS) -> List[Dict]:
+    """
+    Split a Markdown document into right-sized sections with stable IDs.
+    Small consecutive sections under the same parent heading are merged, and oversized
+    sections are split on paragraph boundaries. Every section starts with its heading
+    breadcrumb so it stays understandable on its own.
+
+    Args:
+        markdown (str): Markdown document
+        relative_path (str): Path of the document, used for the IDs and breadcrumbs
+        target_tokens (int): Target maximum section size in tokens
+
+    Returns:
+        List[Dict]: Sections as {'id', 'heading_path', 'text', 'tokens'}
+    """
+    merged: List[Tuple[List[str], str]] = []
+    for heading_path, body in split_into_sections(markdown):
+        if merged:
+            previous_path, previous_body = merged[-1]
+            same_parent = previous_path[:-1] == heading_path[:-1] or previous_path == heading_path[:-1]
+            combined_tokens = count_tokens(previous_body) + count_tokens(body)
+            if same_parent and count_tokens(previous_body) < MIN_SECTION_TOKENS and combined_tokens <= target_tokens:
+                merged[-1] = (previous_path, previous_body + "\n\n" + body)
+                continue
+        merged.append((heading_path, body))
+
+    sections = []
+    occurrences: Dict[Tuple[str, ...], int] = {}
+    for heading_path, body in merged:
+        occurrence = occurrences.get(tuple(heading_path), 0)
+        occurrences[tuple(heading_path)] = occurrence + 1
+        for part_index, part in enumerate(split_oversized(body, target_tokens)):
+            breadcrumb = " > ".join([relative_path, *heading_path])
+            text = f"<!-- {breadcrumb} -->\n{part}\n"
+            sections.append({
+                'id': make_section_id(relative_path, heading_path, occurrence, part_index),
+                'heading_path': heading_path,
+                'text': text,
+                'tokens': count_tokens(text)
+            })
+    return sections
+
+
+def chunk_markdown_files(source_dir: str, dest_dir: str, target_tokens: int = DEFAULT_TARGET_TOKENS) -> dict:
+    """
+    Write every section of every Markdown file below source_dir as its own file in dest_dir.
+    Section files are named '<document name>.<section id>.md'. Section files left over from
+    an earlier run whose section no longer exists are removed.
+
+    Args:
+        source_dir (str): Directory containing Markdown files
+        dest_dir (str): Directory for the section files
+        target_tokens (int): Target maximum section size in tokens
+
+    Returns:
+        dict: Results summary with counts and token statistics
+    """
+    source_path = Path(source_dir)
+    dest_path = Path(dest_dir)
+    dest_path.mkdir(parents=True, exist_ok=True)
+
+    written_files = set()
+    document_count = 0
+    section_tokens = []
+    failed_count = 0
+
+    for markdown_file in sorted(source_path.rglob("*.md")):
+        relative_path = str(markdown_file.relative_to(source_path))
+        try:
+            sections = chunk_markdown(markdown_file.read_text(encoding="utf-8"), relative_path, target_tokens)
+            stem = relative_path[:-len(".md")].replace(os.sep, ".")
+            for section in sections:
+                section_file = dest_path / f"{stem}.{section['id']}.md"
+                if not section_file.exists() or section_file.read_text(encoding="utf-8") != section['text']:
+                    section_file.write_text(section['text'], encoding="utf-8")
+                written_files.add(section_file.name)
+                section_tokens.append(section['tokens'])
+            document_count += 1
+            print(f"  ✓ {relative_path}: {len(sections)} section(s)")
+        except Exception as e:
+            print(f"  ✗ Error chunking {relative_path}: {e}")
+            failed_count += 1
+
+    removed_count = 0
+    if failed_count == 0:
+        for stale_file in dest_path.glob("*.md"):
+            if _SECTION_FILE_PATTERN.search(stale_file.name) and stale_file.name not in written_files:
+                stale_file.unlink()
+                removed_count += 1
+
+    return {
+        'success': failed_count == 0,
+        'document_count': document_count,
+        'section_count': len(section_tokens),
+        'removed_count': removed_count,
+        'failed_count': failed_count,
+        'average_tokens': sum(section_tokens) / len(section_tokens) if section_tokens else 0,
+        'max_tokens': max(section_tokens, default=0)
+    }
+
+
+def get_user_configuration():
+    """
+    Get directory and section size configuration from user input.
+    """
+    print("✂️  Section Chunker Configuration Setup")
+    print("-" * 40)
+
+    # Get source directory
+    source_dir = input("Enter source directory path (containing Markdown files): ").strip()
+    while not source_dir:
+        print("Source directory path is required.")
+        source_dir = input("Enter source directory path (containing Markdown files): ").strip()
+
+    # Get destination directory
+    dest_dir = input("Enter destination directory path (where section files will be written): ").strip()
+    while not dest_dir:
+        print("Destination directory path is required.")
+        dest_dir = input("Enter destination directory path (where section files will be written): ").strip()
+
+    # Get target section size
+    target_tokens = None
+    while target_tokens is None:
+        raw_target = input(f"Enter target section size in tokens (leave empty for {DEFAULT_TARGET_TOKENS}): ").strip()
+        if not raw_target:
+            target_tokens = DEFAULT_TARGET_TOKENS
+        elif raw_target.isdigit() and int(raw_target) > 0:
+            target_tokens = int(raw_target)
+        else:
+            print("Target section size must be a positive number.")
+
+    return {
+        'source_dir': source_dir,
+        'dest_dir': dest_dir,
+        'target_tokens': target_tokens
+    }
+
+
+def main():
+    """Main function to handle user input and execute the script."""
+    print("\n")
+    print("=" * 50)
+    print("✂️  Section-Aware Document Chunker")
+    print("=" * 50)
+
+    # Get configuration from user
+    config = get_user_configuration()
+
+    # Show configuration summary
+    print(f"\nConfiguration Summary:")
+    print(f"Source directory: {config['source_dir']}")
+    print(f"Destination directory: {config['dest_dir']}")
+    print(f"Target section size: {config['target_tokens']} tokens")
+
+    # Confirm before proceeding
+    confirmation = input("\nProceed with chunking? Type 'YES' to confirm: ")
+
+    if confirmation != "YES":
+        print("Operation cancelled.")
+        return
+
+    if not os.path.exists(config['source_dir']):
+        print(f"❌ Source directory '{config['source_dir']}' does not exist.")
+        return
+
+    result = chunk_markdown_files(config['source_dir'], config['dest_dir'], config['target_tokens'])
+
+    print(f"\nChunking Summary:")
+    print(f"Documents chunked: {result['document_count']}")
+    print(f"Sections written: {result['section_count']}")
+    print(f"Stale sections removed: {result['removed_count']}")
+    print(f"Average section size: {result['average_tokens']:.0f} tokens (max {result['max_tokens']})")
+
+    if result['success']:
+        print(f"\n✅ Chunking completed successfully!")
+    else:
+        print(f"\n❌ Chunking completed with {result['failed_count']} error(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Source Directory Path (HTML files, e.g. the output of extract_and_rename_html.py)
+# - Destination Directory Path (cleaned Markdown files)
+# ===================================
+
+# Elements whose whole content is boilerplate or not text at all. <form> and <button> aren't
+# among them: ASP.NET pages wrap their whole body in a form, and buttons carry UI labels.
+SKIPPED_TAGS = {
+    "script", "style", "noscript", "template", "iframe", "svg", "canvas", "select",
+    "nav", "footer", "aside", "head"
+}
+# Page chrome outside the main content; inside <main> or <article> a header holds the title
+CHROME_TAGS = {"header"}
+CONTENT_TAGS = {"main", "article"}
+# Elements that never have an end tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "blockquote", "dl", "dt", "dd", "figure", "figcaption",
+    "ul", "ol", "body", "html"
+}
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+# class/id tokens and ARIA roles that mark navigation and repeated page chrome. The tokens only
+# apply outside <main>/<article>, where e.g. class="menu" describes a printer's control panel.
+BOILERPLATE_TOKENS = {
+    "nav", "navbar", "navigation", "breadcrumb", "breadcrumbs", "menu", "sidebar", "footer", "header",
+    "toc", "cookie", "cookies", "skip-link", "skiplink", "banner"
+}
+BOILERPLATE_ROLES = {"navigation", "banner", "contentinfo", "search", "menu", "menubar"}
+
+MAX_CLEAN_WORKERS = os.cpu_count() or 4
+MIN_CONTENT_CHARACTERS = 20     # Output with fewer non-whitespace characters counts as empty
+
+
+class HTMLToMarkdownConverter(HTMLParser):
+    """
+    Convert an HTML page into Markdown, keeping headings, lists and tables and dropping boilerplate.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.output: List[str] = []
+        self.skip_depth = 0
+        self.skip_stack: List[str] = []
+        self.pre_depth = 0
+        self.list_stack: List[str] = []
+        self.content_depth = 0
+        self.table: Optional[List[List[str]]] = None
+        self.table_depth = 0
+        self.cell: Optional[List[str]] = None
+
+    def _is_boilerplate(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> bool:
+        if tag in SKIPPED_TAGS or (tag in CHROME_TAGS and not self.content_depth):
+            return True
+        attributes = dict(attrs)
+        if (attributes.get("role") or "").lower() in BOILERPLATE_ROLES:
+            return True
+        if self.content_depth:
+            return False
+        tokens = set((attributes.get("class") or "").lower().split())
+        tokens.add((attributes.get("id") or "").lower())
+        return bool(tokens & BOILERPLATE_TOKENS)
+
+    def _write(self, text: str):
+        if self.cell is not None:
+            self.cell.append(text)
+        else:
+            self.output.append(text)
+
+    def _break(self, newlines: int = 2):
+        if self.cell is not None:
+            self.cell.append(" ")
+        else:
+            self.output.append("\n" * newlines)
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_depth:
+            if tag not in VOID_TAGS:
+                self.skip_stack.append(tag)
+                self.skip_depth += 1
+            return
+        if tag not in VOID_TAGS and self._is_boilerplate(tag, attrs):
+            self.skip_stack.append(tag)
+            self.skip_depth = 1
+            return
+        if tag in CONTENT_TAGS:
+            self.content_depth += 1
+
+        if tag in HEADING_TAGS:
+            self._break()
+            if self.cell is None:
+                self._write("#" * HEADING_TAGS[tag] + " ")
+        elif tag in ("ul", "ol"):
+            self.list_stack.append(tag)
+            self._break(1)
+        elif tag == "li":
+            indent = "  " * max(len(self.list_stack) - 1, 0)
+            marker = "1." if self.list_stack and self.list_stack[-1] == "ol" else "-"
+            self._break(1)
+            self._write(f"{indent}{marker} ")
+        elif tag == "pre":
+            self.pre_depth += 1
+            self._break()
+            self._write("```\n")
+        elif tag == "code" and not self.pre_depth:
+            self._write("`")
+        elif tag == "br":
+            self._break(1)
+        elif tag == "table":
+            # A nested table is flattened into the text of the outer table's cell
+            if self.table is None:
+                self.table = []
+            self.table_depth += 1
+        elif tag in ("tr", "td", "th") and self.table_depth > 1:
+            self._break(1)
+        elif tag == "tr" and self.table is not None:
+            self.table.append([])
+        elif tag in ("td", "th") and self.table is not None:
+            self.cell = []
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if self.skip_depth:
+            # Unwind to the matching start tag so unclosed inner elements don't leak the skip
+            if tag in self.skip_stack:
+                while self.skip_stack:
+                    self.skip_depth -= 1
+                    if self.skip_stack.pop() == tag:
+                        break
+            return
+        if tag in CONTENT_TAGS and self.content_depth:
+            self.content_depth -= 1
+
+        if tag in HEADING_TAGS:
+            self._break()
+        elif tag in ("ul", "ol"):
+            if self.list_stack:
+                self.list_stack.pop()
+            self._break()
+        elif tag == "pre" and self.pre_depth:
+            self.pre_depth -= 1
+            self._write("\n```")
+            self._break()
+        elif tag == "code" and not self.pre_depth:
+            self._write("`")
+        elif tag in ("tr", "td", "th") and self.table_depth > 1:
+            self._break(1)
+        elif tag in ("td", "th") and self.cell is not None:
+            if self.table:
+                self.table[-1].append(" ".join("".join(self.cell).split()).replace("|", "\\|"))
+            self.cell = None
+        elif tag == "table" and self.table is not None:
+            self.table_depth -= 1
+            if not self.table_depth:
+                self._flush_table()
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.pre_depth:
+            self._write(data)
+        else:
+            self._write(re.sub(r"\s+", " ", data))
+
+    def _flush_table(self):
+        rows = [row for row in self.table if any(cell for cell in row)]
+        self.table = None
+        self.table_depth = 0
+        self.cell = None
+        if not rows:
+            return
+
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + " --- |" * width]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+        self._break()
+        self._write("\n".join(lines))
+        self._break()
+
+    def get_markdown(self) -> str:
+        if self.table is not None:
+            self._flush_table()
+        text = "".join(self.output)
+        lines = [line.rstrip() for line in text.split("\n")]
+        text = "\n".join(lines)
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        return text.strip() + "\n"
+
+
+def html_to_markdown(html: str) -> str:
+    """
+    Convert an HTML document into clean Markdown.
+
+    Args:
+        html (str): HTML source
+
+    Returns:
+        str: Markdown with headings, lists and tables preserved
+    """
+    converter = HTMLToMarkdownConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.get_markdown()
+
+
+def clean_html_file(source_file: str, dest_file: str) -> Dict:
+    """
+    Convert one HTML file into a Markdown file.
+    Runs in a worker process, so errors are returned in the result instead of raised.
+
+    Args:
+        source_file (str): Path of the HTML file
+        dest_file (str): Path of the Markdown file to write
+
+    Returns:
+        dict: Source and destination paths, byte sizes before and after, whether the output
+              is (nearly) empty, and error if any
+    """
+    result = {
+        'source_file': source_file,
+        'dest_file': dest_file,
+        'original_bytes': 0,
+        'cleaned_bytes': 0,
+        'empty': False,
+        'error': None
+    }
+    try:
+        with open(source_file, "rb") as file_stream:
+            raw = file_stream.read()
+        result['original_bytes'] = len(raw)
+
+        markdown = html_to_markdown(raw.decode("utf-8", errors="replace"))
+        result['empty'] = len("".join(markdown.split())) < MIN_CONTENT_CHARACTERS
+        encoded = markdown.encode("utf-8")
+        Path(dest_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(dest_file, "wb") as file_stream:
+            file_stream.write(encoded)
+        result['cleaned_bytes'] = len(encoded)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def format_reduction(original_bytes: int, cleaned_bytes: int) -> str:
+    """
+    Describe how much smaller the cleaned output is than the original.
+    """
+    if not original_bytes:
+        return "n/a"
+    return f"{(1 - cleaned_bytes / original_bytes) * 100:.1f}% smaller"
+
+
+def clean_html_files(source_dir: str, dest_dir: str, max_workers: int = MAX_CLEAN_WORKERS) -> dict:
+    """
+    Convert every HTML file below source_dir into Markdown under dest_dir using a process pool.
+    The relative layout is kept and each ".html" suffix becomes ".md".
+
+    Args:
+        source_dir (str): Directory containing HTML files
+        dest_dir (str): Directory for the Markdown output
+        max_workers (int): Number of worker processes
+
+    Returns:
+        dict: Results summary with per-file results and overall byte reduction.
+              Files whose output is (nearly) empty are counted separately and left out of the reduction.
+    """
+    source_path = Path(source_dir)
+    dest_path = Path(dest_dir)
+    jobs = [
+        (str(html_file), str((dest_path / html_file.relative_to(source_path)).with_suffix(".md")))
+        for html_file in source_path.rglob("*.html")
+        if html_file.is_file()
+    ]
+
+    start_time = time.monotonic()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            clean_html_file, *zip(*jobs), chunksize=max(1, len(jobs) // (max_workers * 4))
+        )) if jobs else []
+    elapsed = time.monotonic() - start_time
+
+    cleaned_count = 0
+    failed_count = 0
+    empty_count = 0
+    original_bytes = 0
+    cleaned_bytes = 0
+    for result in results:
+        name = os.path.relpath(result['source_file'], source_dir)
+        if result['error']:
+            print(f"  ✗ Error cleaning {name}: {result['error']}")
+            failed_count += 1
+            continue
+        if result['empty']:
+            # Most likely content dropped as boilerplate, not a saving
+            print(f"  ⚠️  {name}: no content left after cleaning ({result['cleaned_bytes']} bytes), check the page")
+            empty_count += 1
+            continue
+        print(f"  ✓ {name}: {result['original_bytes'] / 1024:.1f} KB -> {result['cleaned_bytes'] / 1024:.1f} KB "
+              f"({format_reduction(result['original_bytes'], result['cleaned_bytes'])})")
+        cleaned_count += 1
+        original_bytes += result['original_bytes']
+        cleaned_bytes += result['cleaned_bytes']
+
+    return {
+        'success': failed_count == 0,
+        'results': results,
+        'cleaned_count': cleaned_count,
+        'failed_count': failed_count,
+        'empty_count': empty_count,
+        'total_files': len(results),
+        'original_bytes': original_bytes,
+        'cleaned_bytes': cleaned_bytes,
+        'elapsed_seconds': elapsed
+    }
+
+
+def get_user_configuration():
+    """
+    Get source and destination directory configuration from user input.
+    """
+    print("🧹 HTML Cleaner Configuration Setup")
+    print("-" * 40)
+
+    # Get source directory
+    source_dir = input("Enter source directory path (containing HTML files): ").strip()
+    while not source_dir:
+        print("Source directory path is required.")
+        source_dir = input("Enter source directory path (containing HTML files): ").strip()
+
+    # Get destination directory
+    dest_dir = input("Enter destination directory path (where cleaned Markdown files will be written): ").strip()
+    while not dest_dir:
+        print("Destination directory path is required.")
+        dest_dir = input("Enter destination directory path (where cleaned Markdown files will be written): ").strip()
+
+    return {
+        'source_dir': source_dir,
+        'dest_dir': dest_dir
+    }
+
+
+def main():
+    """Main function to handle user input and execute the script."""
+    print("\n")
+    print("=" * 50)
+    print("🧹 HTML Boilerplate Cleaner")
+    print("=" * 50)
+
+    # Get configuration from user
+    config = get_user_configuration()
+
+    # Show configuration summary
+    print(f"\nConfiguration Summary:")
+    print(f"Source directory: {config['source_dir']}")
+    print(f"Destination directory: {config['dest_dir']}")
+
+    # Confirm before proceeding
+    confirmation = input("\nProceed with HTML cleaning? Type 'YES' to confirm: ")
+
+    if confirmation != "YES":
+        print("Operation cancelled.")
+        return
+
+    if not os.path.exists(config['source_dir']):
+        print(f"❌ Source directory '{config['source_dir']}' does not exist.")
+        return
+
+    print(f"\n🔄 Cleaning HTML files with {MAX_CLEAN_WORKERS} worker processes...")
+    result = clean_html_files(config['source_dir'], config['dest_dir'])
+
+    print(f"\nCleaning Summary:")
+    print(f"Successfully cleaned: {result['cleaned_count']} files")
+    print(f"Failed: {result['failed_count']} files")
+    print(f"Empty after cleaning: {result['empty_count']} files")
+    print(f"Total size: {result['original_bytes'] / 1024:.1f} KB -> {result['cleaned_bytes'] / 1024:.1f} KB "
+          f"({format_reduction(result['original_bytes'], result['cleaned_bytes'])})")
+    if result['elapsed_seconds'] > 0:
+        print(f"Throughput: {result['total_files'] / result['elapsed_seconds']:.1f} files/s")
+
+    if result['success']:
+        print(f"\n✅ HTML cleaning completed successfully!")
+    else:
+        print(f"\n❌ HTML cleaning completed with errors.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import getpass
+import os
+from typing import Any, Dict, Optional
+
+from openai import AzureOpenAI
+
+# ====== CONNECTION NOTES ======
+# Connection settings shared by every script, interactive or not:
+# - AZURE_OPENAI_API_KEY
+# - AZURE_OPENAI_ENDPOINT
+# - OPENAI_API_VERSION
+# Interactive scripts only prompt for the settings missing from the environment;
+# the non-interactive CLI (ingest.py) takes them from flags or the environment.
+# ==============================
+
+API_KEY_VARIABLE = "AZURE_OPENAI_API_KEY"
+ENDPOINT_VARIABLE = "AZURE_OPENAI_ENDPOINT"
+API_VERSION_VARIABLE = "OPENAI_API_VERSION"
+
+
+def load_client_config(api_key: Optional[str] = None, azure_endpoint: Optional[str] = None,
+                       api_version: Optional[str] = None) -> dict:
+    """
+    Resolve the client configuration from explicit values, falling back to the environment.
+
+    Raises:
+        ValueError: If a required setting is missing from both
+    """
+    config = {
+        'api_key': api_key or os.environ.get(API_KEY_VARIABLE),
+        'azure_endpoint': azure_endpoint or os.environ.get(ENDPOINT_VARIABLE),
+        'api_version': api_version or os.environ.get(API_VERSION_VARIABLE)
+    }
+    missing = [name for name, value in config.items() if not value]
+    if missing:
+        raise ValueError(f"Missing configuration: {', '.join(missing)} (set the flags or environment variables)")
+    return config
+
+
+def add_connection_arguments(parser):
+    """
+    Add the connection flags of the non-interactive CLI.
+    """
+    parser.add_argument("--api-key", help=f"Azure OpenAI API key (default: ${API_KEY_VARIABLE})")
+    parser.add_argument("--endpoint", help=f"Azure OpenAI endpoint (default: ${ENDPOINT_VARIABLE})")
+    parser.add_argument("--api-version", help=f"API version (default: ${API_VERSION_VARIABLE})")
+
+
+def get_connection_configuration() -> dict:
+    """
+    Get the Azure OpenAI connection settings, prompting for those not set in the environment.
+    """
+    print("🔧 Azure OpenAI Configuration Setup")
+    print("-" * 40)
+
+    # Get API Key (masked input)
+    api_key = os.environ.get(API_KEY_VARIABLE)
+    if api_key:
+        print(f"Using API Key from {API_KEY_VARIABLE}")
+    else:
+        api_key = getpass.getpass("Enter your Azure OpenAI API Key: ")
+
+    # Show masked API key for confirmation (show last 5 digits)
+    if len(api_key) >= 5:
+        masked_key = "*" * (len(api_key) - 5) + api_key[-5:]
+    else:
+        masked_key = "*" * len(api_key)
+
+    print(f"API Key entered: {masked_key}")
+
+    # Get Azure Endpoint
+    azure_endpoint = os.environ.get(ENDPOINT_VARIABLE)
+    if azure_endpoint:
+        print(f"Using Azure Endpoint from {ENDPOINT_VARIABLE}: {azure_endpoint}")
+    while not azure_endpoint:
+        azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
+        if not azure_endpoint:
+            print("Azure Endpoint is required.")
+
+    # Get API Version
+    api_version = os.environ.get(API_VERSION_VARIABLE)
+    if api_version:
+        print(f"Using API Version from {API_VERSION_VARIABLE}: {api_version}")
+    while not api_version:
+        api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
+        if not api_version:
+            print("API Version is required.")
+
+    return {
+        'api_key': api_key,
+        'api_version': api_version,
+        'azure_endpoint': azure_endpoint
+    }
+
+
+def initialize_client(config, max_retries: Optional[int] = None):
+    """
+    Initialize the AzureOpenAI client with the provided configuration.
+    """
+    options: Dict[str, Any] = {'max_retries': max_retries} if max_retries is not None else {}
+    try:
+        client = AzureOpenAI(
+            api_key=config['api_key'],
+            api_version=config['api_version'],
+            azure_endpoint=config['azure_endpoint'],
+            **options
+        )
+        return client
+    except Exception as e:
+        print(f"Error initializing Azure OpenAI client: {e}")
+        return None
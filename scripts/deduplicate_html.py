@@ -0,0 +1,332 @@
+import hashlib
+import json
+import os
+import random
+import re
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from clean_html import html_to_markdown
+from extract_and_rename_html import copy_and_rename_files, find_html_files
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Source Directory Path
+# - Destination Directory Path
+# - Similarity Threshold (Jaccard similarity above which pages are near-duplicates)
+# - Mapping File Path (records which pages were skipped in favour of which canonical page)
+# ===================================
+
+NUM_PERMUTATIONS = 128          # MinHash signature length
+SHINGLE_SIZE = 5                # Words per shingle
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MAPPING_PATH = "near_duplicates.json"
+MAX_SIGNATURE_WORKERS = os.cpu_count() or 4
+
+_MERSENNE_PRIME = (1 << 61) - 1
+# Fixed seed so signatures are identical across processes and runs
+_random = random.Random(1729)
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def get_shingles(text: str, shingle_size: int = SHINGLE_SIZE) -> set:
+    """
+    Hash every run of shingle_size consecutive words of the text into a 64-bit integer.
+
+    Args:
+        text (str): Document text
+        shingle_size (int): Number of words per shingle
+
+    Returns:
+        set: Hashed shingles
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < shingle_size:
+        word_runs = [words] if words else []
+    else:
+        word_runs = [words[i:i + shingle_size] for i in range(len(words) - shingle_size + 1)]
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(run).encode("utf-8"), digest_size=8).digest(), "big")
+        for run in word_runs
+    }
+
+
+def compute_signature(source_file: str) -> Tuple[int, Optional[Tuple[int, ...]], Optional[str]]:
+    """
+    Compute the MinHash signature of an HTML file's visible text.
+    Runs in a worker process.
+
+    Args:
+        source_file (str): Path of the HTML file
+
+    Returns:
+        Tuple[int, Optional[Tuple[int, ...]], Optional[str]]: Number of shingles, the signature (None for
+                                                              empty or unreadable pages) and the read error
+    """
+    try:
+        with open(source_file, "r", encoding="utf-8", errors="replace") as file_stream:
+            shingles = get_shingles(html_to_markdown(file_stream.read()))
+    except OSError as e:
+        return 0, None, str(e)
+    if not shingles:
+        return 0, None, None
+    signature = tuple(
+        min((a * shingle + b) % _MERSENNE_PRIME for shingle in shingles)
+        for a, b in _PERMUTATIONS
+    )
+    return len(shingles), signature, None
+
+
+def estimate_similarity(signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+    """
+    Estimate the Jaccard similarity of two documents from their MinHash signatures.
+    """
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+
+def choose_bands(num_permutations: int, threshold: float) -> Tuple[int, int]:
+    """
+    Choose the LSH banding (bands, rows per band) for a similarity threshold.
+    The most rows per band are used whose candidate threshold (1/bands)^(1/rows) still lies below
+    the target, so few true duplicates are missed while keeping candidate pairs rare.
+
+    Returns:
+        Tuple[int, int]: Number of bands and rows per band
+    """
+    best = (num_permutations, 1)
+    for rows in range(1, num_permutations + 1):
+        if num_permutations % rows:
+            continue
+        bands = num_permutations // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def find_near_duplicates(html_files: List[Tuple[str, str]], threshold: float = DEFAULT_THRESHOLD,
+                         max_workers: int = MAX_SIGNATURE_WORKERS) -> Tuple[List[Dict], List[str]]:
+    """
+    Cluster near-duplicate HTML files with MinHash and LSH banding.
+    Only documents sharing at least one band bucket are compared, so the work stays
+    far below comparing every pair.
+
+    Args:
+        html_files (List[Tuple[str, str]]): List of (source_path, relative_path) tuples
+        threshold (float): Estimated Jaccard similarity at or above which two pages are duplicates
+        max_workers (int): Number of worker processes computing signatures
+
+    Returns:
+        Tuple[List[Dict], List[str]]: Clusters with more than one member, each as
+                                      {'canonical': relative_path, 'duplicates': [{'path', 'similarity'}]},
+                                      where every duplicate is at least threshold-similar to its canonical
+                                      page; and the relative paths of the files that could not be read
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(
+            compute_signature, [source_file for source_file, _ in html_files],
+            chunksize=max(1, len(html_files) // (max_workers * 4))
+        ))
+
+    unreadable = []
+    signatures: Dict[int, Tuple[int, ...]] = {}
+    for index, (_, signature, error) in enumerate(results):
+        if error is not None:
+            print(f"  ✗ Error reading {html_files[index][1]}: {error}")
+            unreadable.append(html_files[index][1])
+        elif signature is not None:
+            signatures[index] = signature
+
+    bands, rows = choose_bands(NUM_PERMUTATIONS, threshold)
+    buckets = defaultdict(list)
+    for index, signature in signatures.items():
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(index)
+
+    # Similar neighbours of every page, among the candidate pairs that pass the similarity check
+    neighbours: Dict[int, Dict[int, float]] = defaultdict(dict)
+    checked_pairs = set()
+    for members in buckets.values():
+        for position, first in enumerate(members):
+            for second in members[position + 1:]:
+                if (first, second) in checked_pairs:
+                    continue
+                checked_pairs.add((first, second))
+                similarity = estimate_similarity(signatures[first], signatures[second])
+                if similarity >= threshold:
+                    neighbours[first][second] = similarity
+                    neighbours[second][first] = similarity
+
+    # Greedy clustering around canonical pages, most complete first (ties go to the alphabetically
+    # first path). A page only joins a cluster if it is similar to that cluster's canonical page
+    # itself, so chains of slowly drifting pages are never merged past the threshold.
+    assigned = set()
+    near_duplicates: List[Dict] = []
+    for canonical in sorted(neighbours, key=lambda index: (-results[index][0], html_files[index][1])):
+        if canonical in assigned:
+            continue
+        duplicates = [index for index in neighbours[canonical] if index not in assigned]
+        if not duplicates:
+            continue
+        assigned.add(canonical)
+        assigned.update(duplicates)
+        near_duplicates.append({
+            'canonical': html_files[canonical][1],
+            'duplicates': [
+                {'path': html_files[index][1], 'similarity': round(neighbours[canonical][index], 3)}
+                for index in sorted(duplicates, key=lambda index: html_files[index][1])
+            ]
+        })
+    return sorted(near_duplicates, key=lambda cluster: cluster['canonical']), unreadable
+
+
+def write_mapping(mapping_path: str, clusters: List[Dict], threshold: float):
+    """
+    Write the duplicate -> canonical mapping so skipped pages can be traced later.
+    """
+    mapping = {
+        'threshold': threshold,
+        'num_permutations': NUM_PERMUTATIONS,
+        'shingle_size': SHINGLE_SIZE,
+        'clusters': clusters,
+        'skipped': {
+            duplicate['path']: cluster['canonical'] for cluster in clusters for duplicate in cluster['duplicates']
+        }
+    }
+    with open(mapping_path, "w", encoding="utf-8") as mapping_file:
+        json.dump(mapping, mapping_file, indent=2)
+
+
+def get_user_configuration():
+    """
+    Get directory, threshold and mapping file configuration from user input.
+    """
+    print("🧬 Near-Duplicate Filter Configuration Setup")
+    print("-" * 40)
+
+    # Get source directory
+    source_dir = input("Enter source directory path (to search for HTML files): ").strip()
+    while not source_dir:
+        print("Source directory path is required.")
+        source_dir = input("Enter source directory path (to search for HTML files): ").strip()
+
+    # Get destination directory
+    dest_dir = input("Enter destination directory path (where canonical files will be copied): ").strip()
+    while not dest_dir:
+        print("Destination directory path is required.")
+        dest_dir = input("Enter destination directory path (where canonical files will be copied): ").strip()
+
+    # Get similarity threshold
+    threshold = None
+    while threshold is None:
+        raw_threshold = input(f"Enter similarity threshold between 0 and 1 (leave empty for {DEFAULT_THRESHOLD}): ").strip()
+        try:
+            threshold = float(raw_threshold) if raw_threshold else DEFAULT_THRESHOLD
+        except ValueError:
+            threshold = None
+        if threshold is None or not 0 < threshold <= 1:
+            print("Threshold must be a number between 0 and 1.")
+            threshold = None
+
+    # Get mapping file path
+    mapping_path = input(f"Enter mapping file path (leave empty for '{DEFAULT_MAPPING_PATH}'): ").strip()
+
+    return {
+        'source_dir': source_dir,
+        'dest_dir': dest_dir,
+        'threshold': threshold,
+        'mapping_path': mapping_path or DEFAULT_MAPPING_PATH
+    }
+
+
+def deduplicate_html_files(config):
+    """
+    Find near-duplicate HTML files, record the mapping and copy one canonical page per cluster.
+    """
+    print("🔄 Starting Near-Duplicate Detection")
+    print("-" * 40)
+
+    try:
+        print(f"Searching for HTML files in: {config['source_dir']}")
+        html_files = find_html_files(config['source_dir'])
+        print(f"Found {len(html_files)} HTML file(s)")
+
+        print(f"\nComputing MinHash signatures (threshold {config['threshold']})...")
+        clusters, unreadable = find_near_duplicates(html_files, config['threshold'])
+        write_mapping(config['mapping_path'], clusters, config['threshold'])
+
+        skipped_paths = set()
+        for cluster in clusters:
+            print(f"  ⭐ {cluster['canonical']}")
+            for duplicate in cluster['duplicates']:
+                print(f"     ↳ {duplicate['path']} (similarity {duplicate['similarity']:.2f})")
+                skipped_paths.add(duplicate['path'])
+
+        print(f"\nClusters of near-duplicates: {len(clusters)}")
+        print(f"Pages skipped as duplicates: {len(skipped_paths)}")
+        print(f"Mapping written to: {config['mapping_path']}")
+
+        canonical_files = [html_file for html_file in html_files
+                           if html_file[1] not in skipped_paths and html_file[1] not in unreadable]
+        print(f"\nCopying {len(canonical_files)} canonical file(s) to: {config['dest_dir']}")
+        result = copy_and_rename_files(canonical_files, config['dest_dir'])
+        result['duplicate_count'] = len(skipped_paths)
+        result['failed_count'] = len(unreadable)
+        result['success'] = result['success'] and not unreadable
+        result['clusters'] = clusters
+
+        print(f"\nDeduplication Summary:")
+        print(f"Successfully copied: {result['copied_count']} files")
+        print(f"Files skipped: {result['skipped_count']} files")
+        print(f"Near-duplicates skipped: {result['duplicate_count']} files")
+        print(f"Unreadable files: {result['failed_count']} files")
+        return result
+
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return {
+            'success': False,
+            'copied_count': 0,
+            'skipped_count': 0,
+            'duplicate_count': 0,
+            'failed_count': 0,
+            'total_files': 0,
+            'clusters': []
+        }
+
+
+def main():
+    """Main function to handle user input and execute the script."""
+    print("\n")
+    print("=" * 50)
+    print("🧬 Near-Duplicate HTML Filter")
+    print("=" * 50)
+
+    # Get configuration from user
+    config = get_user_configuration()
+
+    # Show configuration summary
+    print(f"\nConfiguration Summary:")
+    print(f"Source directory: {config['source_dir']}")
+    print(f"Destination directory: {config['dest_dir']}")
+    print(f"Similarity threshold: {config['threshold']}")
+    print(f"Mapping file: {config['mapping_path']}")
+
+    # Confirm before proceeding
+    confirmation = input("\nProceed with near-duplicate filtering? Type 'YES' to confirm: ")
+
+    if confirmation == "YES":
+        result = deduplicate_html_files(config)
+        if result['success']:
+            print(f"\n✅ Near-duplicate filtering completed successfully!")
+        else:
+            print(f"\n❌ Near-duplicate filtering failed.")
+    else:
+        print("Operation cancelled.")
+
+
+if __name__ == "__main__":
+    main()
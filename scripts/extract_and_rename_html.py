@@ -1,7 +1,13 @@
 import os
 import shutil
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from upload_manifest import hash_file
 
 # ====== CONFIGURATION NOTES ======
 # This script will prompt for:
@@ -9,8 +15,13 @@ from typing import List, Tuple
 # - Destination Directory Path
 # - Dry Run Option
 # - Verbose Output Option
+# - Parallel Sync Option (zero-copy, skips unchanged files and refreshes outdated ones)
+# - Hardlink Option (if parallel sync is enabled)
 # ===================================
 
+MAX_COPY_WORKERS = 8
+FICLONE = 0x40049409    # Linux ioctl request for reflink copies
+
 
 def find_html_files(source_dir: str) -> List[Tuple[str, str]]:
     """
@@ -106,6 +117,222 @@ def copy_and_rename_files(html_files: List[Tuple[str, str]], dest_dir: str) -> d
     }
 
 
+def _reflink(source_file: str, dest_file: str) -> bool:
+    """
+    Clone source_file into dest_file with the FICLONE ioctl (Btrfs, XFS, ...).
+    Returns False if the platform or filesystem doesn't support reflinks.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    with open(source_file, "rb") as source_stream, open(dest_file, "wb") as dest_stream:
+        try:
+            fcntl.ioctl(dest_stream.fileno(), FICLONE, source_stream.fileno())
+            return True
+        except OSError:
+            return False
+
+
+def _copy_file_range(source_file: str, dest_file: str) -> bool:
+    """
+    Copy source_file into dest_file inside the kernel with os.copy_file_range.
+    Returns False if copy_file_range is unavailable or not supported between these files.
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    with open(source_file, "rb") as source_stream, open(dest_file, "wb") as dest_stream:
+        remaining = os.fstat(source_stream.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(source_stream.fileno(), dest_stream.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            return True
+        except OSError:
+            return False
+
+
+def fast_copy(source_file: str, dest_file: str, use_hardlinks: bool = False) -> str:
+    """
+    Copy a file using the cheapest primitive available and atomically replace dest_file.
+    Tries a hardlink (if requested), then a reflink, then copy_file_range, then a regular copy.
+
+    Args:
+        source_file (str): Path of the file to copy
+        dest_file (str): Destination path, replaced if it already exists
+        use_hardlinks (bool): Whether dest_file may share the inode of source_file
+
+    Returns:
+        str: Name of the primitive that was used
+    """
+    temp_file = f"{dest_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        method = None
+        if use_hardlinks:
+            try:
+                os.link(source_file, temp_file)
+                method = "hardlink"
+            except OSError:
+                pass
+        if method is None and _reflink(source_file, temp_file):
+            method = "reflink"
+        if method is None and _copy_file_range(source_file, temp_file):
+            method = "copy_file_range"
+        if method is None:
+            shutil.copyfile(source_file, temp_file)
+            method = "copy"
+        if method != "hardlink":
+            shutil.copystat(source_file, temp_file)
+        os.replace(temp_file, dest_file)
+        return method
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def is_up_to_date(source_file: str, dest_file: str) -> bool:
+    """
+    Check whether dest_file still holds the content of source_file.
+    Size and modification time are compared first; the content hash is only computed
+    when the sizes match but the timestamps differ.
+    """
+    try:
+        dest_stat = os.stat(dest_file)
+    except FileNotFoundError:
+        return False
+
+    source_stat = os.stat(source_file)
+    if os.path.samestat(source_stat, dest_stat):
+        return True
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if source_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+        return True
+    return bool(hash_file(source_file) == hash_file(dest_file))
+
+
+def _group_identical_files(html_files: List[Tuple[str, str]],
+                           max_workers: int) -> Tuple[List[List[Tuple[str, str]]], List[Tuple[str, str, str]]]:
+    """
+    Group files with identical content. Only files whose size collides with another file are hashed.
+    Files that can't be read are left out of the groups and returned as failed outcomes instead.
+    """
+    failed: List[Tuple[str, str, str]] = []
+    sizes: Dict[Tuple[str, str], int] = {}
+    for html_file in html_files:
+        try:
+            sizes[html_file] = os.path.getsize(html_file[0])
+        except OSError as e:
+            failed.append(('failed', html_file[1], str(e)))
+
+    files_by_size: Dict[int, List[Tuple[str, str]]] = defaultdict(list)
+    for html_file, size in sizes.items():
+        files_by_size[size].append(html_file)
+
+    def safe_hash(html_file: Tuple[str, str]) -> Tuple[Optional[str], Optional[str]]:
+        try:
+            return hash_file(html_file[0]), None
+        except OSError as e:
+            return None, str(e)
+
+    to_hash = [html_file for same_size in files_by_size.values() if len(same_size) > 1 for html_file in same_size]
+    content_hashes: Dict[Tuple[str, str], str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for html_file, (content_hash, error) in zip(to_hash, executor.map(safe_hash, to_hash)):
+            if content_hash is None:
+                failed.append(('failed', html_file[1], error or "unreadable"))
+                del sizes[html_file]
+            else:
+                content_hashes[html_file] = content_hash
+
+    groups: Dict[Tuple[int, str], List[Tuple[str, str]]] = defaultdict(list)
+    for html_file in sorted(sizes, key=lambda html_file: html_file[1]):
+        groups[(sizes[html_file], content_hashes.get(html_file, html_file[1]))].append(html_file)
+    return list(groups.values()), failed
+
+
+def sync_and_rename_files(html_files: List[Tuple[str, str]], dest_dir: str, max_workers: int = MAX_COPY_WORKERS,
+                          use_hardlinks: bool = False) -> dict:
+    """
+    Copy HTML files to destination directory with new names, in parallel and without redundant work.
+    Destination files that are up to date are left alone and outdated ones are refreshed.
+    Sources with identical content are copied once; the other destinations are hardlinked to that copy.
+
+    Args:
+        html_files (List[Tuple[str, str]]): List of (source_path, relative_path) tuples
+        dest_dir (str): Destination directory path
+        max_workers (int): Number of copy threads
+        use_hardlinks (bool): Whether destinations may be hardlinks to their source files
+
+    Returns:
+        dict: Results summary with success status, counts and throughput
+    """
+    dest_path = Path(dest_dir)
+    dest_path.mkdir(parents=True, exist_ok=True)
+    start_time = time.monotonic()
+
+    groups, unreadable = _group_identical_files(html_files, max_workers)
+
+    def sync_file(source_file: str, relative_path: str, primary_dest: Optional[str]) -> Tuple[str, str, str]:
+        new_filename = generate_new_filename(relative_path)
+        dest_file = str(dest_path / new_filename)
+        try:
+            if is_up_to_date(source_file, dest_file):
+                return 'unchanged', relative_path, new_filename
+            existed = os.path.exists(dest_file)
+            if primary_dest is not None:
+                # Identical content was already materialized for another source
+                fast_copy(primary_dest, dest_file, use_hardlinks=True)
+                return 'deduplicated', relative_path, new_filename
+            method = fast_copy(source_file, dest_file, use_hardlinks)
+            return ('refreshed' if existed else 'copied'), relative_path, f"{new_filename} [{method}]"
+        except Exception as e:
+            return 'failed', relative_path, str(e)
+
+    counts: Dict[str, int] = defaultdict(int)
+
+    def report(outcome: Tuple[str, str, str]):
+        status, relative_path, detail = outcome
+        counts[status] += 1
+        if status == 'failed':
+            print(f"  ✗ Error copying {relative_path}: {detail}")
+        elif status != 'unchanged':
+            print(f"  ✓ {status.capitalize()}: {relative_path} -> {detail}")
+
+    for outcome in unreadable:
+        report(outcome)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Primaries first, so duplicates can link to a destination that is already in place
+        for outcome in executor.map(lambda group: sync_file(group[0][0], group[0][1], None), groups):
+            report(outcome)
+        duplicates = [
+            (source_file, relative_path, str(dest_path / generate_new_filename(group[0][1])))
+            for group in groups for source_file, relative_path in group[1:]
+        ]
+        for outcome in executor.map(lambda duplicate: sync_file(*duplicate), duplicates):
+            report(outcome)
+
+    elapsed = time.monotonic() - start_time
+    total_files = len(html_files)
+    return {
+        'success': counts['failed'] == 0,
+        'copied_count': counts['copied'],
+        'refreshed_count': counts['refreshed'],
+        'deduplicated_count': counts['deduplicated'],
+        'unchanged_count': counts['unchanged'],
+        'skipped_count': counts['unchanged'] + counts['failed'],
+        'failed_count': counts['failed'],
+        'total_files': total_files,
+        'elapsed_seconds': elapsed,
+        'files_per_second': total_files / elapsed if elapsed > 0 else 0.0
+    }
+
+
 def get_user_configuration():
     """
     Get source and destination directory configuration from user input.
@@ -125,10 +352,20 @@ def get_user_configuration():
         print("Destination directory path is required.")
         dest_dir = input("Enter destination directory path (where renamed files will be copied): ").strip()
     
+    # Get copy mode
+    parallel = input("Use parallel sync (zero-copy, refreshes outdated copies)? (y/N): ").strip().lower() in ['y', 'yes']
+    use_hardlinks = False
+    if parallel:
+        use_hardlinks = input("Hardlink destination files to their sources when possible? (y/N): ").strip().lower() in ['y', 'yes']
+    
     return {
         'source_dir': source_dir,
-        'dest_dir': dest_dir
+        'dest_dir': dest_dir,
+        'parallel': parallel,
+        'use_hardlinks': use_hardlinks
     }
+
+
 def extract_and_rename_html_files(config):
     """
     Extract and rename HTML files from source to destination directory.
@@ -169,12 +406,25 @@ def extract_and_rename_html_files(config):
         
         # Copy and rename files
         print(f"\nCopying files to: {config['dest_dir']}")
-        result = copy_and_rename_files(html_files, config['dest_dir'])
+        start_time = time.monotonic()
+        if config.get('parallel'):
+            result = sync_and_rename_files(html_files, config['dest_dir'],
+                                           use_hardlinks=config.get('use_hardlinks', False))
+        else:
+            result = copy_and_rename_files(html_files, config['dest_dir'])
+        elapsed = time.monotonic() - start_time
         
         print(f"\nExtraction Summary:")
         print(f"Successfully copied: {result['copied_count']} files")
+        if config.get('parallel'):
+            print(f"Refreshed outdated copies: {result['refreshed_count']} files")
+            print(f"Deduplicated (linked to identical content): {result['deduplicated_count']} files")
+            print(f"Unchanged: {result['unchanged_count']} files")
+            print(f"Failed: {result['failed_count']} files")
         print(f"Files skipped: {result['skipped_count']} files")
         print(f"Total files processed: {result['total_files']}")
+        if elapsed > 0:
+            print(f"Throughput: {result['total_files'] / elapsed:.1f} files/s ({elapsed:.2f}s)")
         
         return result
         
@@ -202,6 +452,8 @@ def main():
     print(f"\nConfiguration Summary:")
     print(f"Source directory: {config['source_dir']}")
     print(f"Destination directory: {config['dest_dir']}")
+    print(f"Copy mode: {'parallel sync' if config['parallel'] else 'serial copy'}"
+          f"{' with hardlinks' if config['use_hardlinks'] else ''}")
     
     # Confirm before proceeding
     confirmation = input("\nProceed with HTML file extraction and renaming? Type 'YES' to confirm: ")
@@ -0,0 +1,87 @@
+import os
+import re
+import sys
+
+# Model names are defined once for tagging and for the dashboard's query filters
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from printer_models import normalize_model
+
+# ====== ATTRIBUTE NOTES ======
+# extract_and_rename_html.py flattens the documentation tree into dotted names,
+# e.g. 'printers.desktop.zd421.user-guide.en.index.html', and chunk_documents.py
+# appends a section ID ('....index.3f2a9c1b7d04.md'). The segments are matched
+# against the vocabularies below to derive vector store file attributes:
+#
+#   product   - product family ('desktop', 'industrial', 'mobile', ...)
+#   model     - printer model without variant suffix ('zd421', 'zt610', '105sl', ...),
+#               as defined by src/printer_models.py
+#   doc_type  - kind of document ('manual', 'troubleshooting', ...)
+#   language  - two-letter language code
+#
+# Every key is always set, with "" when nothing matched, so a query filter can
+# match "this model or no model" and keep general documents searchable.
+# The dashboard's search_filters.py uses the same keys.
+# =============================
+
+ATTRIBUTE_KEYS = ("product", "model", "doc_type", "language")
+
+PRODUCT_FAMILIES = {
+    "desktop": "desktop", "industrial": "industrial", "mobile": "mobile", "card": "card",
+    "card-printers": "card", "kiosk": "kiosk", "rfid": "rfid", "print-engines": "print-engine",
+    "print-engine": "print-engine", "healthcare": "healthcare", "label": "label"
+}
+
+DOC_TYPES = {
+    "manual": "manual", "manuals": "manual", "user-guide": "manual", "users-guide": "manual", "ug": "manual",
+    "quick-start": "quick-start", "quick-start-guide": "quick-start", "qsg": "quick-start",
+    "setup": "setup", "installation": "setup", "install": "setup",
+    "troubleshooting": "troubleshooting", "troubleshoot": "troubleshooting", "faq": "faq", "faqs": "faq",
+    "release-notes": "release-notes", "drivers": "drivers", "driver": "drivers", "firmware": "firmware",
+    "specifications": "specifications", "specs": "specifications", "spec-sheet": "specifications",
+    "programming": "programming", "zpl": "programming", "how-to": "how-to", "videos": "how-to",
+    "maintenance": "maintenance", "cleaning": "maintenance"
+}
+
+LANGUAGES = {
+    "en", "de", "fr", "es", "it", "pt", "nl", "pl", "cs", "ru", "tr", "ar", "he", "ja", "ko", "zh", "th", "vi",
+    "id", "sv", "da", "fi", "no", "hu", "ro"
+}
+
+_LANGUAGE_PATTERN = re.compile(r"^([a-z]{2})(?:[-_][a-z]{2})?$")
+_SECTION_ID_PATTERN = re.compile(r"^[0-9a-f]{12}$")
+
+
+def filename_segments(filename):
+    """
+    Split a dotted filename into lower-case segments, without the extension and section ID.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0].lower()
+    segments = stem.split(".")
+    if segments and _SECTION_ID_PATTERN.match(segments[-1]):
+        segments.pop()
+    return segments
+
+
+def derive_file_attributes(filename):
+    """
+    Derive the product, model, doc_type and language attributes from a dotted filename.
+    The first match wins for product. The last wins for model and doc_type: deeper segments are
+    more specific, e.g. the model folder 'zt411-plus' below the series folder 'zt400'.
+
+    Returns:
+        dict: All ATTRIBUTE_KEYS, with "" for attributes that couldn't be derived
+    """
+    attributes = dict.fromkeys(ATTRIBUTE_KEYS, "")
+    for segment in filename_segments(filename):
+        if not attributes['product'] and segment in PRODUCT_FAMILIES:
+            attributes['product'] = PRODUCT_FAMILIES[segment]
+        elif segment in DOC_TYPES:
+            attributes['doc_type'] = DOC_TYPES[segment]
+        elif normalize_model(segment):
+            attributes['model'] = normalize_model(segment)
+        elif not attributes['language']:
+            language = _LANGUAGE_PATTERN.match(segment)
+            if language and language.group(1) in LANGUAGES:
+                attributes['language'] = language.group(1)
+    return attributes
@@ -0,0 +1,282 @@
+import asyncio
+import time
+from openai import NotFoundError
+
+from async_engine import run_with_engine
+from client_config import get_connection_configuration
+from bulk_delete_data_files import MAX_DELETE_WORKERS, MAX_DELETES_PER_SECOND, delete_file
+from upload_verification import FAILED_STATUSES, FILES_PAGE_SIZE, VECTOR_STORE_FILES_PAGE_SIZE
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Azure OpenAI API Key (masked input)
+# - Azure Endpoint
+# - API Version
+# - Grace Period (hours; anything newer is never collected)
+# - Whether to reclaim the garbage or only report it
+#
+# Garbage is:
+# - Orphaned files: uploaded files that no vector store references
+# - Dangling entries: vector store entries whose file is gone, or whose indexing failed
+# ===================================
+
+DEFAULT_GRACE_PERIOD_HOURS = 24     # Protects uploads that are not yet attached to their vector store
+VECTOR_STORES_PAGE_SIZE = 100
+
+
+def get_user_configuration():
+    """
+    Get Azure OpenAI configuration from user input.
+    """
+    connection = get_connection_configuration()
+
+    # Get Grace Period
+    grace_period_hours = None
+    while grace_period_hours is None:
+        raw_hours = input(f"Enter grace period in hours (leave empty for {DEFAULT_GRACE_PERIOD_HOURS}): ").strip()
+        try:
+            grace_period_hours = float(raw_hours) if raw_hours else DEFAULT_GRACE_PERIOD_HOURS
+        except ValueError:
+            print("Grace period must be a number of hours.")
+
+    # Get Reclaim Mode
+    reclaim = input("Reclaim the garbage found (otherwise only report it)? (y/N): ").strip().lower()
+
+    return {
+        **connection,
+        'grace_period_hours': grace_period_hours,
+        'reclaim': reclaim in ['y', 'yes']
+    }
+
+
+async def list_all_vector_store_files(engine):
+    """
+    List the file entries of every vector store, all stores concurrently within the engine's limits.
+    Returns vector store ID -> list of file entries.
+    """
+    client = engine.client
+    vector_store_ids = [
+        vector_store.id async for vector_store in engine.paginate(client.vector_stores.list, VECTOR_STORES_PAGE_SIZE)
+    ]
+    print(f"Found {len(vector_store_ids)} vector stores.")
+
+    async def list_store(vector_store_id):
+        return [entry async for entry in engine.paginate(
+            client.vector_stores.files.list, VECTOR_STORE_FILES_PAGE_SIZE, vector_store_id=vector_store_id
+        )]
+
+    return dict(zip(vector_store_ids, await asyncio.gather(*map(list_store, vector_store_ids))))
+
+
+async def check_unlisted_files(engine, file_ids):
+    """
+    Retrieve referenced files that the bulk listing didn't return.
+    Only files the service reports as not found count as missing; any other error leaves
+    the file alone, since a transient failure must never make an entry look dangling.
+
+    Returns:
+        Tuple[dict, set]: Retrieved files keyed by ID, and the IDs that no longer exist
+    """
+    async def check(file_id):
+        try:
+            return await engine.call(engine.client.files.retrieve, file_id=file_id)
+        except NotFoundError:
+            return None
+
+    retrieved = {}
+    missing_ids = set()
+    for file_id, file in zip(file_ids, await engine.map(check, file_ids)):
+        if isinstance(file, Exception):
+            print(f"  ⚠️  Could not check file {file_id}: {file}")
+        elif file is None:
+            missing_ids.add(file_id)
+        else:
+            retrieved[file_id] = file
+    return retrieved, missing_ids
+
+
+async def find_garbage(engine, grace_period_hours=DEFAULT_GRACE_PERIOD_HOURS):
+    """
+    Compute orphaned files and dangling vector store entries.
+    Files and entries created within the grace period are never reported, so uploads that are
+    still being attached or indexed are left alone.
+
+    Returns:
+        dict: 'orphaned_files' (file objects), 'dangling_entries' ((vector store ID, entry, reason) tuples)
+              and listing counts
+    """
+    cutoff = time.time() - grace_period_hours * 3600
+
+    # Files are listed before the vector stores: a file uploaded and attached in between shows up
+    # as referenced-but-unlisted and is checked individually below instead of being treated as gone
+    file_index = {file.id: file async for file in engine.paginate(engine.client.files.list, FILES_PAGE_SIZE,
+                                                                  purpose="assistants")}
+    print(f"Found {len(file_index)} uploaded files.")
+    store_files = await list_all_vector_store_files(engine)
+
+    reference_counts = {}
+    for entries in store_files.values():
+        for entry in entries:
+            reference_counts[entry.id] = reference_counts.get(entry.id, 0) + 1
+    referenced_ids = set(reference_counts)
+
+    unlisted_ids = sorted(referenced_ids - file_index.keys())
+    missing_ids = set()
+    if unlisted_ids:
+        print(f"Checking {len(unlisted_ids)} referenced file(s) missing from the listing...")
+        retrieved, missing_ids = await check_unlisted_files(engine, unlisted_ids)
+        file_index.update(retrieved)
+
+    orphaned_files = sorted(
+        (file_index[file_id] for file_id in file_index.keys() - referenced_ids if file_index[file_id].created_at < cutoff),
+        key=lambda file: file.created_at
+    )
+
+    dangling_entries = []
+    for vector_store_id, entries in store_files.items():
+        for entry in entries:
+            if getattr(entry, 'created_at', 0) >= cutoff:
+                continue
+            if entry.id in missing_ids:
+                dangling_entries.append((vector_store_id, entry, "file no longer exists"))
+            elif entry.status in FAILED_STATUSES:
+                last_error = getattr(entry, 'last_error', None)
+                dangling_entries.append((vector_store_id, entry, getattr(last_error, 'message', None) or entry.status))
+
+    failed_entry_ids = {entry.id for _, entry, _ in dangling_entries if entry.id not in missing_ids}
+
+    return {
+        'orphaned_files': orphaned_files,
+        'dangling_entries': dangling_entries,
+        'failed_entry_files': [file_index[file_id] for file_id in sorted(failed_entry_ids) if file_id in file_index],
+        'reference_counts': reference_counts,
+        'file_count': len(file_index),
+        'vector_store_count': len(store_files),
+        'entry_count': sum(reference_counts.values())
+    }
+
+
+async def detach_entry(engine, vector_store_id, file_id):
+    """
+    Remove an entry from a vector store. An entry that is already gone counts as removed.
+    Returns None on success, otherwise the error message.
+    """
+    try:
+        await engine.call(engine.client.vector_stores.files.delete, file_id, vector_store_id=vector_store_id)
+        return None
+    except NotFoundError:
+        return None
+    except Exception as e:
+        return str(e)
+
+
+async def reclaim_garbage(engine, garbage):
+    """
+    Detach the dangling entries, then delete the orphaned files together with the files of
+    failed entries that no other vector store still references.
+    """
+    detached_count = 0
+    failed_count = 0
+    freed_bytes = 0
+
+    entries = garbage['dangling_entries']
+    errors = await engine.map(lambda item: detach_entry(engine, item[0], item[1].id), entries)
+    detached_references = {}
+    for (vector_store_id, entry, _), error in zip(entries, errors):
+        if error:
+            print(f"  ✗ Failed to detach {entry.id} from {vector_store_id}: {error}")
+            failed_count += 1
+        else:
+            print(f"  ✓ Detached {entry.id} from {vector_store_id}")
+            detached_count += 1
+            detached_references[entry.id] = detached_references.get(entry.id, 0) + 1
+
+    # A failed entry's file becomes an orphan once every store referencing it has dropped it
+    files_to_delete = list(garbage['orphaned_files'])
+    for file in garbage['failed_entry_files']:
+        if detached_references.get(file.id) == garbage['reference_counts'].get(file.id):
+            files_to_delete.append(file)
+
+    results = await engine.map(lambda file: delete_file(engine, file), files_to_delete)
+
+    deleted_count = 0
+    for file, result in zip(files_to_delete, results):
+        if result['status'] == 'failed':
+            print(f"  ✗ Failed to delete '{file.filename}' (ID: {file.id}): {result['error']}")
+            failed_count += 1
+        else:
+            print(f"  ✓ Deleted '{file.filename}' (ID: {file.id})")
+            deleted_count += 1
+            freed_bytes += getattr(file, 'bytes', 0) or 0
+
+    return {
+        'success': failed_count == 0,
+        'detached_count': detached_count,
+        'deleted_count': deleted_count,
+        'failed_count': failed_count,
+        'freed_bytes': freed_bytes
+    }
+
+
+def print_garbage_report(garbage):
+    """
+    Print the orphaned files and dangling entries found.
+    """
+    print(f"\nScanned {garbage['file_count']} files and {garbage['entry_count']} entries "
+          f"in {garbage['vector_store_count']} vector stores.")
+
+    orphaned_bytes = sum(getattr(file, 'bytes', 0) or 0 for file in garbage['orphaned_files'])
+    print(f"\nOrphaned files ({len(garbage['orphaned_files'])}, {orphaned_bytes / (1024 * 1024):.1f} MB):")
+    for file in garbage['orphaned_files']:
+        print(f"  🗑️  '{file.filename}' (ID: {file.id})")
+
+    print(f"\nDangling vector store entries ({len(garbage['dangling_entries'])}):")
+    for vector_store_id, entry, reason in garbage['dangling_entries']:
+        print(f"  🔗 {entry.id} in {vector_store_id}: {reason}")
+
+
+if __name__ == "__main__":
+    print("\n")
+    print("=" * 50)
+    print("♻️  Garbage Collector for Azure OpenAI Files")
+    print("=" * 50)
+
+    # Get configuration from user
+    config = get_user_configuration()
+    engine_options = {'max_concurrency': MAX_DELETE_WORKERS, 'max_requests_per_second': MAX_DELETES_PER_SECOND}
+
+    try:
+        garbage = run_with_engine(config, lambda engine: find_garbage(engine, config['grace_period_hours']),
+                                  **engine_options)
+    except Exception as e:
+        print(f"❌ Error listing files and vector stores: {e}")
+        exit(1)
+
+    print_garbage_report(garbage)
+
+    if not garbage['orphaned_files'] and not garbage['dangling_entries']:
+        print("\n✅ Nothing to collect!")
+        exit(0)
+
+    if not config['reclaim']:
+        print("\n📋 Report only, nothing was deleted.")
+        exit(0)
+
+    # Show warning and confirm before proceeding
+    print(f"\n⚠️  WARNING: This will delete the orphaned files and detach the dangling entries listed above!")
+    print("This action cannot be undone!")
+    confirmation = input("\nAre you sure you want to proceed? Type 'YES' to confirm: ")
+
+    if confirmation == "YES":
+        result = run_with_engine(config, lambda engine: reclaim_garbage(engine, garbage), **engine_options)
+        print(f"\nGarbage Collection Summary:")
+        print(f"Entries detached: {result['detached_count']}")
+        print(f"Files deleted: {result['deleted_count']}")
+        print(f"Failures: {result['failed_count']}")
+        print(f"Storage freed: {result['freed_bytes'] / (1024 * 1024):.1f} MB")
+        if result['success']:
+            print(f"\n✅ Garbage collection completed!")
+        else:
+            print(f"\n❌ Garbage collection completed with errors.")
+    else:
+        print("Operation cancelled.")
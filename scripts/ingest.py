@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+from pathlib import Path
+
+from async_engine import DEFAULT_MAX_RETRIES, add_engine_arguments, create_engine
+from batch_builder import MAX_BATCH_BYTES, MAX_BATCH_FILES
+from bulk_delete_data_files import DEFAULT_RESULT_LOG_PATH, delete_files
+from bulk_upload_to_vector_store import (DEFAULT_JOURNAL_PATH, DEFAULT_MANIFEST_PATH, MAX_CONCURRENT_BATCHES,
+                                         MAX_UPLOAD_WORKERS, build_chunking_strategy, sync_directory_to_vector_store,
+                                         upload_files_to_vector_store)
+from client_config import add_connection_arguments, initialize_client, load_client_config
+from upload_journal import UploadJournal
+from upload_verification import verify_vector_store
+
+# ====== CLI NOTES ======
+# Non-interactive entry point for unattended pipelines:
+#
+#   python scripts/ingest.py upload DIRECTORY (--vector-store-id ID [--sync] | --vector-store-name NAME)
+#   python scripts/ingest.py verify --vector-store-id ID [--directory DIRECTORY] [--manifest PATH]
+#   python scripts/ingest.py delete [filters] (--dry-run | --yes)
+#
+# upload runs the uploader of bulk_upload_to_vector_store.py (journal, manifest and
+# delta sync included); verify and delete run the engine functions of
+# upload_verification.py and bulk_delete_data_files.py on async_engine.py.
+# Connection settings come from flags or AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT
+# and OPENAI_API_VERSION. Every command can write a JSON report with --report and
+# exits with status 1 if anything failed.
+# =======================
+
+
+def upload_directory(client, directory_path, vector_store_id=None, vector_store_name=None, sync=False,
+                     manifest_path=DEFAULT_MANIFEST_PATH, dry_run=False, journal_path=DEFAULT_JOURNAL_PATH,
+                     max_batch_files=MAX_BATCH_FILES, max_batch_bytes=MAX_BATCH_BYTES,
+                     max_upload_workers=MAX_UPLOAD_WORKERS, max_concurrent_batches=MAX_CONCURRENT_BATCHES,
+                     chunking_strategy=None, tag_attributes=True):
+    """
+    Run the uploader of bulk_upload_to_vector_store.py unattended: a full upload into a new or
+    existing vector store, or with sync a manifest-based delta sync. Both resume from the journal.
+    The uploader's progress output goes to stderr, so a report on stdout stays parseable.
+
+    Returns:
+        dict: JSON-serializable summary with per-file results
+    """
+    with UploadJournal(journal_path) as journal, contextlib.redirect_stdout(sys.stderr):
+        if sync:
+            result = sync_directory_to_vector_store(
+                client, directory_path, vector_store_id, manifest_path, dry_run=dry_run,
+                max_batch_files=max_batch_files, max_batch_bytes=max_batch_bytes,
+                max_upload_workers=max_upload_workers, max_concurrent_batches=max_concurrent_batches,
+                journal=journal, chunking_strategy=chunking_strategy, tag_attributes=tag_attributes
+            )
+            return {'vector_store_id': vector_store_id, **result}
+
+        result = upload_files_to_vector_store(
+            client, directory_path, vector_store_name=vector_store_name, vector_store_id=vector_store_id,
+            max_batch_files=max_batch_files, max_batch_bytes=max_batch_bytes,
+            max_upload_workers=max_upload_workers, max_concurrent_batches=max_concurrent_batches,
+            journal=journal, chunking_strategy=chunking_strategy, tag_attributes=tag_attributes
+        )
+
+    vector_store = result.pop('vector_store')
+    result['vector_store_id'] = vector_store.id if vector_store else None
+    result['batch_count'] = len(result.pop('file_batches'))
+    result['file_results'] = [
+        {key: file_result.get(key) for key in ('path', 'file_id', 'status', 'error')}
+        for file_result in result['file_results']
+    ]
+    return result
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Non-interactive vector store ingestion tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    upload_parser = subparsers.add_parser("upload", help="Upload a directory into a vector store")
+    upload_parser.add_argument("directory")
+    target = upload_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--vector-store-id")
+    target.add_argument("--vector-store-name", help="Create a new vector store with this name")
+    upload_parser.add_argument("--sync", action="store_true",
+                               help="Only upload new/changed files and remove deleted ones (needs --vector-store-id)")
+    upload_parser.add_argument("--manifest", default=DEFAULT_MANIFEST_PATH, help="Upload manifest used by --sync")
+    upload_parser.add_argument("--dry-run", action="store_true", help="With --sync, only print the planned changes")
+    upload_parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="Upload journal for resuming")
+    upload_parser.add_argument("--max-batch-files", type=int, default=MAX_BATCH_FILES)
+    upload_parser.add_argument("--max-batch-bytes", type=int, default=MAX_BATCH_BYTES)
+    upload_parser.add_argument("--max-upload-workers", type=int, default=MAX_UPLOAD_WORKERS)
+    upload_parser.add_argument("--max-concurrent-batches", type=int, default=MAX_CONCURRENT_BATCHES)
+    upload_parser.add_argument("--chunk-size", type=int, help="Static chunk size in tokens")
+    upload_parser.add_argument("--chunk-overlap", type=int, default=0, help="Static chunk overlap in tokens")
+    upload_parser.add_argument("--no-attributes", action="store_true",
+                               help="Don't tag files with attributes derived from their names")
+
+    verify_parser = subparsers.add_parser("verify", help="Verify a vector store against a directory")
+    verify_parser.add_argument("--vector-store-id", required=True)
+    verify_parser.add_argument("--directory")
+    verify_parser.add_argument("--manifest", help="Upload manifest for content hash comparison")
+
+    delete_parser = subparsers.add_parser("delete", help="Delete files matching filters")
+    delete_parser.add_argument("--purpose")
+    delete_parser.add_argument("--older-than-days", type=float)
+    delete_parser.add_argument("--pattern", help="Filename glob pattern")
+    delete_parser.add_argument("--vector-store-id", action="append", default=[],
+                               help="Only files attached to this vector store (repeatable)")
+    delete_parser.add_argument("--keep-vector-store-id", action="append", default=[],
+                               help="Never files attached to this vector store (repeatable)")
+    delete_parser.add_argument("--result-log", default=DEFAULT_RESULT_LOG_PATH)
+    mode = delete_parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--dry-run", action="store_true")
+    mode.add_argument("--yes", action="store_true", help="Confirm deletion")
+
+    # Uploads go through the threaded uploader; verify and delete through the async engine
+    add_connection_arguments(upload_parser)
+    upload_parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    for subparser in (verify_parser, delete_parser):
+        add_engine_arguments(subparser)
+    for subparser in (upload_parser, verify_parser, delete_parser):
+        subparser.add_argument("--report", help="Write the result as JSON to this path ('-' for stdout)")
+    return parser
+
+
+def run_upload(args, client=None):
+    """
+    Run a parsed upload command. client= injects a synchronous client instead of creating one from the flags.
+    """
+    if args.sync and not args.vector_store_id:
+        raise ValueError("--sync needs --vector-store-id")
+    if client is None:
+        client = initialize_client(load_client_config(args.api_key, args.endpoint, args.api_version),
+                                   max_retries=args.max_retries)
+        if client is None:
+            raise ValueError("Could not create the Azure OpenAI client")
+
+    chunking_strategy = build_chunking_strategy(args.chunk_size, args.chunk_overlap) if args.chunk_size else None
+    return upload_directory(
+        client, args.directory, vector_store_id=args.vector_store_id, vector_store_name=args.vector_store_name,
+        sync=args.sync, manifest_path=args.manifest, dry_run=args.dry_run, journal_path=args.journal,
+        max_batch_files=args.max_batch_files, max_batch_bytes=args.max_batch_bytes,
+        max_upload_workers=args.max_upload_workers, max_concurrent_batches=args.max_concurrent_batches,
+        chunking_strategy=chunking_strategy, tag_attributes=not args.no_attributes
+    )
+
+
+async def run_command(args, client=None):
+    """
+    Run a parsed verify or delete command. client= injects a client instead of creating one from the flags.
+    """
+    async with create_engine(args, client) as engine:
+        if args.command == "verify":
+            return await verify_vector_store(engine, args.vector_store_id, args.directory, args.manifest)
+        return await delete_files(
+            engine, purpose=args.purpose, older_than_days=args.older_than_days, filename_pattern=args.pattern,
+            vector_store_ids=args.vector_store_id, keep_vector_store_ids=args.keep_vector_store_id,
+            dry_run=args.dry_run, result_log_path=args.result_log
+        )
+
+
+def print_summary(result):
+    """
+    Print the scalar fields of a result to stderr.
+    """
+    for key, value in result.items():
+        if isinstance(value, (list, dict)):
+            if key != 'file_results':
+                print(f"{key}: {len(value)}", file=sys.stderr)
+        elif isinstance(value, float):
+            print(f"{key}: {value:.2f}", file=sys.stderr)
+        else:
+            print(f"{key}: {value}", file=sys.stderr)
+
+
+def main(argv=None, client=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "upload":
+            result = run_upload(args, client)
+        else:
+            result = asyncio.run(run_command(args, client))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    print_summary(result)
+    if args.report:
+        report = json.dumps(result, indent=2, default=str)
+        if args.report == "-":
+            print(report)
+        else:
+            Path(args.report).write_text(report, encoding="utf-8")
+    return 0 if result['success'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
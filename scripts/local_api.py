@@ -0,0 +1,366 @@
+import asyncio
+import itertools
+import operator
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from openai import NotFoundError
+
+from local_vector_store import LocalVectorStore
+
+# ====== LOCAL API NOTES ======
+# In-process stand-in for the parts of the Azure OpenAI files and vector store
+# API the ingestion scripts use, for benchmarks that must not touch the real
+# service. Every call sleeps for a configurable latency; uploads also pay a
+# per-MB transfer time and attached files stay in_progress for a simulated
+# indexing time. LocalAzureOpenAI has the sync client surface and
+# AsyncLocalAzureOpenAI the async one; both can share one LocalAPIState.
+# ==============================
+
+DEFAULT_REQUEST_LATENCY = 0.02          # Seconds per API call
+DEFAULT_UPLOAD_SECONDS_PER_MB = 0.05
+DEFAULT_INDEX_SECONDS_PER_FILE = 0.002  # Indexing time of a batch grows with its size
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq, "ne": operator.ne, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le
+}
+
+
+def matches_filter(attributes: dict, filters: dict) -> bool:
+    """
+    Evaluate a file_search attribute filter: comparison (eq, ne, gt, gte, lt, lte) or compound (and, or).
+    """
+    if filters['type'] in ("and", "or"):
+        results = (matches_filter(attributes, nested) for nested in filters['filters'])
+        return all(results) if filters['type'] == "and" else any(results)
+    value = attributes.get(filters['key'])
+    if value is None:
+        return False
+    return _COMPARISONS[filters['type']](value, filters['value'])
+
+
+def _not_found(message: str) -> NotFoundError:
+    request = httpx.Request("GET", "https://local-api.invalid")
+    return NotFoundError(message, response=httpx.Response(404, request=request), body=None)
+
+
+class LocalPage:
+    """
+    Cursor page with the SDK's data/has_more fields. Iterating yields every remaining item,
+    like the SDK's auto-paginating pages.
+    """
+
+    def __init__(self, items, limit=None, after=None):
+        items = list(items)
+        if after is not None:
+            positions = {item.id: position for position, item in enumerate(items)}
+            items = items[positions[after] + 1:] if after in positions else []
+        self._items = items
+        limit = limit or len(items) or 1
+        self.data = items[:limit]
+        self.has_more = len(items) > limit
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class LatencyModel:
+    """
+    Latency injected into every call, with optional jitter.
+    """
+
+    def __init__(self, request_latency: float = DEFAULT_REQUEST_LATENCY,
+                 upload_seconds_per_mb: float = DEFAULT_UPLOAD_SECONDS_PER_MB,
+                 index_seconds_per_file: float = DEFAULT_INDEX_SECONDS_PER_FILE,
+                 jitter: float = 0.2, seed: int = 0):
+        self.request_latency = request_latency
+        self.upload_seconds_per_mb = upload_seconds_per_mb
+        self.index_seconds_per_file = index_seconds_per_file
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    def delay(self, uploaded_bytes: int = 0) -> float:
+        base = self.request_latency + self.upload_seconds_per_mb * uploaded_bytes / (1024 * 1024)
+        return base * (1 + self.random.uniform(-self.jitter, self.jitter))
+
+
+class LocalAPIState:
+    """
+    Files, vector stores and batches held in memory. All operations are thread-safe.
+    """
+
+    def __init__(self, latency: Optional[LatencyModel] = None, index_failure_rate: float = 0.0,
+                 keep_contents: bool = False, seed: int = 0):
+        self.latency = latency or LatencyModel()
+        self.index_failure_rate = index_failure_rate
+        self.keep_contents = keep_contents
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.files: Dict[str, SimpleNamespace] = {}
+        self.contents: Dict[str, bytes] = {}
+        self.vector_stores: Dict[str, dict] = {}
+        self.batches: Dict[str, SimpleNamespace] = {}
+        self.call_counts: Dict[str, int] = {}
+
+    def _next_id(self, prefix: str) -> str:
+        return f"{prefix}{next(self.ids):012d}"
+
+    def _store(self, vector_store_id: str) -> dict:
+        store = self.vector_stores.get(vector_store_id)
+        if store is None:
+            raise _not_found(f"Vector store {vector_store_id} not found")
+        return store
+
+    def _refresh(self, entry: SimpleNamespace):
+        """Settle an entry whose simulated indexing time has passed."""
+        if entry.status == "in_progress" and time.monotonic() >= entry.ready_at:
+            entry.status = entry.final_status
+
+    # files
+    def create_file(self, file, purpose):
+        if isinstance(file, tuple):
+            filename, content = file[0], file[1]
+        else:
+            filename, content = os.path.basename(file.name), file.read()
+        with self.lock:
+            file_id = self._next_id("assistant-")
+            self.files[file_id] = SimpleNamespace(
+                id=file_id, filename=filename, bytes=len(content), purpose=purpose,
+                created_at=int(time.time()), status="processed", object="file"
+            )
+            if self.keep_contents:
+                self.contents[file_id] = content
+            return self.files[file_id]
+
+    def list_files(self, limit=None, after=None, purpose=None, **kwargs):
+        with self.lock:
+            items = [file for file in self.files.values() if purpose in (None, file.purpose)]
+        return LocalPage(items, limit, after)
+
+    def retrieve_file(self, file_id):
+        with self.lock:
+            if file_id not in self.files:
+                raise _not_found(f"File {file_id} not found")
+            return self.files[file_id]
+
+    def delete_file(self, file_id):
+        with self.lock:
+            if self.files.pop(file_id, None) is None:
+                raise _not_found(f"File {file_id} not found")
+            self.contents.pop(file_id, None)
+            return SimpleNamespace(id=file_id, deleted=True, object="file")
+
+    # vector stores
+    def create_vector_store(self, name=None, **kwargs):
+        with self.lock:
+            vector_store_id = self._next_id("vs_")
+            vector_store = SimpleNamespace(id=vector_store_id, name=name, created_at=int(time.time()),
+                                           object="vector_store")
+            self.vector_stores[vector_store_id] = {'object': vector_store, 'files': {}, 'index': LocalVectorStore()}
+            return vector_store
+
+    def retrieve_vector_store(self, vector_store_id):
+        with self.lock:
+            return self._store(vector_store_id)['object']
+
+    def list_vector_stores(self, limit=None, after=None, **kwargs):
+        with self.lock:
+            items = [store['object'] for store in self.vector_stores.values()]
+        return LocalPage(items, limit, after)
+
+    def search_vector_store(self, vector_store_id, query, max_num_results=10, filters=None, **kwargs):
+        with self.lock:
+            store = self._store(vector_store_id)
+            file_names = None
+            if filters:
+                file_names = {file_id for file_id, entry in store['files'].items()
+                              if matches_filter(entry.attributes or {}, filters)}
+            results = store['index'].search(query, max_num_results=max_num_results, file_names=file_names)
+        return LocalPage([
+            SimpleNamespace(file_id=result['file_name'], score=result['score'],
+                            content=[SimpleNamespace(type="text", text=result['text'])])
+            for result in results
+        ])
+
+    # vector store files
+    def _attach(self, store, file_id, ready_at, chunking_strategy=None, attributes=None):
+        if file_id not in self.files:
+            raise _not_found(f"File {file_id} not found")
+        failed = self.random.random() < self.index_failure_rate
+        entry = SimpleNamespace(
+            id=file_id, vector_store_id=store['object'].id, created_at=int(time.time()), status="in_progress",
+            ready_at=ready_at, final_status="failed" if failed else "completed",
+            last_error=SimpleNamespace(code="server_error", message="Simulated indexing failure") if failed else None,
+            chunking_strategy=chunking_strategy, attributes=attributes, object="vector_store.file"
+        )
+        store['files'][file_id] = entry
+        if self.keep_contents and not failed and file_id in self.contents:
+            store['index'].add_file(file_id, self.contents[file_id].decode("utf-8", errors="replace"))
+        return entry
+
+    def create_vector_store_file(self, vector_store_id, file_id, chunking_strategy=None, attributes=None,
+                                 **kwargs):
+        with self.lock:
+            ready_at = time.monotonic() + self.latency.index_seconds_per_file
+            return self._attach(self._store(vector_store_id), file_id, ready_at, chunking_strategy, attributes)
+
+    def update_vector_store_file(self, file_id, vector_store_id, attributes=None, **kwargs):
+        with self.lock:
+            entry = self._store(vector_store_id)['files'].get(file_id)
+            if entry is None:
+                raise _not_found(f"File {file_id} not in vector store {vector_store_id}")
+            entry.attributes = attributes
+            self._refresh(entry)
+            return entry
+
+    def list_vector_store_files(self, vector_store_id, limit=None, after=None, filter=None, **kwargs):
+        with self.lock:
+            entries = list(self._store(vector_store_id)['files'].values())
+            for entry in entries:
+                self._refresh(entry)
+        return LocalPage([entry for entry in entries if filter in (None, entry.status)], limit, after)
+
+    def delete_vector_store_file(self, file_id, vector_store_id):
+        with self.lock:
+            if self._store(vector_store_id)['files'].pop(file_id, None) is None:
+                raise _not_found(f"File {file_id} not in vector store {vector_store_id}")
+            return SimpleNamespace(id=file_id, deleted=True, object="vector_store.file.deleted")
+
+    # file batches
+    def create_file_batch(self, vector_store_id, file_ids, chunking_strategy=None, attributes=None, **kwargs):
+        with self.lock:
+            store = self._store(vector_store_id)
+            ready_at = time.monotonic() + self.latency.index_seconds_per_file * len(file_ids)
+            entries = [self._attach(store, file_id, ready_at, chunking_strategy, attributes) for file_id in file_ids]
+            batch_id = self._next_id("vsfb_")
+            self.batches[batch_id] = SimpleNamespace(id=batch_id, vector_store_id=vector_store_id, entries=entries)
+            return self._batch_view(self.batches[batch_id])
+
+    def _batch_view(self, batch):
+        for entry in batch.entries:
+            self._refresh(entry)
+        counts = {status: sum(1 for entry in batch.entries if entry.status == status)
+                  for status in ("in_progress", "completed", "failed", "cancelled")}
+        return SimpleNamespace(
+            id=batch.id, vector_store_id=batch.vector_store_id, object="vector_store.files_batch",
+            status="in_progress" if counts['in_progress'] else "completed",
+            file_counts=SimpleNamespace(total=len(batch.entries), **counts)
+        )
+
+    def retrieve_file_batch(self, batch_id, vector_store_id):
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None or batch.vector_store_id != vector_store_id:
+                raise _not_found(f"File batch {batch_id} not found")
+            return self._batch_view(batch)
+
+    def list_file_batch_files(self, batch_id, vector_store_id, limit=None, after=None, filter=None, **kwargs):
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None or batch.vector_store_id != vector_store_id:
+                raise _not_found(f"File batch {batch_id} not found")
+            for entry in batch.entries:
+                self._refresh(entry)
+            entries = [entry for entry in batch.entries if filter in (None, entry.status)]
+        return LocalPage(entries, limit, after)
+
+
+def _uploaded_bytes(kwargs) -> int:
+    file = kwargs.get('file')
+    if isinstance(file, tuple):
+        return len(file[1])
+    if file is not None and hasattr(file, 'name'):
+        try:
+            return os.path.getsize(file.name)
+        except (OSError, TypeError):
+            return 0
+    return 0
+
+
+def _build_surface(state: LocalAPIState, wrap: Callable) -> SimpleNamespace:
+    """
+    Arrange the state's operations into the client's resource layout, each wrapped with latency.
+    """
+    def op(name, function):
+        return wrap(name, function)
+
+    vector_stores = SimpleNamespace(
+        create=op("vector_stores.create", state.create_vector_store),
+        retrieve=op("vector_stores.retrieve", state.retrieve_vector_store),
+        list=op("vector_stores.list", state.list_vector_stores),
+        search=op("vector_stores.search", state.search_vector_store),
+        files=SimpleNamespace(
+            create=op("vector_stores.files.create", state.create_vector_store_file),
+            update=op("vector_stores.files.update", state.update_vector_store_file),
+            list=op("vector_stores.files.list", state.list_vector_store_files),
+            delete=op("vector_stores.files.delete", state.delete_vector_store_file)
+        ),
+        file_batches=SimpleNamespace(
+            create=op("vector_stores.file_batches.create", state.create_file_batch),
+            retrieve=op("vector_stores.file_batches.retrieve", state.retrieve_file_batch),
+            list_files=op("vector_stores.file_batches.list_files", state.list_file_batch_files)
+        )
+    )
+    files = SimpleNamespace(
+        create=op("files.create", state.create_file),
+        list=op("files.list", state.list_files),
+        retrieve=op("files.retrieve", state.retrieve_file),
+        delete=op("files.delete", state.delete_file)
+    )
+    return SimpleNamespace(files=files, vector_stores=vector_stores)
+
+
+def _count_call(state: LocalAPIState, name: str):
+    with state.lock:
+        state.call_counts[name] = state.call_counts.get(name, 0) + 1
+
+
+class LocalAzureOpenAI:
+    """
+    Sync stand-in for AzureOpenAI.
+    """
+
+    def __init__(self, state: Optional[LocalAPIState] = None):
+        self.state = state or LocalAPIState()
+
+        def wrap(name, function):
+            def call(*args, **kwargs):
+                _count_call(self.state, name)
+                time.sleep(self.state.latency.delay(_uploaded_bytes(kwargs)))
+                return function(*args, **kwargs)
+            return call
+
+        surface = _build_surface(self.state, wrap)
+        self.files = surface.files
+        self.vector_stores = surface.vector_stores
+
+    def close(self):
+        pass
+
+
+class AsyncLocalAzureOpenAI:
+    """
+    Async stand-in for AsyncAzureOpenAI, for use with AsyncEngine(client=...).
+    """
+
+    def __init__(self, state: Optional[LocalAPIState] = None):
+        self.state = state or LocalAPIState()
+
+        def wrap(name, function):
+            async def call(*args, **kwargs):
+                _count_call(self.state, name)
+                await asyncio.sleep(self.state.latency.delay(_uploaded_bytes(kwargs)))
+                return function(*args, **kwargs)
+            return call
+
+        surface = _build_surface(self.state, wrap)
+        self.files = surface.files
+        self.vector_stores = surface.vector_stores
+
+    async def close(self):
+        pass
@@ -0,0 +1,96 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from chunk_documents import tokenize
+
+# ====== LOCAL STAND-IN NOTES ======
+# An in-memory stand-in for an Azure OpenAI vector store, used for offline
+# benchmarks. Files are split with the same static chunking parameters the
+# service accepts (max_chunk_size_tokens / chunk_overlap_tokens, default
+# 800 / 400) and searched with BM25, which is close enough to rank chunk
+# sizes against each other without any network access.
+# ==================================
+
+DEFAULT_MAX_CHUNK_SIZE_TOKENS = 800
+DEFAULT_CHUNK_OVERLAP_TOKENS = 400
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class LocalVectorStore:
+    """
+    In-memory vector store stand-in with static chunking and BM25 search.
+    """
+
+    def __init__(self, max_chunk_size_tokens: int = DEFAULT_MAX_CHUNK_SIZE_TOKENS,
+                 chunk_overlap_tokens: int = DEFAULT_CHUNK_OVERLAP_TOKENS):
+        self.max_chunk_size_tokens = max_chunk_size_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.chunks: List[Dict] = []
+        self.postings: Dict[str, List[tuple]] = defaultdict(list)
+        self.total_terms = 0
+
+    def add_file(self, file_name: str, text: str):
+        """
+        Chunk a file and add its chunks to the index.
+        """
+        tokens = tokenize(text)
+        step = max(self.max_chunk_size_tokens - self.chunk_overlap_tokens, 1)
+        last_start = max(len(tokens) - self.chunk_overlap_tokens, 1)
+        for start in range(0, last_start, step):
+            chunk_tokens = tokens[start:start + self.max_chunk_size_tokens]
+            if not chunk_tokens:
+                break
+            terms = Counter(token.lower() for token in chunk_tokens if _WORD_PATTERN.fullmatch(token))
+            chunk_index = len(self.chunks)
+            self.chunks.append({
+                'file_name': file_name,
+                'text': " ".join(chunk_tokens),
+                'tokens': len(chunk_tokens),
+                'length': sum(terms.values())
+            })
+            self.total_terms += sum(terms.values())
+            for term, frequency in terms.items():
+                self.postings[term].append((chunk_index, frequency))
+
+    def search(self, query: str, max_num_results: int = 10, file_names: Optional[set] = None) -> List[Dict]:
+        """
+        Return the best matching chunks for a query, best first.
+
+        Args:
+            query (str): Search query
+            max_num_results (int): Maximum number of chunks to return
+            file_names (Optional[set]): Only search chunks of these files
+
+        Returns:
+            List[Dict]: Chunks as {'file_name', 'text', 'tokens', 'score'}
+        """
+        if not self.chunks:
+            return []
+
+        chunk_count = len(self.chunks)
+        average_length = self.total_terms / chunk_count or 1
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(word.lower() for word in _WORD_PATTERN.findall(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_index, frequency in postings:
+                length_norm = 1 - BM25_B + BM25_B * self.chunks[chunk_index]['length'] / average_length
+                scores[chunk_index] += idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for chunk_index, score in ranked:
+            chunk = self.chunks[chunk_index]
+            if file_names is not None and chunk['file_name'] not in file_names:
+                continue
+            results.append({**chunk, 'score': score})
+            if len(results) >= max_num_results:
+                break
+        return results
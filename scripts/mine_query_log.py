@@ -0,0 +1,257 @@
+import glob
+import gzip
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+# The dashboard's modules live in src/ and use flat imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from query_log import LOG_FILE_PREFIX, LOG_FILE_SUFFIX, query_cluster_key
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Query Log Directory (the dashboard's query_log_dir setting)
+# - Output Path of the statistics (compact JSON; point the dashboard's query_stats_path setting at it)
+# - Top N entries to keep per statistic
+# - Days of logs to include (optional, default all)
+#
+# The gzip JSONL logs are streamed record by record, so memory stays bounded
+# whatever their size: counters keep at most CANDIDATE_FACTOR * N candidates
+# (counts may then be over by at most count_error_bound), and latency
+# percentiles come from a fixed-size random sample per query cluster.
+# Files still being written are read up to their last flushed line.
+#
+# Output:
+# - top_queries:  [normalized query, turns]
+# - transitions:  [previous normalized query, normalized query, turns]
+# - clusters:     [cluster key, *cluster_fields] with the latency of turns
+#                 answered upstream (fallbacks and prefetch hits excluded)
+# ===================================
+
+DEFAULT_TOP_N = 100
+DEFAULT_OUTPUT_PATH = "query_stats.json"
+CANDIDATE_FACTOR = 20           # Candidates tracked per reported entry before pruning
+LATENCY_SAMPLE_SIZE = 256       # Latencies sampled per cluster for the percentiles
+CLUSTER_FIELDS = ["turns", "upstream_turns", "prefetch_hits", "fallbacks", "mean_seconds", "p50_seconds",
+                  "p95_seconds"]
+
+
+class BoundedCounter:
+    """
+    Counter that keeps its most frequent keys. When it grows past twice its capacity, it's pruned
+    back to the capacity. Keys counted after a pruning start from the largest count pruned so far,
+    so a count is never under the true one and over it by at most error_bound.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.error_bound = 0
+
+    def add(self, key: str) -> bool:
+        """
+        Count key. Returns True if pruning dropped keys, so callers can drop their state for them.
+        """
+        self.counts[key] = self.counts.get(key, self.error_bound) + 1
+        if len(self.counts) <= self.capacity * 2:
+            return False
+        ranked = sorted(self.counts.items(), key=lambda item: -item[1])
+        self.error_bound = max(self.error_bound, ranked[self.capacity][1])
+        self.counts = dict(ranked[:self.capacity])
+        return True
+
+    def top(self, count: int) -> List[tuple]:
+        return sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:count]
+
+
+class ClusterLatency:
+    """
+    Turn counts and a reservoir sample of upstream latencies for one query cluster.
+    """
+
+    def __init__(self):
+        self.turns = 0
+        self.upstream_turns = 0
+        self.prefetch_hits = 0
+        self.fallbacks = 0
+        self.total_seconds = 0.0
+        self.sample: List[float] = []
+
+    def add(self, record: Dict, rng: random.Random):
+        self.turns += 1
+        source = record.get("source")
+        if source == "prefetch":
+            self.prefetch_hits += 1
+        elif source in ("cached", "shed", "error"):
+            self.fallbacks += 1
+        if source != "upstream":
+            return
+        latency = float(record.get("latency_seconds", 0.0))
+        self.upstream_turns += 1
+        self.total_seconds += latency
+        if len(self.sample) < LATENCY_SAMPLE_SIZE:
+            self.sample.append(latency)
+        else:
+            index = rng.randrange(self.upstream_turns)
+            if index < LATENCY_SAMPLE_SIZE:
+                self.sample[index] = latency
+
+    def row(self) -> List:
+        ordered = sorted(self.sample)
+
+        def percentile(fraction: float) -> Optional[float]:
+            return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)], 4) if ordered else None
+
+        mean = round(self.total_seconds / self.upstream_turns, 4) if self.upstream_turns else None
+        return [self.turns, self.upstream_turns, self.prefetch_hits, self.fallbacks, mean, percentile(0.5),
+                percentile(0.95)]
+
+
+def find_log_files(log_dir: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(log_dir, f"{LOG_FILE_PREFIX}*{LOG_FILE_SUFFIX}")))
+
+
+def read_records(log_files: List[str], since: Optional[float], stats: Dict) -> Iterator[Dict]:
+    """
+    Stream the turn records of the log files, skipping bad lines and records older than since.
+    """
+    for log_path in log_files:
+        if since and os.path.getmtime(log_path) < since:
+            continue
+        stats['files'] += 1
+        try:
+            with gzip.open(log_path, "rt", encoding="utf-8") as log_file:
+                for line in log_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        stats['bad_lines'] += 1
+                        continue
+                    if since and record.get("ts", 0) < since:
+                        continue
+                    yield record
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            # A file still being written ends after its last sync flush
+            stats['open_files'] += 1
+        except OSError as e:
+            print(f"  ⚠️  Could not read {log_path}: {e}")
+
+
+def mine_query_log(log_dir: str, output_path: str = DEFAULT_OUTPUT_PATH, top_n: int = DEFAULT_TOP_N,
+                   days: Optional[float] = None) -> Dict:
+    """
+    Stream the query log into top queries, query transitions and per-cluster latency, and write them to output_path.
+    """
+    log_files = find_log_files(log_dir)
+    if not log_files:
+        return {'success': False, 'error': f"No query logs found in {log_dir}"}
+
+    since = time.time() - days * 86400 if days else None
+    stats = {'files': 0, 'open_files': 0, 'bad_lines': 0, 'records': 0}
+    capacity = top_n * CANDIDATE_FACTOR
+    queries = BoundedCounter(capacity)
+    transitions = BoundedCounter(capacity)
+    cluster_counts = BoundedCounter(capacity)
+    clusters: Dict[str, ClusterLatency] = {}
+    rng = random.Random(0)
+
+    start_time = time.perf_counter()
+    for record in read_records(log_files, since, stats):
+        normalized = record.get("normalized")
+        if not normalized:
+            continue
+        stats['records'] += 1
+        queries.add(normalized)
+        if record.get("previous"):
+            transitions.add(f"{record['previous']}\t{normalized}")
+        cluster = query_cluster_key(normalized)
+        if cluster_counts.add(cluster):
+            clusters = {key: value for key, value in clusters.items() if key in cluster_counts.counts}
+        clusters.setdefault(cluster, ClusterLatency()).add(record, rng)
+    elapsed = time.perf_counter() - start_time
+
+    output = {
+        'generated_at': time.time(),
+        'records': stats['records'],
+        'files': stats['files'],
+        'count_error_bound': max(queries.error_bound, transitions.error_bound, cluster_counts.error_bound),
+        'top_queries': [[query, count] for query, count in queries.top(top_n)],
+        'transitions': [key.split("\t") + [count] for key, count in transitions.top(top_n)],
+        'cluster_fields': CLUSTER_FIELDS,
+        'clusters': [[cluster] + clusters[cluster].row() for cluster, _ in cluster_counts.top(top_n)
+                     if cluster in clusters]
+    }
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as output_file:
+        json.dump(output, output_file, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary_path, output_path)
+
+    return {'success': True, 'elapsed_seconds': elapsed, 'output': output, **stats}
+
+
+def print_summary(result: Dict, shown: int = 10):
+    output = result['output']
+    print(f"\n📊 {result['records']} turns from {result['files']} file(s) in {result['elapsed_seconds']:.2f}s"
+          f" ({result['open_files']} still open, {result['bad_lines']} bad lines)")
+    print(f"\nTop queries:")
+    for query, count in output['top_queries'][:shown]:
+        print(f"  {count:>7}  {query}")
+    print(f"\nTop transitions:")
+    for previous_query, query, count in output['transitions'][:shown]:
+        print(f"  {count:>7}  {previous_query} → {query}")
+    print(f"\nClusters (upstream latency):")
+    print(f"  {'Turns':>7}{'p50 (s)':>9}{'p95 (s)':>9}  Cluster")
+    for cluster, turns, _, _, _, _, p50, p95 in output['clusters'][:shown]:
+        print(f"  {turns:>7}{p50 if p50 is not None else '-':>9}{p95 if p95 is not None else '-':>9}  {cluster}")
+
+
+def get_user_configuration():
+    """
+    Get log directory, output and aggregation configuration from user input.
+    """
+    print("🔧 Query Log Mining Configuration Setup")
+    print("-" * 40)
+
+    log_dir = input("Enter query log directory: ").strip()
+    while not os.path.isdir(log_dir):
+        print(f"Directory '{log_dir}' does not exist.")
+        log_dir = input("Enter query log directory: ").strip()
+
+    output_path = input(f"Enter output path (leave empty for '{DEFAULT_OUTPUT_PATH}'): ").strip()
+    top_n = input(f"Enter top N (leave empty for {DEFAULT_TOP_N}): ").strip()
+    days = input("Enter days of logs to include (leave empty for all): ").strip()
+
+    return {
+        'log_dir': log_dir,
+        'output_path': output_path or DEFAULT_OUTPUT_PATH,
+        'top_n': int(top_n) if top_n.isdigit() and int(top_n) > 0 else DEFAULT_TOP_N,
+        'days': float(days) if days.replace(".", "", 1).isdigit() and float(days) > 0 else None
+    }
+
+
+def main():
+    """Main function to handle user input and mine the query log."""
+    print("\n")
+    print("=" * 50)
+    print("🔎 Query Log Mining")
+    print("=" * 50)
+
+    config = get_user_configuration()
+
+    print(f"\n🔄 Mining query logs in {config['log_dir']}...")
+    result = mine_query_log(**config)
+    if not result['success']:
+        print(f"\n❌ {result['error']}")
+        exit(1)
+    print_summary(result)
+    print(f"\nStatistics written to: {config['output_path']}")
+    print(f"\n✅ Mining completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import os
+import statistics
+import time
+
+from client_config import get_connection_configuration, initialize_client
+from bulk_upload_to_vector_store import DEFAULT_JOURNAL_PATH, upload_files_to_vector_store
+from upload_journal import UploadJournal
+from upload_verification import FAILED_STATUSES, retrieve_all_files
+from vector_store_pointer import read_pointer, rollback, switch_to
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Azure OpenAI API Key (masked input)
+# - Azure Endpoint
+# - API Version
+# - Action (rebuild into a new vector store, or roll back to the previous one)
+# - Pointer File Path (the dashboard's azure_vector_store_pointer_path secret)
+# - Directory Path and new Vector Store Name (if rebuilding)
+# - Smoke Test Queries File (optional, one query per line)
+#
+# The live vector store is never modified: the rebuild populates a new store,
+# waits until every file is indexed, smoke-tests retrieval, and only then
+# switches the pointer file. The old store is kept for rollback.
+# ===================================
+
+DEFAULT_POINTER_PATH = "vector_store_pointer.json"
+DEFAULT_SMOKE_QUERIES = [
+    "How do I set up my Zebra printer?",
+    "How do I troubleshoot printing issues?",
+    "How do I change the printer settings?",
+]
+SMOKE_TEST_RUNS = 3                 # Each query is searched this many times
+SMOKE_TEST_MAX_P95_SECONDS = 5.0    # Switch-over is refused above this search latency
+INDEXING_POLL_INITIAL = 5.0
+INDEXING_POLL_MAX = 60.0
+INDEXING_TIMEOUT_SECONDS = 6 * 3600
+
+
+def get_user_configuration():
+    """
+    Get Azure OpenAI configuration from user input.
+    """
+    connection = get_connection_configuration()
+
+    # Get Action
+    print("\n🔁 Actions:")
+    print("1. Rebuild into a new vector store and switch over")
+    print("2. Roll back to the previous vector store")
+    choice = input("Select option (1 or 2): ").strip()
+    while choice not in ['1', '2']:
+        print("Invalid choice. Please enter 1 or 2.")
+        choice = input("Select option (1 or 2): ").strip()
+
+    # Get Pointer File Path
+    pointer_path = input(f"Enter pointer file path (leave empty for '{DEFAULT_POINTER_PATH}'): ").strip()
+
+    config = {
+        **connection,
+        'rollback': choice == '2',
+        'pointer_path': pointer_path or DEFAULT_POINTER_PATH
+    }
+    if config['rollback']:
+        return config
+
+    # Get Directory Path
+    directory_path = input("Enter directory path containing files to upload: ").strip()
+    while not directory_path:
+        print("Directory path is required.")
+        directory_path = input("Enter directory path containing files to upload: ").strip()
+
+    # Get Vector Store Name
+    default_name = f"rebuild-{time.strftime('%Y%m%d-%H%M%S')}"
+    vector_store_name = input(f"Enter new vector store name (leave empty for '{default_name}'): ").strip()
+
+    # Get Current Vector Store IDs (only needed before the first switch-over)
+    current_ids = ""
+    if read_pointer(config['pointer_path']) is None:
+        current_ids = input("Enter the currently configured vector store IDs, comma separated "
+                            "(recorded for rollback): ").strip()
+
+    # Get Smoke Test Queries
+    queries_path = input("Enter smoke test queries file (one per line, leave empty for defaults): ").strip()
+
+    config.update({
+        'directory_path': directory_path,
+        'vector_store_name': vector_store_name or default_name,
+        'current_ids': [vs_id.strip() for vs_id in current_ids.split(",") if vs_id.strip()],
+        'queries_path': queries_path,
+        'journal_path': DEFAULT_JOURNAL_PATH
+    })
+    return config
+
+
+def load_smoke_queries(queries_path):
+    """
+    Read smoke test queries, one per line, or return the defaults.
+    """
+    if not queries_path:
+        return DEFAULT_SMOKE_QUERIES
+    with open(queries_path, "r", encoding="utf-8") as queries_file:
+        return [line.strip() for line in queries_file if line.strip()]
+
+
+def wait_until_indexed(client, vector_store_id, timeout_seconds=INDEXING_TIMEOUT_SECONDS):
+    """
+    Wait until no file of the vector store is still in progress.
+
+    Returns:
+        dict: Status counts, the failed file IDs and whether indexing finished before the timeout
+    """
+    interval = INDEXING_POLL_INITIAL
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        try:
+            files = retrieve_all_files(client, vector_store_id)
+        except Exception as e:
+            # A failed listing says nothing about the indexing, so keep polling
+            print(f"  ⚠️  Could not list the vector store files: {e}")
+            files = []
+        counts = {}
+        for file in files:
+            counts[file.status] = counts.get(file.status, 0) + 1
+        if files:
+            print(f"  Indexing status: {', '.join(f'{status}: {count}' for status, count in sorted(counts.items()))}")
+
+        # The store was just populated, so an empty listing means it isn't visible yet
+        finished = bool(files) and not counts.get('in_progress')
+        if finished or time.monotonic() >= deadline:
+            return {
+                'finished': finished,
+                'counts': counts,
+                'failed_ids': [file.id for file in files if file.status in FAILED_STATUSES]
+            }
+        time.sleep(interval)
+        interval = min(interval * 2, INDEXING_POLL_MAX)
+
+
+def smoke_test(client, vector_store_id, queries, runs=SMOKE_TEST_RUNS):
+    """
+    Search the vector store with every query and measure the latency.
+
+    Returns:
+        dict: p50/p95/max latency in seconds and the queries that returned nothing
+    """
+    latencies = []
+    empty_queries = []
+    for query in queries:
+        for run in range(runs):
+            start_time = time.perf_counter()
+            results = client.vector_stores.search(vector_store_id=vector_store_id, query=query, max_num_results=5)
+            latencies.append(time.perf_counter() - start_time)
+            if run == 0 and not results.data:
+                empty_queries.append(query)
+
+    latencies.sort()
+    return {
+        'p50_seconds': statistics.median(latencies),
+        'p95_seconds': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        'max_seconds': latencies[-1],
+        'empty_queries': empty_queries
+    }
+
+
+def print_smoke_result(label, result):
+    print(f"  {label}: p50 {result['p50_seconds'] * 1000:.0f} ms, p95 {result['p95_seconds'] * 1000:.0f} ms, "
+          f"max {result['max_seconds'] * 1000:.0f} ms, queries without results: {len(result['empty_queries'])}")
+
+
+def rebuild_vector_store(client, config):
+    """
+    Populate a new vector store, verify it, smoke-test it and switch the dashboard over to it.
+    """
+    print("🔄 Starting Blue/Green Rebuild")
+    print("-" * 40)
+
+    with UploadJournal(config['journal_path']) as journal:
+        upload_result = upload_files_to_vector_store(
+            client, config['directory_path'], vector_store_name=config['vector_store_name'], journal=journal
+        )
+    if not upload_result['success']:
+        print("❌ Upload into the new vector store failed; the live store was not touched.")
+        return {'success': False, 'vector_store_id': None}
+
+    vector_store_id = upload_result['vector_store'].id
+
+    print(f"\nWaiting until every file of {vector_store_id} is indexed...")
+    indexing = wait_until_indexed(client, vector_store_id)
+    if not indexing['finished'] or indexing['failed_ids']:
+        print(f"❌ Indexing incomplete ({len(indexing['failed_ids'])} failed); not switching over.")
+        return {'success': False, 'vector_store_id': vector_store_id}
+
+    print(f"\nSmoke-testing retrieval...")
+    queries = load_smoke_queries(config.get('queries_path'))
+    try:
+        new_result = smoke_test(client, vector_store_id, queries)
+    except Exception as e:
+        print(f"❌ Smoke test failed: {e}; not switching over. New store kept as {vector_store_id}.")
+        return {'success': False, 'vector_store_id': vector_store_id}
+    print_smoke_result(f"New store {vector_store_id}", new_result)
+
+    pointer = read_pointer(config['pointer_path'])
+    current_ids = pointer['active'] if pointer else config.get('current_ids', [])
+    for current_id in current_ids:
+        try:
+            print_smoke_result(f"Live store {current_id}", smoke_test(client, current_id, queries))
+        except Exception as e:
+            print(f"  ⚠️  Could not smoke-test live store {current_id}: {e}")
+
+    if new_result['empty_queries'] or new_result['p95_seconds'] > SMOKE_TEST_MAX_P95_SECONDS:
+        print(f"❌ Smoke test failed; not switching over. New store kept as {vector_store_id}.")
+        return {'success': False, 'vector_store_id': vector_store_id, 'smoke_test': new_result}
+
+    pointer = switch_to(config['pointer_path'], [vector_store_id], fallback_ids=current_ids)
+    print(f"\n✓ Switched dashboard to {', '.join(pointer['active'])}")
+    print(f"  Previous stores kept for rollback: {', '.join(pointer['previous']) or 'none'}")
+    return {'success': True, 'vector_store_id': vector_store_id, 'smoke_test': new_result, 'pointer': pointer}
+
+
+if __name__ == "__main__":
+    print("\n")
+    print("=" * 50)
+    print("🔁 Blue/Green Vector Store Rebuild")
+    print("=" * 50)
+
+    # Get configuration from user
+    config = get_user_configuration()
+
+    if config['rollback']:
+        try:
+            pointer = rollback(config['pointer_path'])
+            print(f"\n✅ Rolled back: dashboard now uses {', '.join(pointer['active'])}")
+            exit(0)
+        except (OSError, ValueError) as e:
+            print(f"\n❌ Rollback failed: {e}")
+            exit(1)
+
+    # Initialize client
+    print("\n🔄 Initializing Azure OpenAI client...")
+    client = initialize_client(config)
+
+    if not client:
+        print("❌ Failed to initialize client. Please check your configuration.")
+        exit(1)
+
+    print("✅ Client initialized successfully!")
+
+    # Show configuration summary
+    print(f"\nConfiguration Summary:")
+    print(f"Directory: {config['directory_path']}")
+    print(f"New vector store name: {config['vector_store_name']}")
+    print(f"Pointer file: {os.path.abspath(config['pointer_path'])}")
+
+    # Confirm before proceeding
+    confirmation = input("\nProceed with rebuild? Type 'YES' to confirm: ")
+
+    if confirmation == "YES":
+        result = rebuild_vector_store(client, config)
+        if result['success']:
+            print(f"\n✅ Rebuild completed and switched over!")
+        else:
+            print(f"\n❌ Rebuild did not switch over.")
+    else:
+        print("Operation cancelled.")
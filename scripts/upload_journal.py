@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+
+# ====== JOURNAL NOTES ======
+# The journal is an append-only JSON Lines file. Every state change of a file
+# (uploaded, attached to a batch, indexed) is appended and fsync'ed before the
+# uploader moves on, so a crashed or interrupted run can be resumed without
+# uploading any file twice. A truncated last line from a crash is ignored.
+#
+# Event types:
+# - vector_store_created: {vector_store_id, name}
+# - uploaded:             {vector_store_id, path, file_id, size, mtime}
+# - attached:             {vector_store_id, batch_id, file_ids}
+# - indexed:              {vector_store_id, file_id, status, error}
+# - run_completed:        {vector_store_id} (later runs start from scratch)
+# ===========================
+
+
+class UploadJournal:
+    """
+    Crash-safe, append-only record of upload progress for one or more vector stores.
+    """
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.lock = threading.Lock()
+        self.events = self._read_events()
+        self.journal_file = open(journal_path, "a", encoding="utf-8")
+
+    def _read_events(self):
+        if not os.path.exists(self.journal_path):
+            return []
+
+        events = []
+        valid_length = 0
+        with open(self.journal_path, "rb") as journal_file:
+            for line in journal_file:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Only the last line can be partially written by a crash
+                    break
+                if not line.endswith(b"\n"):
+                    events.pop()
+                    break
+                valid_length += len(line)
+
+        # Drop a torn tail so new events start on a fresh line
+        if valid_length != os.path.getsize(self.journal_path):
+            with open(self.journal_path, "r+b") as journal_file:
+                journal_file.truncate(valid_length)
+        return events
+
+    def record(self, event, vector_store_id, **fields):
+        """
+        Append an event and force it to disk before returning.
+        """
+        entry = {'event': event, 'vector_store_id': vector_store_id, 'ts': time.time(), **fields}
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.journal_file.write(line)
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            self.events.append(entry)
+
+    def find_vector_store(self, name):
+        """
+        Get the ID of a vector store created under this name by an unfinished run, if any.
+        """
+        vector_store_id = None
+        for entry in self.events:
+            if entry['event'] == 'vector_store_created' and entry.get('name') == name:
+                vector_store_id = entry['vector_store_id']
+            elif entry['event'] == 'run_completed' and entry['vector_store_id'] == vector_store_id:
+                vector_store_id = None
+        return vector_store_id
+
+    def get_file_states(self, vector_store_id):
+        """
+        Replay the journal into the last known state of each file path of a vector store.
+
+        Returns:
+            dict: path -> {'file_id', 'size', 'mtime', 'state', 'batch_id', 'error'} where state is
+                  one of 'uploaded', 'attached', 'completed', 'failed' or 'cancelled'
+        """
+        file_states = {}
+        paths_by_file_id = {}
+
+        for entry in self.events:
+            if entry['vector_store_id'] != vector_store_id:
+                continue
+
+            if entry['event'] == 'run_completed':
+                file_states.clear()
+                paths_by_file_id.clear()
+            elif entry['event'] == 'uploaded':
+                file_states[entry['path']] = {
+                    'file_id': entry['file_id'],
+                    'size': entry['size'],
+                    'mtime': entry['mtime'],
+                    'state': 'uploaded',
+                    'batch_id': None,
+                    'error': None
+                }
+                paths_by_file_id[entry['file_id']] = entry['path']
+            elif entry['event'] == 'attached':
+                for file_id in entry['file_ids']:
+                    path = paths_by_file_id.get(file_id)
+                    if path is not None:
+                        file_states[path]['state'] = 'attached'
+                        file_states[path]['batch_id'] = entry['batch_id']
+            elif entry['event'] == 'indexed':
+                path = paths_by_file_id.get(entry['file_id'])
+                if path is not None:
+                    file_states[path]['state'] = entry['status']
+                    file_states[path]['error'] = entry.get('error')
+
+        return file_states
+
+    def close(self):
+        with self.lock:
+            self.journal_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
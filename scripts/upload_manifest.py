@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ====== MANIFEST NOTES ======
+# The manifest is a local SQLite database recording, per vector store, which
+# content hash of each relative path was uploaded and under which file ID.
+# It lets the uploader compute the delta between a directory and a vector store
+# without listing or downloading anything from the service.
+# ============================
+
+HASH_CHUNK_SIZE = 1024 * 1024   # Bytes read per chunk while hashing
+MAX_HASH_WORKERS = 8            # Files hashed in parallel (hashlib releases the GIL)
+
+
+def hash_file(path):
+    """
+    Compute the SHA-256 content hash of a file, streaming it in fixed-size chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file_stream:
+        for chunk in iter(lambda: file_stream.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(file_paths, max_workers=MAX_HASH_WORKERS):
+    """
+    Hash many files in parallel.
+    Returns a dict mapping each path to its content hash, or None if the file could not be read.
+    """
+    def safe_hash(path):
+        try:
+            return hash_file(path)
+        except OSError as e:
+            print(f"  ✗ Error hashing file {os.path.basename(path)}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(file_paths, executor.map(safe_hash, file_paths)))
+
+
+class UploadManifest:
+    """
+    SQLite-backed record of the files uploaded to each vector store.
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.connection = sqlite3.connect(manifest_path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS manifest (
+                vector_store_id TEXT NOT NULL,
+                relative_path TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                file_id TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (vector_store_id, relative_path)
+            )
+            """
+        )
+        self.connection.commit()
+
+    def get_entries(self, vector_store_id):
+        """
+        Get all manifest entries of a vector store, keyed by relative path.
+        """
+        cursor = self.connection.execute(
+            "SELECT relative_path, content_hash, file_id, size FROM manifest WHERE vector_store_id = ?",
+            (vector_store_id,)
+        )
+        return {
+            relative_path: {'content_hash': content_hash, 'file_id': file_id, 'size': size}
+            for relative_path, content_hash, file_id, size in cursor
+        }
+
+    def upsert(self, vector_store_id, relative_path, content_hash, file_id, size):
+        """
+        Record that the given content of a relative path is stored under file_id.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?)",
+            (vector_store_id, relative_path, content_hash, file_id, size, time.time())
+        )
+        self.connection.commit()
+
+    def remove(self, vector_store_id, relative_path):
+        """
+        Forget a relative path of a vector store.
+        """
+        self.connection.execute(
+            "DELETE FROM manifest WHERE vector_store_id = ? AND relative_path = ?",
+            (vector_store_id, relative_path)
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def plan_delta(local_files, manifest_entries):
+    """
+    Compare the local files against the manifest entries of a vector store.
+
+    Args:
+        local_files (dict): relative path -> {'path', 'content_hash', 'size'}
+        manifest_entries (dict): relative path -> {'content_hash', 'file_id', 'size'}
+
+    Returns:
+        dict: Relative paths grouped into 'new', 'changed', 'unchanged' and 'deleted'
+    """
+    delta = {'new': [], 'changed': [], 'unchanged': [], 'deleted': []}
+
+    for relative_path, local_file in sorted(local_files.items()):
+        entry = manifest_entries.get(relative_path)
+        if entry is None:
+            delta['new'].append(relative_path)
+        elif entry['content_hash'] != local_file['content_hash']:
+            delta['changed'].append(relative_path)
+        else:
+            delta['unchanged'].append(relative_path)
+
+    delta['deleted'] = sorted(set(manifest_entries) - set(local_files))
+    return delta
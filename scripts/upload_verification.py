@@ -1,233 +1,323 @@
+import asyncio
 import os
-from openai import AzureOpenAI
-import getpass
+import sys
+from collections import defaultdict
+
+from async_engine import run_with_engine
+from batch_builder import iter_files, validate_file
+from client_config import get_connection_configuration
+from upload_manifest import UploadManifest, hash_files
 
 # ====== CONFIGURATION NOTES ======
 # This script will prompt for:
 # - Azure OpenAI API Key (masked input)
-# - Azure Endpoint  
+# - Azure Endpoint
 # - API Version
 # - Vector Store ID
 # - Directory Path (for verification)
+# - Manifest Path (optional, enables content hash comparison)
 # ===================================
 
+# ====== LISTING TUNING ======
+FILES_PAGE_SIZE = 10000                 # Maximum page size of files.list
+VECTOR_STORE_FILES_PAGE_SIZE = 100      # Maximum page size of vector_stores.files.list
+MAX_RETRIEVE_WORKERS = 16               # Concurrent calls of the interactive flow's engine
+FAILED_STATUSES = {"failed", "cancelled"}
+# ============================
+
 def get_user_configuration():
     """
     Get Azure OpenAI configuration from user input.
     """
-    print("🔧 Azure OpenAI Configuration Setup")
-    print("-" * 40)
-    
-    # Get API Key (masked input)
-    api_key = getpass.getpass("Enter your Azure OpenAI API Key: ")
-    
-    # Show masked API key for confirmation (show last 5 digits)
-    if len(api_key) >= 5:
-        masked_key = "*" * (len(api_key) - 5) + api_key[-5:]
-    else:
-        masked_key = "*" * len(api_key)
-    
-    print(f"API Key entered: {masked_key}")
-    
-    # Get Azure Endpoint
-    azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
-    while not azure_endpoint:
-        print("Azure Endpoint is required.")
-        azure_endpoint = input("Enter your Azure OpenAI Endpoint (e.g., https://your-service.openai.azure.com/): ").strip()
-    
-    # Get API Version
-    api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
-    while not api_version:
-        print("API Version is required.")
-        api_version = input("Enter API Version (e.g., 2025-03-01-preview): ").strip()
-    
+    connection = get_connection_configuration()
+
     # Get Vector Store ID
     vector_store_id = input("Enter Vector Store ID (e.g., vs_8K3mX9nP2wQ7vR5tA6bC4dE1): ").strip()
     while not vector_store_id:
         print("Vector Store ID is required.")
         vector_store_id = input("Enter Vector Store ID (e.g., vs_8K3mX9nP2wQ7vR5tA6bC4dE1): ").strip()
-    
+
     # Get Directory Path
     directory_path = input("Enter directory path to verify against (leave empty to skip verification): ").strip()
-    
+
+    # Get Manifest Path
+    manifest_path = ""
+    if directory_path:
+        manifest_path = input("Enter upload manifest path to compare content hashes (leave empty to skip): ").strip()
+
     return {
-        'api_key': api_key,
-        'api_version': api_version,
-        'azure_endpoint': azure_endpoint,
+        **connection,
         'vector_store_id': vector_store_id,
-        'directory_path': directory_path
+        'directory_path': directory_path,
+        'manifest_path': manifest_path
     }
 
-def initialize_client(config):
+def list_pages(list_method, page_size, **kwargs):
     """
-    Initialize the AzureOpenAI client with the provided configuration.
+    Yield every item of a cursor-paginated list endpoint, following 'after' until has_more is false.
     """
-    try:
-        client = AzureOpenAI(
-            api_key=config['api_key'],
-            api_version=config['api_version'],
-            azure_endpoint=config['azure_endpoint']
-        )
-        return client
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {e}")
-        return None
+    after = None
+    while True:
+        if after:
+            response = list_method(limit=page_size, after=after, **kwargs)
+        else:
+            response = list_method(limit=page_size, **kwargs)
+
+        yield from response.data
+
+        if not response.has_more or not response.data:
+            break
+        after = response.data[-1].id
 
 def retrieve_all_files(client, vector_store_id):
     """
-    Function to retrieve all files from the vector store.
+    Retrieve all file entries of the vector store, including their indexing status.
+    Listing errors are raised, so a partial listing is never taken for the store's content.
     """
     print(f"Retrieving files from vector store: {vector_store_id}")
-    all_files = []
-    after = None
 
-    try:
-        while True:
-            # Fetch the current page of files
-            response = client.vector_stores.files.list(vector_store_id=vector_store_id, after=after)
-            
-            files = response.data
-            
-            for file in files:
-                all_files.append(file.id)
-            
-            # Check if there are more files to fetch
-            if response.has_more:
-                after = response.data[-1].id
-            else:
-                break
-
-        print(f"Found {len(all_files)} files in vector store.")
-        return all_files
-    except Exception as e:
-        print(f"Error retrieving files from vector store: {e}")
-        return []
-
-def retrieve_name_of_all_files(client, files):
-    """
-    Retrieve the names of all files from their IDs.
-    """
-    print("Retrieving file names...")
-    file_names = []
-    failed_count = 0
-    
-    for file_id in files:
-        try:
-            file_info = client.files.retrieve(file_id=file_id)
-            file_names.append(file_info.filename)
-            print(f"  ✓ {file_info.filename}")
-        except Exception as e:
-            print(f"  ✗ Failed to retrieve info for file ID {file_id}: {e}")
-            failed_count += 1
-    
-    print(f"\nFile retrieval summary:")
-    print(f"Successfully retrieved: {len(file_names)} files")
-    print(f"Failed to retrieve: {failed_count} files")
-    
-    return file_names
-
-def verify_all_files_from_directory_is_present_in_list(directory, files):
-    """
-    Verify if all files from the directory are present in the vector store.
-    """
-    print(f"\nVerifying files from directory: {directory}")
-    
-    if not os.path.exists(directory):
-        print(f"❌ Directory '{directory}' does not exist.")
+    all_files = list(list_pages(
+        client.vector_stores.files.list, VECTOR_STORE_FILES_PAGE_SIZE, vector_store_id=vector_store_id
+    ))
+    print(f"Found {len(all_files)} files in vector store.")
+    return all_files
+
+def get_directory_files(directory):
+    """
+    Collect the uploadable files below the directory, the same way the uploader discovers them.
+    Returns file name -> list of paths, since the vector store only knows base names.
+    """
+    directory_files = defaultdict(list)
+    for path, size in iter_files(directory):
+        if validate_file(path, size) is None:
+            directory_files[os.path.basename(path)].append(path)
+    return directory_files
+
+def compare_directory_with_vector_store(directory_files, vector_store_files, file_names):
+    """
+    Match the directory against the vector store with set operations.
+
+    Args:
+        directory_files (dict): file name -> list of local paths
+        vector_store_files (list): Vector store file entries with id and status
+        file_names (dict): file ID -> file name
+
+    Returns:
+        dict: Sorted file names per category: 'present', 'missing', 'extra', 'duplicates'
+              (name -> file IDs), 'failed' (name -> error) and 'in_progress'
+    """
+    ids_by_name = defaultdict(list)
+    for file in vector_store_files:
+        if file.id in file_names:
+            ids_by_name[file_names[file.id]].append(file.id)
+
+    local_names = set(directory_files)
+    store_names = set(ids_by_name)
+
+    failed = {}
+    in_progress = set()
+    for file in vector_store_files:
+        name = file_names.get(file.id)
+        if name is None:
+            continue
+        if file.status in FAILED_STATUSES:
+            last_error = getattr(file, 'last_error', None)
+            failed[name] = getattr(last_error, 'message', None) or file.status
+        elif file.status == "in_progress":
+            in_progress.add(name)
+
+    return {
+        'present': sorted(local_names & store_names),
+        'missing': sorted(local_names - store_names),
+        'extra': sorted(store_names - local_names),
+        'duplicates': {name: ids for name, ids in sorted(ids_by_name.items()) if len(ids) > 1},
+        'failed': dict(sorted(failed.items())),
+        'in_progress': sorted(in_progress)
+    }
+
+def compare_content_hashes(directory, directory_files, manifest_path, vector_store_id, vector_store_files):
+    """
+    Compare the local content hashes against the upload manifest.
+
+    Returns:
+        dict: 'changed' relative paths whose content differs from what was uploaded,
+              'untracked' relative paths the manifest doesn't know, and 'dangling' relative
+              paths whose recorded file ID is no longer in the vector store
+    """
+    paths = [path for paths in directory_files.values() for path in paths]
+    print(f"Hashing {len(paths)} files...")
+    content_hashes = hash_files(paths)
+
+    with UploadManifest(manifest_path) as manifest:
+        manifest_entries = manifest.get_entries(vector_store_id)
+
+    store_ids = {file.id for file in vector_store_files}
+    changed = []
+    untracked = []
+    for path, content_hash in content_hashes.items():
+        relative_path = os.path.relpath(path, directory)
+        entry = manifest_entries.get(relative_path)
+        if entry is None:
+            untracked.append(relative_path)
+        elif content_hash is not None and content_hash != entry['content_hash']:
+            changed.append(relative_path)
+
+    return {
+        'changed': sorted(changed),
+        'untracked': sorted(untracked),
+        'dangling': sorted(
+            relative_path for relative_path, entry in manifest_entries.items() if entry['file_id'] not in store_ids
+        )
+    }
+
+def print_file_group(title, names, symbol):
+    """
+    Print one group of the verification report.
+    """
+    if not names:
         return
-    
-    try:
-        directory_files = [f for f in os.listdir(directory) if os.path.isfile(os.path.join(directory, f))]
-        print(f"Found {len(directory_files)} files in directory.")
-        
-        present_count = 0
-        missing_count = 0
-        
-        print("\nVerification Results:")
-        for file in directory_files:
-            if file in files:
-                print(f"  ✓ {file} is present in the vector store.")
-                present_count += 1
-            else:
-                print(f"  ✗ {file} is NOT present in the vector store.")
-                missing_count += 1
-        
-        print(f"\nVerification Summary:")
-        print(f"Files present in vector store: {present_count}")
-        print(f"Files missing from vector store: {missing_count}")
-        print(f"Total files checked: {len(directory_files)}")
-        
-    except Exception as e:
-        print(f"Error reading directory: {e}")
-
-def perform_upload_verification(client, config):
-    """
-    Perform the upload verification process.
-    """
-    print("🔍 Starting Upload Verification Process")
-    print("-" * 40)
-    
-    # Retrieve the list of files from vector store
-    files = retrieve_all_files(client, config['vector_store_id'])
-    
-    if not files:
-        print("❌ No files found in vector store or error occurred.")
-        return False
-    
-    # Retrieve the names of all files
-    file_names = retrieve_name_of_all_files(client, files)
-    
-    if not file_names:
-        print("❌ Could not retrieve file names.")
-        return False
-    
-    # Verify if all files from the directory are present in the vector store (if directory provided)
-    if config['directory_path']:
-        verify_all_files_from_directory_is_present_in_list(config['directory_path'], file_names)
-    else:
+    print(f"\n{title} ({len(names)}):")
+    for name in names:
+        print(f"  {symbol} {name}")
+
+async def verify_vector_store(engine, vector_store_id, directory_path=None, manifest_path=None):
+    """
+    Compare a vector store against a directory using one bulk listing of each side.
+    Names come from the files listing joined by ID; only IDs missing from it are retrieved individually.
+    Progress goes to stderr, so a report on stdout stays parseable.
+
+    Returns:
+        dict: The report from compare_directory_with_vector_store, or the file names if no directory is given
+    """
+    if directory_path and not os.path.isdir(directory_path):
+        raise ValueError(f"Directory '{directory_path}' does not exist")
+    client = engine.client
+
+    async def list_store():
+        return [file async for file in engine.paginate(client.vector_stores.files.list,
+                                                       VECTOR_STORE_FILES_PAGE_SIZE,
+                                                       vector_store_id=vector_store_id)]
+
+    async def list_files():
+        return {file.id: file async for file in engine.paginate(client.files.list, FILES_PAGE_SIZE,
+                                                                purpose="assistants")}
+
+    vector_store_files, file_index = await asyncio.gather(list_store(), list_files())
+    print(f"Found {len(vector_store_files)} vector store entries and {len(file_index)} files", file=sys.stderr)
+
+    missing_ids = [file.id for file in vector_store_files if file.id not in file_index]
+    retrieved = await engine.map(lambda file_id: engine.call(client.files.retrieve, file_id=file_id), missing_ids)
+    unresolved_ids = []
+    for file_id, file in zip(missing_ids, retrieved):
+        if isinstance(file, Exception):
+            print(f"  ✗ Failed to retrieve info for file ID {file_id}: {file}", file=sys.stderr)
+            unresolved_ids.append(file_id)
+        else:
+            file_index[file_id] = file
+
+    file_names = {file.id: file_index[file.id].filename for file in vector_store_files if file.id in file_index}
+    if not directory_path:
+        return {'success': not unresolved_ids, 'file_names': file_names, 'unresolved_ids': unresolved_ids}
+
+    directory_files = await asyncio.to_thread(get_directory_files, directory_path)
+    report = compare_directory_with_vector_store(directory_files, vector_store_files, file_names)
+    if manifest_path:
+        report['content'] = await asyncio.to_thread(
+            compare_content_hashes, directory_path, directory_files, manifest_path, vector_store_id, vector_store_files
+        )
+    content = report.get('content', {})
+    report['shared_names'] = [name for name, paths in sorted(directory_files.items()) if len(paths) > 1]
+    report['directory_file_count'] = sum(len(paths) for paths in directory_files.values())
+    report['entry_count'] = len(vector_store_files)
+    report['unresolved_ids'] = unresolved_ids
+    report['success'] = not (
+        report['missing'] or report['extra'] or report['duplicates'] or report['failed']
+        or unresolved_ids or content.get('changed') or content.get('dangling')
+    )
+    return report
+
+def print_verification_report(report):
+    """
+    Print the result of verify_vector_store.
+    """
+    if 'file_names' in report:
         print("\n📋 Vector Store File List:")
-        for i, filename in enumerate(file_names, 1):
+        for i, filename in enumerate(sorted(report['file_names'].values()), 1):
             print(f"  {i}. {filename}")
-    
-    return True
+        print(f"\nFiles whose name could not be retrieved: {len(report['unresolved_ids'])}")
+        return
+
+    print("\nVerification Results:")
+    print_file_group("Files missing from vector store", report['missing'], "✗")
+    print_file_group("Files in vector store but not in directory", report['extra'], "⚠️ ")
+    print_file_group("Files uploaded more than once", [
+        f"{name}: {', '.join(ids)}" for name, ids in report['duplicates'].items()
+    ], "⚠️ ")
+    print_file_group("Files that failed indexing", [
+        f"{name}: {error}" for name, error in report['failed'].items()
+    ], "✗")
+    print_file_group("Files still being indexed", report['in_progress'], "🔄")
+    print_file_group("Local files sharing a name (only one can be matched)", report['shared_names'], "⚠️ ")
+    print_file_group("Vector store entries whose name could not be retrieved", report['unresolved_ids'], "✗")
+    if 'content' in report:
+        print_file_group("Files changed since upload", report['content']['changed'], "~")
+        print_file_group("Manifest entries whose file is no longer in the vector store",
+                         report['content']['dangling'], "✗")
+
+    print(f"\nVerification Summary:")
+    print(f"Files present in vector store: {len(report['present'])}")
+    print(f"Files missing from vector store: {len(report['missing'])}")
+    print(f"Extra files in vector store: {len(report['extra'])}")
+    print(f"Duplicate file names in vector store: {len(report['duplicates'])}")
+    print(f"Files that failed indexing: {len(report['failed'])}")
+    if 'content' in report:
+        print(f"Files changed since upload: {len(report['content']['changed'])}")
+        print(f"Files not in the manifest: {len(report['content']['untracked'])}")
+    print(f"Total files checked: {report['directory_file_count']}")
 
 if __name__ == "__main__":
+    # With arguments, run unattended through the async engine instead of prompting
+    if len(sys.argv) > 1:
+        from ingest import main as ingest_main
+        exit(ingest_main(["verify", *sys.argv[1:]]))
+
     print("\n")
     print("=" * 50)
     print("🔍 Upload Verification for Azure OpenAI Vector Store")
     print("=" * 50)
-    
+
     # Get configuration from user
     config = get_user_configuration()
-    
-    # Initialize client
-    print("\n🔄 Initializing Azure OpenAI client...")
-    client = initialize_client(config)
-    
-    if not client:
-        print("❌ Failed to initialize client. Please check your configuration.")
-        exit(1)
-    
-    print("✅ Client initialized successfully!")
-    
+
     # Show configuration summary
     print(f"\nConfiguration Summary:")
     print(f"Vector Store ID: {config['vector_store_id']}")
     if config['directory_path']:
         print(f"Directory to verify: {config['directory_path']}")
+        print(f"Manifest for content hashes: {config['manifest_path'] or 'None'}")
     else:
         print("Directory to verify: None (will list all files in vector store)")
-    
+
     # Confirm before proceeding
     confirmation = input("\nProceed with verification? Type 'YES' to confirm: ")
-    
+
     if confirmation == "YES":
-        result = perform_upload_verification(client, config)
-        if result:
+        print("🔍 Starting Upload Verification Process")
+        print("-" * 40)
+        try:
+            result = run_with_engine(
+                config,
+                lambda engine: verify_vector_store(engine, config['vector_store_id'],
+                                                   config['directory_path'] or None, config['manifest_path'] or None),
+                max_concurrency=MAX_RETRIEVE_WORKERS
+            )
+        except Exception as e:
+            print(f"❌ Verification failed: {e}")
+            exit(1)
+        print_verification_report(result)
+        if result['success']:
             print(f"\n✅ Verification process completed successfully!")
         else:
-            print(f"\n❌ Verification process failed.")
+            print(f"\n❌ Verification found problems or failed.")
     else:
         print("Operation cancelled.")
-
-
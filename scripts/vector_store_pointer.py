@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import time
+
+# ====== POINTER NOTES ======
+# The pointer file tells the dashboard which vector stores to search:
+#
+#   {"active": ["vs_new"], "previous": ["vs_old"], "switched_at": 1700000000.0}
+#
+# Point the dashboard at it with the azure_vector_store_pointer_path secret.
+# It is always replaced atomically (write to a temporary file in the same
+# directory, fsync, os.replace), so the dashboard reads either the old or the
+# new list and picks up a switch on its next request without a restart.
+# ===========================
+
+
+def read_pointer(pointer_path):
+    """
+    Read the pointer file. Returns None if it doesn't exist yet.
+    """
+    try:
+        with open(pointer_path, "r", encoding="utf-8") as pointer_file:
+            return json.load(pointer_file)
+    except FileNotFoundError:
+        return None
+
+
+def write_pointer(pointer_path, active_ids, previous_ids):
+    """
+    Atomically replace the pointer file.
+    """
+    pointer = {
+        'active': list(active_ids),
+        'previous': list(previous_ids),
+        'switched_at': time.time()
+    }
+    directory = os.path.dirname(os.path.abspath(pointer_path))
+    file_descriptor, temporary_path = tempfile.mkstemp(prefix=".vector_store_pointer.", dir=directory)
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as temporary_file:
+            json.dump(pointer, temporary_file, indent=2)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        os.replace(temporary_path, pointer_path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+    # Make the rename itself durable
+    directory_descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_descriptor)
+    finally:
+        os.close(directory_descriptor)
+    return pointer
+
+
+def switch_to(pointer_path, new_ids, fallback_ids=()):
+    """
+    Make new_ids the active vector stores, keeping the current ones as previous for rollback.
+    fallback_ids are recorded as previous when no pointer file exists yet (e.g. the IDs from secrets).
+    """
+    current = read_pointer(pointer_path)
+    previous_ids = current['active'] if current else list(fallback_ids)
+    return write_pointer(pointer_path, new_ids, previous_ids)
+
+
+def rollback(pointer_path):
+    """
+    Swap the active and previous vector stores.
+
+    Raises:
+        ValueError: If there is nothing to roll back to
+    """
+    current = read_pointer(pointer_path)
+    if not current or not current.get('previous'):
+        raise ValueError("No previous vector stores recorded to roll back to.")
+    return write_pointer(pointer_path, current['previous'], current['active'])
@@ -0,0 +1,562 @@
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from batch_builder import iter_files
+from bulk_upload_to_vector_store import DEFAULT_MANIFEST_PATH, MAX_CONCURRENT_BATCHES, apply_delta, build_local_files
+from client_config import get_connection_configuration, initialize_client
+from extract_and_rename_html import generate_new_filename, is_up_to_date, sync_and_rename_files
+from upload_manifest import UploadManifest, plan_delta
+
+# ====== CONFIGURATION NOTES ======
+# This script will prompt for:
+# - Azure OpenAI API Key, Endpoint and API Version (skipped when AZURE_OPENAI_API_KEY,
+#   AZURE_OPENAI_ENDPOINT and OPENAI_API_VERSION are set)
+# - Source Directory (the documentation tree) and Destination Directory (renamed copies)
+# - Vector Store ID and Manifest Path
+# - Debounce Seconds and Max Workers
+# - Metrics File Path (JSON lines, one record per processed batch)
+# - Full Reconcile at Startup Option and Polling Option
+#
+# Watches the source tree (inotify on Linux, polling elsewhere or when inotify
+# is unavailable or out of watches) and pushes only the affected HTML files
+# through the same steps as extract_and_rename_html.py and the manifest sync
+# of bulk_upload_to_vector_store.py: changed files are copied/renamed and
+# uploaded, replacing their previous version once indexed; deleted files are
+# removed from the destination and the vector store.
+#
+# Events for a file are debounced until it has been quiet for the debounce
+# time (at most MAX_DEBOUNCE_SECONDS after its first event). One batch is
+# processed at a time, with copies and uploads bounded by the worker count;
+# changes arriving meanwhile are collected for the next batch.
+#
+# Ingestion lag is measured per file from the change (the file's ctime, or
+# the event time for deletions) until it is searchable (indexed or removed),
+# split into detection, debounce and processing time.
+# ===================================
+
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+MAX_DEBOUNCE_SECONDS = 30.0     # A file that keeps changing is processed at least this often
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_METRICS_PATH = "watch_metrics.jsonl"
+POLL_INTERVAL_SECONDS = 2.0     # Scan interval of the polling fallback
+TICK_SECONDS = 0.5              # How often the loop checks for files that are ready
+MAX_BATCH_PATHS = 500           # Files processed per batch; the rest wait for the next one
+MAX_ATTEMPTS = 3                # Processing attempts of a file before it's given up
+WATCHED_SUFFIX = ".html"
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+READ_BUFFER_BYTES = 64 * 1024
+
+
+def is_watched_file(relative_path: str) -> bool:
+    return relative_path.endswith(WATCHED_SUFFIX)
+
+
+def scan_tree(root: str, relative_dir: str = "") -> Dict[str, Tuple[int, int]]:
+    """
+    Map every watched file below root/relative_dir to its (mtime_ns, size), keyed by path relative to root.
+    """
+    snapshot = {}
+    for path, size in iter_files(os.path.join(root, relative_dir) if relative_dir else root):
+        relative_path = os.path.relpath(path, root)
+        if is_watched_file(relative_path):
+            try:
+                snapshot[relative_path] = (os.stat(path).st_mtime_ns, size)
+            except OSError:
+                continue
+    return snapshot
+
+
+class InotifyWatcher:
+    """
+    Recursive watch of a directory tree with inotify, one watch per directory.
+
+    Raises:
+        OSError: If inotify is unavailable or the watch limit is reached
+    """
+
+    name = "inotify"
+
+    def __init__(self, root: str):
+        self.root = root
+        library = ctypes.util.find_library("c")
+        if library is None:
+            raise OSError(errno.ENOSYS, "libc not found")
+        self.libc = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.watches: Dict[int, str] = {}       # Watch descriptor -> directory relative to root
+        try:
+            self.add_tree("")
+        except OSError:
+            self.close()
+            raise
+
+    def add_watch(self, relative_dir: str):
+        path = os.path.join(self.root, relative_dir) if relative_dir else self.root
+        watch = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if watch < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOENT:
+                return      # Removed again before it could be watched
+            raise OSError(error, f"inotify_add_watch {path}: {os.strerror(error)}")
+        self.watches[watch] = relative_dir
+
+    def add_tree(self, relative_dir: str):
+        top = os.path.join(self.root, relative_dir) if relative_dir else self.root
+        for directory, _, _ in os.walk(top):
+            relative = os.path.relpath(directory, self.root)
+            self.add_watch("" if relative == "." else relative)
+
+    def remove_tree(self, relative_dir: str):
+        prefix = relative_dir + os.sep
+        for watch, directory in list(self.watches.items()):
+            if directory == relative_dir or directory.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, watch)
+                self.watches.pop(watch, None)
+
+    def read_events(self, timeout: float) -> List[Tuple[str, str]]:
+        """
+        Wait up to timeout for events. Returns (kind, relative path) tuples, where kind is
+        'file' (a file changed or disappeared), 'rescan' (a directory appeared, or events were lost)
+        or 'removed_dir' (a directory disappeared).
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = b""
+        while True:
+            try:
+                data += os.read(self.fd, READ_BUFFER_BYTES)
+            except BlockingIOError:
+                break
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            watch, mask, _, name_length = EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + name_length]
+            offset += EVENT_HEADER.size + name_length
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(("rescan", ""))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(watch, None)
+                continue
+            directory = self.watches.get(watch)
+            if directory is None or not name:
+                continue
+            relative_path = os.path.join(directory, name) if directory else name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self.add_tree(relative_path)
+                    except OSError as e:
+                        print(f"  ⚠️  Not watching {relative_path}: {e}")
+                    events.append(("rescan", relative_path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.remove_tree(relative_path)
+                    events.append(("removed_dir", relative_path))
+            else:
+                events.append(("file", relative_path))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Fallback watcher that compares snapshots of the tree every POLL_INTERVAL_SECONDS.
+    """
+
+    name = "polling"
+
+    def __init__(self, root: str, interval: float = POLL_INTERVAL_SECONDS):
+        self.root = root
+        self.interval = interval
+        self.snapshot = scan_tree(root)
+        self.next_scan = time.monotonic() + interval
+
+    def read_events(self, timeout: float) -> List[Tuple[str, str]]:
+        now = time.monotonic()
+        if now < self.next_scan:
+            time.sleep(min(timeout, self.next_scan - now))
+            return []
+        snapshot = scan_tree(self.root)
+        changed = [relative_path for relative_path, state in snapshot.items() if self.snapshot.get(relative_path) != state]
+        changed += [relative_path for relative_path in self.snapshot if relative_path not in snapshot]
+        self.snapshot = snapshot
+        self.next_scan = time.monotonic() + self.interval
+        return [("file", relative_path) for relative_path in changed]
+
+    def close(self):
+        pass
+
+
+def create_watcher(root: str, force_polling: bool = False):
+    """
+    Watch root with inotify if possible, otherwise by polling.
+    """
+    if not force_polling:
+        try:
+            return InotifyWatcher(root)
+        except OSError as e:
+            print(f"⚠️  inotify unavailable ({e}), falling back to polling every {POLL_INTERVAL_SECONDS:.0f}s")
+    return PollingWatcher(root)
+
+
+class Debouncer:
+    """
+    Collects changed paths and releases each once it has been quiet for quiet_seconds,
+    or max_delay_seconds after its first event.
+    """
+
+    def __init__(self, quiet_seconds: float, max_delay_seconds: float = MAX_DEBOUNCE_SECONDS):
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = max(max_delay_seconds, quiet_seconds)
+        self.pending: Dict[str, Dict] = {}
+
+    def touch(self, relative_path: str, detected_at: Optional[float] = None, attempts: int = 0):
+        now = time.monotonic()
+        entry = self.pending.get(relative_path)
+        if entry is None:
+            self.pending[relative_path] = {
+                'first_event': now,
+                'last_event': now,
+                'detected_at': detected_at or time.time(),
+                'attempts': attempts
+            }
+        else:
+            # A retry of a path that changed again keeps its attempt count and its earliest change
+            entry['last_event'] = now
+            entry['attempts'] = max(entry['attempts'], attempts)
+            if detected_at is not None:
+                entry['detected_at'] = min(entry['detected_at'], detected_at)
+
+    def ready(self, limit: int = MAX_BATCH_PATHS) -> Dict[str, Dict]:
+        now = time.monotonic()
+        ready_paths = [
+            relative_path for relative_path, entry in self.pending.items()
+            if now - entry['last_event'] >= self.quiet_seconds or now - entry['first_event'] >= self.max_delay_seconds
+        ][:limit]
+        return {relative_path: self.pending.pop(relative_path) for relative_path in ready_paths}
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def process_batch(client, config: Dict, batch: Dict[str, Dict], orphans: Optional[Set[str]] = None) -> Dict:
+    """
+    Push a batch of changed source files through extract/rename and the manifest sync.
+    orphans are destination names without a source (found at startup) that are removed as well.
+
+    Returns:
+        dict: Per-path outcomes, failed paths and lag statistics
+    """
+    started_at = time.time()
+    source_dir, dest_dir = config['source_dir'], config['dest_dir']
+
+    # Extract/rename: copy changed sources, drop the copies of deleted ones
+    to_extract = []
+    dest_names = {}
+    change_times = {}
+    for relative_path, entry in batch.items():
+        source_path = os.path.join(source_dir, relative_path)
+        dest_names[relative_path] = generate_new_filename(relative_path)
+        try:
+            # ctime, unlike mtime, also moves when a file is renamed into place
+            change_times[relative_path] = min(os.stat(source_path).st_ctime, entry['detected_at'])
+            to_extract.append((source_path, relative_path))
+        except FileNotFoundError:
+            change_times[relative_path] = entry['detected_at']
+            try:
+                os.remove(os.path.join(dest_dir, dest_names[relative_path]))
+            except FileNotFoundError:
+                pass
+    for dest_name in orphans or ():
+        try:
+            os.remove(os.path.join(dest_dir, dest_name))
+        except FileNotFoundError:
+            pass
+
+    extract_start = time.monotonic()
+    extract_failed = set()
+    if to_extract:
+        extract_result = sync_and_rename_files(to_extract, dest_dir, max_workers=config['max_workers'])
+        if not extract_result['success']:
+            extract_failed = {relative_path for source_path, relative_path in to_extract
+                              if not is_up_to_date(source_path, os.path.join(dest_dir, dest_names[relative_path]))}
+    extract_seconds = time.monotonic() - extract_start
+
+    # Upload/replace/delete only the affected destination files
+    sync_start = time.monotonic()
+    affected = set(dest_names.values()) | set(orphans or ())
+    file_sizes = {}
+    for dest_name in affected:
+        dest_path = os.path.join(dest_dir, dest_name)
+        try:
+            file_sizes[dest_path] = os.path.getsize(dest_path)
+        except FileNotFoundError:
+            continue
+    local_files, unreadable, rejected = build_local_files(dest_dir, file_sizes)
+    with UploadManifest(config['manifest_path']) as manifest:
+        manifest_entries = {name: entry for name, entry in manifest.get_entries(config['vector_store_id']).items()
+                            if name in affected and name not in unreadable and name not in rejected}
+        delta = plan_delta(local_files, manifest_entries)
+        applied = apply_delta(client, config['vector_store_id'], manifest, manifest_entries, local_files, delta,
+                              max_upload_workers=config['max_workers'],
+                              max_concurrent_batches=min(config['max_workers'], MAX_CONCURRENT_BATCHES))
+    sync_seconds = time.monotonic() - sync_start
+
+    finished_at = time.time()
+    outcomes: Dict[str, int] = {}
+    failed = []
+    lags = []
+    for relative_path, entry in batch.items():
+        dest_name = dest_names[relative_path]
+        if relative_path in extract_failed or dest_name in unreadable:
+            outcome = 'failed'
+        elif dest_name in rejected:
+            outcome = 'rejected'
+        else:
+            outcome = applied['outcomes'].get(dest_name, 'unchanged')
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        if outcome == 'failed':
+            failed.append(relative_path)
+        elif outcome not in ('unchanged', 'rejected'):
+            lags.append({
+                'total': finished_at - change_times[relative_path],
+                'detection': max(entry['detected_at'] - change_times[relative_path], 0.0),
+                'debounce': max(started_at - entry['detected_at'], 0.0)
+            })
+
+    return {
+        'timestamp': finished_at,
+        'files': len(batch),
+        'orphans': len(orphans or ()),
+        'outcomes': outcomes,
+        'failed': failed,
+        'extract_seconds': extract_seconds,
+        'sync_seconds': sync_seconds,
+        'lag_seconds': {
+            'p50': percentile([lag['total'] for lag in lags], 0.5),
+            'p95': percentile([lag['total'] for lag in lags], 0.95),
+            'max': max((lag['total'] for lag in lags), default=None),
+            'detection_p50': percentile([lag['detection'] for lag in lags], 0.5),
+            'debounce_p50': percentile([lag['debounce'] for lag in lags], 0.5)
+        }
+    }
+
+
+def find_orphans(config: Dict, source_files) -> Set[str]:
+    """
+    Destination names recorded in the manifest whose source file no longer exists.
+    """
+    expected = {generate_new_filename(relative_path) for relative_path in source_files}
+    with UploadManifest(config['manifest_path']) as manifest:
+        return set(manifest.get_entries(config['vector_store_id'])) - expected
+
+
+def record_batch(config: Dict, watcher_name: str, result: Dict):
+    """
+    Append the batch metrics and print a one-line summary.
+    """
+    record = {key: value for key, value in result.items() if key != 'failed'}
+    record['watcher'] = watcher_name
+    with open(config['metrics_path'], "a", encoding="utf-8") as metrics_file:
+        metrics_file.write(json.dumps(record) + "\n")
+
+    lag = result['lag_seconds']
+    outcomes = ", ".join(f"{count} {outcome}" for outcome, count in sorted(result['outcomes'].items()))
+    lag_text = f", lag p50 {lag['p50']:.1f}s p95 {lag['p95']:.1f}s" if lag['p50'] is not None else ""
+    marker = "✗" if result['failed'] else "✓"
+    print(f"  {marker} Batch of {result['files']} file(s): {outcomes}{lag_text} "
+          f"(extract {result['extract_seconds']:.1f}s, sync {result['sync_seconds']:.1f}s)")
+
+
+def watch(client, config: Dict, stop_after: Optional[float] = None):
+    """
+    Watch the source directory and incrementally ingest changes until interrupted
+    (or for stop_after seconds).
+    """
+    source_dir = config['source_dir']
+    watcher = create_watcher(source_dir, config['force_polling'])
+    debouncer = Debouncer(config['debounce_seconds'])
+    known_files = set(scan_tree(source_dir))
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest")
+    running: Optional[Tuple[Future, Dict[str, Dict]]] = None     # (future, batch) being processed
+    totals = {'batches': 0, 'files': 0, 'failed': 0}
+    print(f"👀 Watching {source_dir} with {watcher.name} (debounce {config['debounce_seconds']:.1f}s)")
+
+    if config['reconcile']:
+        orphans = find_orphans(config, known_files)
+        print(f"🔄 Reconciling {len(known_files)} file(s) and {len(orphans)} orphaned upload(s)...")
+        startup_batch = {relative_path: {'detected_at': time.time(), 'attempts': 0} for relative_path in known_files}
+        running = (executor.submit(process_batch, client, config, startup_batch, orphans), startup_batch)
+
+    def touch_tree(relative_dir: str):
+        prefix = relative_dir + os.sep if relative_dir else ""
+        present = set(scan_tree(source_dir, relative_dir)) if os.path.isdir(os.path.join(source_dir, relative_dir)) else set()
+        for relative_path in present | {path for path in known_files if path.startswith(prefix)}:
+            debouncer.touch(relative_path)
+
+    deadline = time.monotonic() + stop_after if stop_after else None
+    try:
+        while deadline is None or time.monotonic() < deadline or running is not None or debouncer.pending:
+            for kind, relative_path in watcher.read_events(TICK_SECONDS):
+                if kind == "file":
+                    if is_watched_file(relative_path):
+                        debouncer.touch(relative_path)
+                else:
+                    # A directory appeared or disappeared, or events were lost
+                    touch_tree(relative_path)
+            for relative_path in debouncer.pending:
+                if os.path.exists(os.path.join(source_dir, relative_path)):
+                    known_files.add(relative_path)
+                else:
+                    known_files.discard(relative_path)
+
+            if running is not None and running[0].done():
+                future, running_batch = running
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"  ✗ Batch failed: {e}")
+                    result = {'failed': list(running_batch), 'files': len(running_batch)}
+                else:
+                    record_batch(config, watcher.name, result)
+                totals['batches'] += 1
+                totals['files'] += result['files']
+                for relative_path in result['failed']:
+                    entry = running_batch[relative_path]
+                    if entry['attempts'] + 1 < MAX_ATTEMPTS:
+                        debouncer.touch(relative_path, entry['detected_at'], entry['attempts'] + 1)
+                    else:
+                        totals['failed'] += 1
+                        print(f"  ✗ Giving up on {relative_path} after {MAX_ATTEMPTS} attempts")
+                running = None
+
+            if running is None:
+                batch = debouncer.ready()
+                if batch:
+                    running = (executor.submit(process_batch, client, config, batch), batch)
+    except KeyboardInterrupt:
+        print("\n⚠️  Stopping watch mode...")
+        if running is not None:
+            running[0].result()
+    finally:
+        watcher.close()
+        executor.shutdown(wait=True)
+
+    return {'success': totals['failed'] == 0, **totals}
+
+
+def get_user_configuration():
+    """
+    Get connection, directory, vector store and watch configuration from user input.
+    """
+    connection = get_connection_configuration()
+
+    source_dir = input("Enter source directory path (documentation tree to watch): ").strip()
+    while not os.path.isdir(source_dir):
+        print(f"Directory '{source_dir}' does not exist.")
+        source_dir = input("Enter source directory path (documentation tree to watch): ").strip()
+
+    dest_dir = input("Enter destination directory path (where renamed files are kept): ").strip()
+    while not dest_dir:
+        print("Destination directory path is required.")
+        dest_dir = input("Enter destination directory path (where renamed files are kept): ").strip()
+
+    vector_store_id = input("Enter vector store ID: ").strip()
+    while not vector_store_id:
+        print("Vector store ID is required.")
+        vector_store_id = input("Enter vector store ID: ").strip()
+
+    manifest_path = input(f"Enter manifest path (leave empty for '{DEFAULT_MANIFEST_PATH}'): ").strip()
+    debounce = input(f"Enter debounce seconds (leave empty for {DEFAULT_DEBOUNCE_SECONDS:.0f}): ").strip()
+    max_workers = input(f"Enter max workers (leave empty for {DEFAULT_MAX_WORKERS}): ").strip()
+    metrics_path = input(f"Enter metrics file path (leave empty for '{DEFAULT_METRICS_PATH}'): ").strip()
+    reconcile = input("Reconcile the whole tree once at startup? (Y/n): ").strip().lower() not in ['n', 'no']
+    force_polling = input("Use polling instead of inotify? (y/N): ").strip().lower() in ['y', 'yes']
+
+    return {
+        **connection,
+        'source_dir': source_dir,
+        'dest_dir': dest_dir,
+        'vector_store_id': vector_store_id,
+        'manifest_path': manifest_path or DEFAULT_MANIFEST_PATH,
+        'debounce_seconds': float(debounce) if debounce.replace(".", "", 1).isdigit() else DEFAULT_DEBOUNCE_SECONDS,
+        'max_workers': int(max_workers) if max_workers.isdigit() and int(max_workers) > 0 else DEFAULT_MAX_WORKERS,
+        'metrics_path': metrics_path or DEFAULT_METRICS_PATH,
+        'reconcile': reconcile,
+        'force_polling': force_polling
+    }
+
+
+def main():
+    """Main function to handle user input and run the watch mode."""
+    print("\n")
+    print("=" * 50)
+    print("👀 Documentation Watch Mode")
+    print("=" * 50)
+
+    config = get_user_configuration()
+
+    print("\n🔄 Initializing Azure OpenAI client...")
+    client = initialize_client(config)
+    if not client:
+        print("❌ Failed to initialize client. Please check your configuration.")
+        exit(1)
+    print("✅ Client initialized successfully!")
+
+    print(f"\nConfiguration Summary:")
+    print(f"Source directory: {config['source_dir']}")
+    print(f"Destination directory: {config['dest_dir']}")
+    print(f"Vector Store ID: {config['vector_store_id']}")
+    print(f"Manifest: {config['manifest_path']}")
+    print(f"Debounce: {config['debounce_seconds']:.1f}s, max workers: {config['max_workers']}")
+    print(f"Metrics: {config['metrics_path']}")
+    confirmation = input("\nStart watching? Type 'YES' to confirm: ")
+
+    if confirmation == "YES":
+        result = watch(client, config)
+        print(f"\nProcessed {result['files']} file(s) in {result['batches']} batch(es)")
+        if result['success']:
+            print(f"\n✅ Watch mode stopped.")
+        else:
+            print(f"\n❌ Watch mode stopped with {result['failed']} file(s) not ingested.")
+    else:
+        print("Operation cancelled.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,16 @@
+from cassette_transport import MODE_REPLAY, CassetteTransport
+from circuit_breaker import get_breaker
+from constants import ANSWER_OPERATION, SUGGESTIONS_OPERATION
+from endpoint_pool import get_endpoint_pool
 from helpers import StreamlitSecretsHelper
-from openai import AzureOpenAI
+from openai import (APIConnectionError, DefaultHttpxClient, InternalServerError, RateLimitError)
+from search_filters import derive_search_filters
 from utils import get_suggestions_from_csv
 from pydantic import BaseModel
+from typing import Any, Optional
+
+# Errors that say the service is unhealthy or overloaded; they count against the circuit breakers
+UPSTREAM_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
 
 class AzureOpenAIClient:
 
@@ -13,60 +22,109 @@ class AzureOpenAIClient:
     )
 
     def __init__(self):
-        self.api_key = StreamlitSecretsHelper.get_azure_openai_api_key()
-        self.endpoint = StreamlitSecretsHelper.get_azure_openai_endpoint()
-        self.api_version = StreamlitSecretsHelper.get_azure_openai_api_version()
-        self.model = StreamlitSecretsHelper.get_azure_openai_model()
-        self.vector_store_ids = StreamlitSecretsHelper.get_vector_store_id_list()
-
-        self.client = AzureOpenAI(
-            azure_endpoint=self.endpoint,
-            api_key=self.api_key,
-            api_version=self.api_version,
-        )
-
-    def get_response_for_query(self, query: str, previous_response_id: str = None):
+        # Requests are balanced across the configured endpoints; the first one is the default
+        self.endpoint_configs = {config["name"]: config for config in StreamlitSecretsHelper.get_endpoint_configs()}
+        primary = next(iter(self.endpoint_configs.values()))
+        self.api_key = primary["api_key"]
+        self.endpoint = primary["endpoint"]
+        self.api_version = primary["api_version"]
+        self.model = primary["model"]
+        self.vector_store_ids = primary["vector_store_ids"]
+        self.auto_filters = StreamlitSecretsHelper.get_file_search_auto_filters()
+        slo_settings = StreamlitSecretsHelper.get_slo_settings()
+        self.answer_breaker = get_breaker(ANSWER_OPERATION, slo_settings[ANSWER_OPERATION])
+        self.suggestions_breaker = get_breaker(SUGGESTIONS_OPERATION, slo_settings[SUGGESTIONS_OPERATION])
+
+        self.pool = get_endpoint_pool(list(self.endpoint_configs.values()), self.get_cassette_options,
+                                      repr(sorted(StreamlitSecretsHelper.get_cassette_settings().items())))
+        self.client = self.pool.endpoints[0].client
+
+    @staticmethod
+    def get_cassette_options() -> dict:
         """
-        Get the response for the given query using Azure OpenAI.
+        Client options that put the record/replay transport underneath the client, if a cassette mode is set.
         """
-        tools = [
-            {
-                "type": "file_search",
-                "vector_store_ids": self.vector_store_ids
-            }
-        ]
+        cassette = StreamlitSecretsHelper.get_cassette_settings()
+        if not cassette["mode"]:
+            return {}
+        transport = CassetteTransport(cassette["mode"], cassette["path"], cassette["latency_scale"])
+        options: dict[str, Any] = {"http_client": DefaultHttpxClient(transport=transport)}
+        if cassette["mode"] == MODE_REPLAY:
+            # A cassette miss is final; retrying it would only replay the miss again
+            options["max_retries"] = 0
+        return options
 
-        params = {
-            "model": self.model,
-            "input": query,
-            "instructions": self.SYSTEM_PROMPT,
-            "tools": tools,
+    def get_file_search_tool(self, filters: Optional[dict] = None, vector_store_ids: Optional[list[str]] = None):
+        """
+        Build the file_search tool, narrowed by an attribute filter if one is given.
+        """
+        tool = {
+            "type": "file_search",
+            "vector_store_ids": vector_store_ids or self.vector_store_ids
         }
-        if previous_response_id:
-            params["previous_response_id"] = previous_response_id
+        if filters:
+            tool["filters"] = filters
+        return tool
+
+    def resolve_filters(self, query: str, filters: Optional[dict] = None, search_context: Optional[dict] = None):
+        """
+        Use the explicit filters if given, otherwise derive them from the query and the session's
+        search context (updated in place) when auto filters are enabled.
+        """
+        if filters is None and search_context is not None and self.auto_filters:
+            filters = derive_search_filters(query, search_context)
+        return filters
+
+    def get_response_for_query(self, query: str, previous_response_id: Optional[str] = None, filters: Optional[dict] = None,
+                               search_context: Optional[dict] = None):
+        """
+        Get the response for the given query using Azure OpenAI.
+        A follow-up is sent to the endpoint that stored previous_response_id.
+        """
+        filters = self.resolve_filters(query, filters, search_context)
 
-        response = self.client.responses.create(**params)
+        def send(endpoint, chained_response_id):
+            config = self.endpoint_configs[endpoint.name]
+            params = {
+                "model": config["model"],
+                "input": query,
+                "instructions": self.SYSTEM_PROMPT,
+                "tools": [self.get_file_search_tool(filters, config["vector_store_ids"])],
+            }
+            if chained_response_id:
+                params["previous_response_id"] = chained_response_id
+            return endpoint.client.responses.create(**params)
+
+        response = self.answer_breaker.call(self.pool.request, send, previous_response_id,
+                                            failure_errors=UPSTREAM_ERRORS)
         return response
 
-    def get_suggestions(self, query: str):
+    def get_suggestions(self, query: str, filters: Optional[dict] = None, search_context: Optional[dict] = None):
         """
         Get suggestions based on the query.
         """
-        tools = [
-            {
-                "type": "file_search",
-                "vector_store_ids": self.vector_store_ids
-            }
-        ]
-        return self.client.responses.parse(
-            model=self.model,
-            input=[
-                {"role": "system", "content": "Give next 3 probable queries based on the provided user query."},
-                {"role": "user",   "content": query}
-            ],
-            tools=tools,
-            text_format=Suggestions
-        ).output_parsed
+        return self.get_suggestions_response(query, filters, search_context).output_parsed
+
+    def get_suggestions_response(self, query: str, filters: Optional[dict] = None,
+                                 search_context: Optional[dict] = None):
+        """
+        Get the parsed suggestions response, including its token usage.
+        """
+        filters = self.resolve_filters(query, filters, search_context)
+
+        def send(endpoint, _):
+            config = self.endpoint_configs[endpoint.name]
+            return endpoint.client.responses.parse(
+                model=config["model"],
+                input=[
+                    {"role": "system", "content": "Give next 3 probable queries based on the provided user query."},
+                    {"role": "user",   "content": query}
+                ],
+                tools=[self.get_file_search_tool(filters, config["vector_store_ids"])],
+                text_format=Suggestions
+            )
+
+        return self.suggestions_breaker.call(self.pool.request, send, failure_errors=UPSTREAM_ERRORS)
 
 class Suggestions(BaseModel):
     suggestion1: str
@@ -0,0 +1,246 @@
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional
+
+import httpx
+
+# ====== CASSETTE NOTES ======
+# Record/replay layer under AzureOpenAIClient, plugged in as the httpx transport
+# of the OpenAI client so responses.create, responses.parse and streamed
+# responses are all covered without touching the SDK's parsing.
+#
+# - record: requests go to the service; every response is captured chunk by
+#   chunk with the time each chunk arrived (for streams, the event timings).
+# - replay: responses are served from the cassette, sleeping until each chunk's
+#   recorded offset multiplied by the latency scale (0 = as fast as possible).
+#
+# Interactions are keyed by method, path and the canonical JSON request body;
+# repeated identical requests are replayed in recorded order. Rate-limited and
+# server-error responses aren't recorded, so a replay sees the exchange that
+# eventually succeeded. Request headers (including the API key) are never
+# stored. Cassettes are gzip-compressed JSON, kept in memory while recording
+# and written once when the transport is closed or the process exits.
+# ============================
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+CASSETTE_VERSION = 1
+_SKIPPED_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie", "connection"}
+
+
+def interaction_key(request: httpx.Request) -> str:
+    """
+    Key a request by method, path and canonical JSON body, ignoring headers and formatting.
+    """
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+    except ValueError:
+        pass
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    return f"{request.method} {request.url.path} {digest}"
+
+
+class Cassette:
+    """
+    Recorded interactions of one cassette file, shared by every client using the same path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.interactions: dict[str, list[dict]] = {}
+        self.replay_positions: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.replayed_seconds = 0.0
+        self.dirty = False
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as cassette_file:
+                self.interactions = json.load(cassette_file).get("interactions", {})
+
+    def add(self, key: str, interaction: dict):
+        with self.lock:
+            self.interactions.setdefault(key, []).append(interaction)
+            self.dirty = True
+
+    def next(self, key: str) -> Optional[dict]:
+        """
+        Get the next recorded interaction for the key, cycling through repeats.
+        """
+        with self.lock:
+            recorded = self.interactions.get(key)
+            if not recorded:
+                self.misses += 1
+                return None
+            position = self.replay_positions.get(key, 0)
+            self.replay_positions[key] = position + 1
+            self.hits += 1
+            return recorded[position % len(recorded)]
+
+    def save(self):
+        """
+        Write the recorded interactions if anything was added since the last save.
+        """
+        with self.lock:
+            if self.dirty:
+                self._write()
+                self.dirty = False
+
+    def _write(self):
+        """
+        Atomically replace the cassette file. Called with the lock held.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_descriptor, temporary_path = tempfile.mkstemp(prefix=".cassette.", dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                with gzip.GzipFile(fileobj=temporary_file, mode="wb") as compressed:
+                    compressed.write(json.dumps(
+                        {"version": CASSETTE_VERSION, "interactions": self.interactions}, separators=(",", ":")
+                    ).encode("utf-8"))
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "interactions": sum(len(recorded) for recorded in self.interactions.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "replayed_seconds": self.replayed_seconds
+            }
+
+
+_cassettes: dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str) -> Cassette:
+    """
+    Get the shared Cassette for a path, loading it on first use.
+    """
+    path = os.path.abspath(path)
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette(path)
+        return _cassettes[path]
+
+
+def save_cassettes():
+    """
+    Write every cassette with unsaved recordings.
+    """
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+    for cassette in cassettes:
+        cassette.save()
+
+
+atexit.register(save_cassettes)
+
+
+class RecordingStream(httpx.SyncByteStream):
+    """
+    Pass the response body through while noting when each chunk arrived; stores the interaction on close.
+    """
+
+    def __init__(self, stream, cassette: Cassette, key: str, response: httpx.Response, start_time: float):
+        self.stream = stream
+        self.cassette = cassette
+        self.key = key
+        self.response = response
+        self.start_time = start_time
+        self.chunks: List[list] = []
+        self.completed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self.stream:
+            # surrogateescape keeps arbitrary bytes representable in the JSON cassette
+            self.chunks.append([round(time.perf_counter() - self.start_time, 4),
+                                chunk.decode("utf-8", errors="surrogateescape")])
+            yield chunk
+        self.completed = True
+
+    def close(self):
+        self.stream.close()
+        if self.completed and self.response.status_code != 429 and self.response.status_code < 500:
+            self.cassette.add(self.key, {
+                "status": self.response.status_code,
+                "headers": [[name, value] for name, value in self.response.headers.items()
+                            if name.lower() not in _SKIPPED_RESPONSE_HEADERS],
+                "chunks": self.chunks
+            })
+
+
+class ReplayStream(httpx.SyncByteStream):
+    """
+    Yield recorded chunks, each no earlier than its recorded offset times the latency scale.
+    """
+
+    def __init__(self, chunks: list, cassette: Cassette, latency_scale: float, start_time: float):
+        self.chunks = chunks
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.start_time = start_time
+
+    def __iter__(self) -> Iterator[bytes]:
+        for offset, text in self.chunks:
+            delay = self.start_time + offset * self.latency_scale - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield text.encode("utf-8", errors="surrogateescape")
+        if self.chunks:
+            with self.cassette.lock:
+                self.cassette.replayed_seconds += self.chunks[-1][0] * self.latency_scale
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """
+    httpx transport that records responses from the real transport, or replays them from a cassette.
+    """
+
+    def __init__(self, mode: str, cassette_path: str, latency_scale: float = 1.0,
+                 transport: Optional[httpx.BaseTransport] = None):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected '{MODE_RECORD}' or '{MODE_REPLAY}')")
+        self.mode = mode
+        self.cassette = get_cassette(cassette_path)
+        self.latency_scale = latency_scale
+        self.transport = transport or (httpx.HTTPTransport() if mode == MODE_RECORD else None)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = interaction_key(request)
+        start_time = time.perf_counter()
+
+        if self.mode == MODE_REPLAY:
+            interaction = self.cassette.next(key)
+            if interaction is None:
+                return httpx.Response(404, request=request, json={"error": {
+                    "message": f"No recorded interaction for {key} in {self.cassette.path}",
+                    "type": "cassette_miss"
+                }})
+            return httpx.Response(
+                interaction["status"], headers=interaction["headers"], request=request,
+                stream=ReplayStream(interaction["chunks"], self.cassette, self.latency_scale, start_time)
+            )
+
+        # Uncompressed bodies keep the recorded chunks (and their timings) meaningful
+        request.headers["accept-encoding"] = "identity"
+        assert self.transport is not None, "record mode always has a transport"
+        response = self.transport.handle_request(request)
+        response.stream = RecordingStream(response.stream, self.cassette, key, response, start_time)
+        return response
+
+    def close(self):
+        self.cassette.save()
+        if self.transport is not None:
+            self.transport.close()
@@ -1,6 +1,16 @@
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import streamlit as st
 from constants import *
 from azure_openai_client import AzureOpenAIClient
+from circuit_breaker import CircuitOpenError, get_breaker
+from degradation import (answer_cache, count_fallback, get_degradation_metrics, normalize_query, run_in_background,
+                         suggestion_cache)
+from endpoint_pool import get_endpoint_metrics
+from helpers import StreamlitSecretsHelper
+from prefetch import SuggestionPrefetcher, get_prefetch_metrics
+from query_log import get_query_logger, get_query_stats, rank_queries
+from rerun_profiler import finish_rerun, profile_phase, start_rerun
 
 def initialize_session_state():
     """
@@ -16,12 +26,33 @@ def initialize_session_state():
     if "previous_response_id" not in st.session_state:
         st.session_state.previous_response_id = None
     
+    if "search_context" not in st.session_state:
+        st.session_state.search_context = get_initial_search_context()
+    
+    if "prefetcher" not in st.session_state:
+        prefetch_settings = StreamlitSecretsHelper.get_prefetch_settings()
+        st.session_state.prefetcher = SuggestionPrefetcher(
+            prefetch_settings["max_concurrency"], prefetch_settings["session_token_budget"]
+        ) if prefetch_settings["enabled"] else None
+    
     if "user_session_id" not in st.session_state:
         import uuid
         st.session_state.user_session_id = str(uuid.uuid4())
 
+def get_initial_search_context():
+    """
+    Get the file_search narrowing state for a new conversation (model/product are added as they're mentioned).
+    """
+    language = StreamlitSecretsHelper.get_file_search_language()
+    return {"language": language} if language else {}
+
+# Profile this rerun when enabled in the settings or requested with ?profile=1
+profile_settings = StreamlitSecretsHelper.get_profile_settings()
+start_rerun(__file__, profile_settings["enabled"], profile_settings["path"], st.query_params)
+
 # Initialize session state for this user
-initialize_session_state()
+with profile_phase("initialize_session_state"):
+    initialize_session_state()
 
 def on_submit():
     """
@@ -36,34 +67,154 @@ def on_submit():
         if "messages" not in st.session_state:
             st.session_state.messages = INITAL_MESSAGE_LIST.copy()
 
+        previous_query = next((message["content"] for message in reversed(st.session_state.messages)
+                               if message["role"] == "user"), None)
         st.session_state.messages.append({"role": "user", "content": chat_input})
+        start_time = time.perf_counter()
+        source = "error"
 
         try:
-            chat_response = get_response_for_query(chat_input)
-            next_suggestions = get_updated_suggestions(chat_input)
-
-            st.session_state.messages.append({"role": "assistant", "content": chat_response.output_text})
-            st.session_state.previous_response_id = chat_response.id
-            st.session_state.suggestions = [next_suggestions.suggestion1, next_suggestions.suggestion2, next_suggestions.suggestion3]
+            prefetched = take_prefetched(chat_input)
+            if prefetched:
+                source = "prefetch"
+                chat_response = prefetched["response"]
+                next_suggestions = prefetched["suggestions"]
+                st.session_state.search_context = prefetched["search_context"]
+                if st.session_state.previous_response_id is None:
+                    answer_cache.put(normalize_query(chat_input), chat_response.output_text)
+                st.session_state.messages.append({"role": "assistant", "content": chat_response.output_text})
+                st.session_state.previous_response_id = chat_response.id
+                st.session_state.suggestions = [next_suggestions.suggestion1, next_suggestions.suggestion2, next_suggestions.suggestion3]
+            else:
+                # Suggestions are fetched alongside the answer and replaced by a fallback if they miss their SLO
+                suggestions_future = start_suggestions(chat_input)
+                answer_text, response_id, source = get_answer(chat_input)
+                st.session_state.messages.append({"role": "assistant", "content": answer_text})
+                if response_id:
+                    st.session_state.previous_response_id = response_id
+                st.session_state.suggestions = collect_suggestions(chat_input, suggestions_future)
+            schedule_prefetch(chat_input)
         except Exception as e:
-            st.session_state.messages.append({"role": "assistant", "content": f"Sorry, I encountered an error: {str(e)}"})
+            st.session_state.messages.append({"role": "assistant", "content": UNAVAILABLE_MESSAGE})
             st.error(f"Error processing request: {str(e)}")
+        log_turn(chat_input, previous_query, source, time.perf_counter() - start_time)
+
+def log_turn(query, previous_query, source, latency_seconds):
+    """
+    Queue the turn for the query log, if one is configured. Never blocks the submit.
+    """
+    logger = get_query_logger(StreamlitSecretsHelper.get_query_log_dir())
+    if logger is None:
+        return
+    logger.log_turn({
+        "ts": time.time(),
+        "session": st.session_state.get("user_session_id"),
+        "query": query,
+        "normalized": normalize_query(query),
+        "previous": normalize_query(previous_query) if previous_query else None,
+        "source": source,
+        "latency_seconds": round(latency_seconds, 4),
+        "response_id": st.session_state.get("previous_response_id") if source in ("prefetch", "upstream") else None,
+        "search_context": dict(st.session_state.search_context),
+    })
 
 def get_response_for_query(query):
     """
     Get the response for the given query using Azure OpenAI.
     """
     client = AzureOpenAIClient()
-    response = client.get_response_for_query(query, st.session_state.get("previous_response_id"))
+    response = client.get_response_for_query(query, st.session_state.get("previous_response_id"),
+                                             search_context=st.session_state.search_context)
     return response
 
-def get_updated_suggestions(query):
+def get_answer(query):
     """
-    Get updated suggestions based on the query.
+    Get the answer text, response ID and how it was answered ("upstream", "cached" or "shed") for
+    the query. When the answer operation fails or its breaker is open, serve the last good answer
+    to the same query (response ID None), or shed the request with a short message instead of
+    waiting on a degraded service. Only opening turns are cached and served from the cache, since
+    a follow-up's answer depends on the conversation before it.
+    """
+    chained = st.session_state.get("previous_response_id") is not None
+    try:
+        response = get_response_for_query(query)
+    except Exception as e:
+        cached_answer = None if chained else answer_cache.get(normalize_query(query))
+        if cached_answer:
+            get_breaker(ANSWER_OPERATION).record_fallback()
+            count_fallback("cached_answers")
+            return cached_answer, None, "cached"
+        if isinstance(e, CircuitOpenError):
+            get_breaker(ANSWER_OPERATION).record_fallback()
+            count_fallback("shed_answers")
+            return BUSY_MESSAGE, None, "shed"
+        raise
+    if not chained:
+        answer_cache.put(normalize_query(query), response.output_text)
+    return response.output_text, response.id, "upstream"
+
+def start_suggestions(query):
+    """
+    Start fetching suggestions for the query in the background.
     """
     client = AzureOpenAIClient()
-    response = client.get_suggestions(query)
-    return response
+    # A copy, so the answer's narrowing of the session's context can't change the request mid-flight
+    future = run_in_background(client.get_suggestions, query, search_context=dict(st.session_state.search_context))
+    return future, time.monotonic() + client.suggestions_breaker.slo_seconds
+
+def collect_suggestions(query, suggestions_future):
+    """
+    Wait for the suggestions until their SLO deadline. Late, failed or rejected suggestions are
+    replaced by the last good suggestions for the same query, or the initial ones.
+    A late result still refreshes the cache when it arrives.
+    """
+    future, deadline = suggestions_future
+    cache_key = normalize_query(query)
+
+    def to_list(suggestions):
+        return [suggestions.suggestion1, suggestions.suggestion2, suggestions.suggestion3]
+
+    try:
+        suggestions = to_list(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        suggestion_cache.put(cache_key, suggestions)
+        return suggestions
+    except FutureTimeoutError:
+        future.add_done_callback(
+            lambda done: suggestion_cache.put(cache_key, to_list(done.result())) if done.exception() is None else None
+        )
+    except Exception:
+        pass
+
+    get_breaker(SUGGESTIONS_OPERATION).record_fallback()
+    cached_suggestions = suggestion_cache.get(cache_key)
+    if cached_suggestions:
+        count_fallback("cached_suggestions")
+        return cached_suggestions
+    count_fallback("static_suggestions")
+    return INITIAL_SUGGESTIONS.copy()
+
+def take_prefetched(query):
+    """
+    Get the prefetched answer and suggestions for the query, or None if it wasn't prefetched.
+    """
+    prefetcher = st.session_state.get("prefetcher")
+    if prefetcher is None:
+        return None
+    return prefetcher.take(query, st.session_state.get("previous_response_id"))
+
+def schedule_prefetch(query):
+    """
+    Start fetching answers for the displayed suggestions while the user reads, the suggestions
+    users most often asked after this query first, so the token budget goes to the likeliest ones.
+    """
+    prefetcher = st.session_state.get("prefetcher")
+    if prefetcher is None:
+        return
+    suggestions = {normalize_query(suggestion): suggestion for suggestion in st.session_state.suggestions}
+    stats = get_query_stats(StreamlitSecretsHelper.get_query_stats_path())
+    ranked = [suggestions[key] for key in rank_queries(list(suggestions), stats, normalize_query(query))]
+    prefetcher.schedule(AzureOpenAIClient(), ranked,
+                        st.session_state.previous_response_id, st.session_state.search_context)
 
 def reset_conversation():
     """
@@ -72,31 +223,36 @@ def reset_conversation():
     st.session_state.messages = INITAL_MESSAGE_LIST.copy()
     st.session_state.suggestions = INITIAL_SUGGESTIONS.copy()
     st.session_state.previous_response_id = None
+    st.session_state.search_context = get_initial_search_context()
+    if st.session_state.get("prefetcher") is not None:
+        st.session_state.prefetcher.discard()
     st.rerun()
 
-st.set_page_config(
-    page_title="Zebra Printers Chatbot",
-    page_icon=":speech_balloon:",
-    layout="wide",
-)
-
-# Add a header with reset option
-col1, col2 = st.columns([8, 1])
-with col1:
-    st.title("🦓 Zebra Printers Chatbot")
-with col2:
-    if st.button("🔄 Reset", help="Clear conversation history"):
-        reset_conversation()
-
-for message in st.session_state.messages:
-    if message["role"] == "assistant":
-        with st.chat_message("assistant"):
-            st.markdown(message["content"])
-    else:
-        with st.chat_message("user"):
-            st.markdown(message["content"])
-
-with st._bottom:
+with profile_phase("header"):
+    st.set_page_config(
+        page_title="Zebra Printers Chatbot",
+        page_icon=":speech_balloon:",
+        layout="wide",
+    )
+
+    # Add a header with reset option
+    col1, col2 = st.columns([8, 1])
+    with col1:
+        st.title("🦓 Zebra Printers Chatbot")
+    with col2:
+        if st.button("🔄 Reset", help="Clear conversation history"):
+            reset_conversation()
+
+with profile_phase("transcript"):
+    for message in st.session_state.messages:
+        if message["role"] == "assistant":
+            with st.chat_message("assistant"):
+                st.markdown(message["content"])
+        else:
+            with st.chat_message("user"):
+                st.markdown(message["content"])
+
+with profile_phase("bottom"), st._bottom:
 
     with st.container(border=True):
 
@@ -131,5 +287,21 @@ with st._bottom:
         st.write("Please wait after clicking submit button, it may take a few seconds to respond.")
         
         # Display session info at the bottom for debugging (remove in production)
-        st.caption(f"Session: {st.session_state.get('user_session_id', 'Not set')[:8]}... | Messages: {len(st.session_state.get('messages', []))}")
-        
\ No newline at end of file
+        prefetcher = st.session_state.get("prefetcher")
+        status_info = f" | Prefetch hits: {prefetcher.hits}/{prefetcher.lookups}" if prefetcher else ""
+        degradation_metrics = get_degradation_metrics()
+        degraded = [name for name, metrics in degradation_metrics["breakers"].items() if metrics["state"] != "closed"]
+        if degraded:
+            status_info += f" | Degraded: {', '.join(degraded)}"
+        fallbacks = sum(degradation_metrics["fallbacks"].values())
+        if fallbacks:
+            status_info += f" | Fallbacks served: {fallbacks}"
+        st.caption(f"Session: {st.session_state.get('user_session_id', 'Not set')[:8]}... | Messages: {len(st.session_state.get('messages', []))}{status_info}")
+        with st.expander("Service metrics"):
+            st.json({
+                "degradation": degradation_metrics,
+                "prefetch": get_prefetch_metrics(),
+                "endpoints": get_endpoint_metrics(),
+            }, expanded=False)
+
+finish_rerun(st.session_state.get("user_session_id", ""))
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+# ====== CIRCUIT BREAKER NOTES ======
+# One breaker per upstream operation, shared by every session of the process.
+# Each breaker keeps a rolling window of recent calls with their latency and
+# opens when too many of them failed or exceeded the operation's latency SLO.
+# While open, calls are rejected immediately (CircuitOpenError) so the
+# dashboard can fall back instead of waiting. After OPEN_SECONDS a single
+# probe call is let through (half-open): success closes the breaker, failure
+# or a slow call opens it again.
+# ===================================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+WINDOW_SIZE = 20                # Recent calls considered per breaker
+MIN_CALLS = 5                   # Calls needed in the window before the breaker can open
+FAILURE_RATE_THRESHOLD = 0.5
+SLOW_CALL_RATE_THRESHOLD = 0.5
+OPEN_SECONDS = 30.0
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling upstream while a breaker is open.
+    """
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} is temporarily unavailable (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Failure- and latency-driven breaker for one upstream operation.
+    """
+
+    def __init__(self, name: str, slo_seconds: float, window_size: int = WINDOW_SIZE, min_calls: int = MIN_CALLS,
+                 failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+                 slow_call_rate_threshold: float = SLOW_CALL_RATE_THRESHOLD, open_seconds: float = OPEN_SECONDS):
+        self.name = name
+        self.slo_seconds = slo_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.window: deque = deque(maxlen=window_size)     # (succeeded, latency seconds)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+        self.counts = {"calls": 0, "failures": 0, "slow_calls": 0, "rejected": 0, "opened": 0, "fallbacks": 0}
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go upstream now. In half-open state only one probe is let through.
+        """
+        with self.lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.counts["rejected"] += 1
+            return False
+
+    def record(self, succeeded: bool, latency: float):
+        with self.lock:
+            slow = latency > self.slo_seconds
+            self.counts["calls"] += 1
+            self.counts["failures"] += 0 if succeeded else 1
+            self.counts["slow_calls"] += 1 if slow else 0
+            self.window.append((succeeded, latency))
+
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+                if succeeded and not slow:
+                    self.state = CLOSED
+                    self.window.clear()
+                else:
+                    self._open()
+                return
+
+            if self.state == CLOSED and len(self.window) >= self.min_calls:
+                failure_rate = sum(1 for ok, _ in self.window if not ok) / len(self.window)
+                slow_rate = sum(1 for _, seconds in self.window if seconds > self.slo_seconds) / len(self.window)
+                if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                    self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.counts["opened"] += 1
+
+    def record_fallback(self):
+        with self.lock:
+            self.counts["fallbacks"] += 1
+
+    def call(self, function: Callable, *args, failure_errors: tuple = (Exception,), **kwargs):
+        """
+        Call function through the breaker, recording its outcome and latency.
+        Only failure_errors count as failures; other errors (e.g. a rejected request) say nothing
+        about upstream health and are recorded as answered calls.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, max(self.opened_at + self.open_seconds - time.monotonic(), 0.0))
+        start_time = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except failure_errors:
+            self.record(False, time.perf_counter() - start_time)
+            raise
+        except Exception:
+            self.record(True, time.perf_counter() - start_time)
+            raise
+        self.record(True, time.perf_counter() - start_time)
+        return result
+
+    def metrics(self) -> dict:
+        with self.lock:
+            latencies = sorted(seconds for _, seconds in self.window)
+            return dict(
+                self.counts,
+                state=self.state,
+                slo_seconds=self.slo_seconds,
+                window_p50_seconds=latencies[len(latencies) // 2] if latencies else None,
+                window_p95_seconds=latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else None,
+                window_slo_violation_rate=(
+                    sum(1 for seconds in latencies if seconds > self.slo_seconds) / len(latencies) if latencies else 0.0
+                )
+            )
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, slo_seconds: Optional[float] = None) -> CircuitBreaker:
+    """
+    Get the process-wide breaker for an operation, creating it with the given SLO on first use.
+    """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, slo_seconds if slo_seconds is not None else float("inf"))
+        return _breakers[name]
+
+
+def get_breaker_metrics() -> dict:
+    """
+    State, counters and windowed latency of every breaker, keyed by operation.
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.metrics() for breaker in breakers}
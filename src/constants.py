@@ -4,6 +4,52 @@ AZURE_OPENAI_ENDPOINT = "azure_openai_endpoint"
 AZURE_OPENAI_API_VERSION = "azure_openai_api_version"
 AZURE_OPENAI_API_MODEL = "azure_openai_api_model"
 VECTOR_STORE_ID_LIST = "azure_vector_store_id_list"
+VECTOR_STORE_POINTER_PATH = "azure_vector_store_pointer_path"
+FILE_SEARCH_AUTO_FILTERS = "azure_file_search_auto_filters"
+FILE_SEARCH_LANGUAGE = "azure_file_search_language"
+
+# Optional pool of Azure OpenAI resources/deployments to balance across, as a list of tables:
+#   [[azure_openai_endpoints]]
+#   endpoint = "https://<resource>.openai.azure.com/"
+#   api_key = "..."                          (defaults to azure_openai_api_key)
+#   model = "<deployment>"                   (defaults to azure_openai_api_model)
+#   api_version = "..."                      (defaults to azure_openai_api_version)
+#   vector_store_ids = "vs_1,vs_2"           (defaults to the stores above; stores are per resource)
+#   weight = 2                               (defaults to 1)
+#   name = "east"                            (defaults to the endpoint URL)
+# Without it, the single endpoint above is used.
+AZURE_OPENAI_ENDPOINTS = "azure_openai_endpoints"
+
+# Record/replay settings (secrets, or environment variables with the upper-case name)
+CASSETTE_MODE = "azure_openai_cassette_mode"
+CASSETTE_PATH = "azure_openai_cassette_path"
+REPLAY_LATENCY_SCALE = "azure_openai_replay_latency_scale"
+DEFAULT_CASSETTE_PATH = "chat_cassette.json.gz"
+
+# Speculative prefetch of suggestion answers (off unless enabled)
+PREFETCH_SUGGESTIONS = "azure_prefetch_suggestions"
+PREFETCH_MAX_CONCURRENCY = "azure_prefetch_max_concurrency"
+PREFETCH_SESSION_TOKEN_BUDGET = "azure_prefetch_session_token_budget"
+DEFAULT_PREFETCH_MAX_CONCURRENCY = 4
+DEFAULT_PREFETCH_SESSION_TOKEN_BUDGET = 50000
+
+# Latency SLOs of the upstream operations (seconds); breakers open when too many calls exceed them
+ANSWER_SLO_SECONDS = "azure_answer_slo_seconds"
+SUGGESTIONS_SLO_SECONDS = "azure_suggestions_slo_seconds"
+DEFAULT_ANSWER_SLO_SECONDS = 30.0
+DEFAULT_SUGGESTIONS_SLO_SECONDS = 8.0
+ANSWER_OPERATION = "responses.create"
+SUGGESTIONS_OPERATION = "responses.parse"
+
+# Sampling profiler for the dashboard's own rerun time (off unless enabled here or with ?profile=1)
+DASHBOARD_PROFILE = "dashboard_profile"
+DASHBOARD_PROFILE_PATH = "dashboard_profile_path"
+DEFAULT_DASHBOARD_PROFILE_PATH = "dashboard_profile.folded"
+
+# Directory of the turn log mined by scripts/mine_query_log.py (off unless set)
+QUERY_LOG_DIR = "query_log_dir"
+# Statistics written by scripts/mine_query_log.py, used to order prefetches (off unless set)
+QUERY_STATS_PATH = "query_stats_path"
 
 # Initial Constants for the Assistant
 INITIAL_SUGGESTIONS = [
@@ -14,6 +60,10 @@ INITIAL_SUGGESTIONS = [
 
 INITIAL_MESSAGE = "Welcome to the Zebra Printer Assistant! How can I help you today?"
 
+BUSY_MESSAGE = "The assistant is busy right now. Please try again in a moment."
+
+UNAVAILABLE_MESSAGE = "Sorry, I couldn't get an answer right now. Please try again in a moment."
+
 INITAL_MESSAGE_LIST = [
     {
         "role" : "assistant",
@@ -0,0 +1,81 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from circuit_breaker import get_breaker_metrics
+
+# ====== DEGRADATION NOTES ======
+# Fallbacks used by the dashboard when an upstream operation is slow, failing
+# or its circuit breaker is open:
+# - suggestions: the last good suggestions for the same query, else the static ones
+# - answers: the last good answer for the same opening query (follow-ups depend on
+#   the conversation, so they are never cached), else the request is shed with a
+#   short "busy" message instead of waiting on a degraded service
+# The caches are process-wide LRUs keyed by the normalized query text.
+# ===============================
+
+MAX_CACHED_QUERIES = 512
+BACKGROUND_WORKERS = 8
+
+_fallback_counts = {"cached_suggestions": 0, "static_suggestions": 0, "cached_answers": 0, "shed_answers": 0}
+_counts_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="upstream")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Lower-case the query and drop punctuation and repeated whitespace.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_QUERIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key: str, value: Any):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+answer_cache = LRUCache()
+suggestion_cache = LRUCache()
+
+
+def count_fallback(name: str):
+    with _counts_lock:
+        _fallback_counts[name] += 1
+
+
+def run_in_background(function, *args, **kwargs) -> Future:
+    """
+    Run an upstream call on the shared pool so the caller can wait on it with a deadline.
+    """
+    return _executor.submit(function, *args, **kwargs)
+
+
+def get_degradation_metrics() -> dict:
+    """
+    Breaker state and counters per operation, plus how often each fallback was served.
+    """
+    with _counts_lock:
+        fallbacks = dict(_fallback_counts)
+    return {"breakers": get_breaker_metrics(), "fallbacks": fallbacks}
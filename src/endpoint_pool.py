@@ -0,0 +1,300 @@
+import atexit
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from openai import APIConnectionError, AzureOpenAI, BadRequestError, InternalServerError, NotFoundError, RateLimitError
+
+# ====== ENDPOINT POOL NOTES ======
+# Routes requests across several Azure OpenAI resources/deployments. Each
+# request goes to the healthy endpoint with the lowest
+#   (outstanding requests + 1) * latency EWMA / weight
+# so faster, less busy and higher-quota endpoints take more of the traffic.
+#
+# - A throttled endpoint (429) is ejected for its retry-after time; one that
+#   fails EJECT_AFTER_FAILURES times in a row is ejected with a growing
+#   backoff. Once the ejection expires a single probe request is let through;
+#   its success puts the endpoint back into rotation.
+# - Stored responses only exist on the resource that created them, so a
+#   request continuing a conversation (previous_response_id) is sent to the
+#   endpoint that produced that response. Only if that endpoint is ejected is
+#   the conversation continued elsewhere, without the chained context.
+#   A response the pool doesn't know (e.g. from before a restart) is chained
+#   wherever the request is routed; if that resource rejects it, the request
+#   is sent again without the chained context.
+# - Requests that don't continue a conversation fail over to another endpoint
+#   on upstream errors.
+# =================================
+
+LATENCY_EWMA_ALPHA = 0.3
+INITIAL_LATENCY_SECONDS = 1.0       # Assumed latency before an endpoint has answered
+EJECT_AFTER_FAILURES = 3
+EJECT_BASE_SECONDS = 5.0
+EJECT_MAX_SECONDS = 300.0
+THROTTLE_EJECT_SECONDS = 10.0       # Used when a 429 carries no retry-after header
+MAX_FAILOVER_ATTEMPTS = 3
+MAX_AFFINITY_ENTRIES = 100000
+FAILOVER_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
+UNKNOWN_CHAIN_ERRORS = (NotFoundError, BadRequestError)    # Statuses that may mean previous_response_id isn't stored
+UNKNOWN_CHAIN_ERROR_CODE = "previous_response_not_found"
+
+
+class Endpoint:
+    """
+    One Azure OpenAI resource with its client and health statistics.
+    """
+
+    def __init__(self, name: str, client: AzureOpenAI, weight: float):
+        self.name = name
+        self.client = client
+        self.weight = max(weight, 0.01)
+        self.outstanding = 0
+        self.latency_ewma = INITIAL_LATENCY_SECONDS
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.probing = False
+        self.counts = {"requests": 0, "failures": 0, "throttled": 0, "ejected": 0}
+
+    def is_available(self, now: float) -> bool:
+        if self.ejected_until == 0.0:
+            return True
+        # Ejection expired: let a single probe through at a time
+        return now >= self.ejected_until and not self.probing
+
+    def score(self) -> float:
+        return (self.outstanding + 1) * self.latency_ewma / self.weight
+
+
+class EndpointPool:
+    """
+    Least-outstanding, latency-aware, weighted routing with ejection and conversation affinity.
+    """
+
+    def __init__(self, endpoints: list[Endpoint]):
+        if not endpoints:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        self.endpoints = endpoints
+        self.by_name = {endpoint.name: endpoint for endpoint in endpoints}
+        self.affinity: OrderedDict = OrderedDict()     # response ID -> endpoint name
+        self.affinity_breaks = 0
+        self.lock = threading.Lock()
+
+    def _acquire(self, endpoint: Endpoint):
+        endpoint.outstanding += 1
+        endpoint.counts["requests"] += 1
+        if endpoint.ejected_until:
+            endpoint.probing = True
+
+    def choose(self, excluded: tuple = ()) -> Endpoint:
+        """
+        Pick the best available endpoint and count a request against it. If every endpoint is
+        ejected, the one whose ejection ends first is used anyway rather than failing outright.
+        """
+        with self.lock:
+            now = time.monotonic()
+            candidates = [endpoint for endpoint in self.endpoints
+                          if endpoint.name not in excluded and endpoint.is_available(now)]
+            if candidates:
+                best_score = min(endpoint.score() for endpoint in candidates)
+                endpoint = random.choice([candidate for candidate in candidates if candidate.score() == best_score])
+            else:
+                remaining = [endpoint for endpoint in self.endpoints if endpoint.name not in excluded] or self.endpoints
+                endpoint = min(remaining, key=lambda candidate: candidate.ejected_until)
+            self._acquire(endpoint)
+            return endpoint
+
+    def choose_for_conversation(self, previous_response_id: str) -> Optional[Endpoint]:
+        """
+        The endpoint that created previous_response_id, or None if it's unknown or ejected.
+        """
+        with self.lock:
+            name = self.affinity.get(previous_response_id)
+            endpoint = self.by_name.get(name) if name is not None else None
+            if endpoint is None:
+                return None
+            if not endpoint.is_available(time.monotonic()):
+                self.affinity_breaks += 1
+                return None
+            self._acquire(endpoint)
+            return endpoint
+
+    def record(self, endpoint: Endpoint, latency: float, error: Optional[Exception] = None):
+        with self.lock:
+            endpoint.outstanding -= 1
+            endpoint.probing = False
+            if error is None:
+                endpoint.latency_ewma += LATENCY_EWMA_ALPHA * (latency - endpoint.latency_ewma)
+                endpoint.consecutive_failures = 0
+                endpoint.ejected_until = 0.0
+                endpoint.ejections = 0
+                return
+
+            endpoint.counts["failures"] += 1
+            endpoint.consecutive_failures += 1
+            if isinstance(error, RateLimitError):
+                endpoint.counts["throttled"] += 1
+                self._eject(endpoint, _retry_after(error) or THROTTLE_EJECT_SECONDS)
+            elif endpoint.ejected_until or endpoint.consecutive_failures >= EJECT_AFTER_FAILURES:
+                # A failed probe, or too many failures in a row
+                self._eject(endpoint, min(EJECT_BASE_SECONDS * 2 ** endpoint.ejections, EJECT_MAX_SECONDS))
+
+    def _eject(self, endpoint: Endpoint, seconds: float):
+        endpoint.ejected_until = time.monotonic() + seconds
+        endpoint.ejections += 1
+        endpoint.counts["ejected"] += 1
+
+    def remember(self, response_id: str, endpoint: Endpoint):
+        with self.lock:
+            self.affinity[response_id] = endpoint.name
+            while len(self.affinity) > MAX_AFFINITY_ENTRIES:
+                self.affinity.popitem(last=False)
+
+    def request(self, send: Callable, previous_response_id: Optional[str] = None):
+        """
+        Send a request through the pool. send(endpoint, previous_response_id) performs the call;
+        previous_response_id is passed on only when the request goes to the endpoint that owns it.
+        """
+        endpoint = self.choose_for_conversation(previous_response_id) if previous_response_id else None
+        if endpoint is not None:
+            return self._send(send, endpoint, previous_response_id)
+
+        # Unknown conversations (e.g. from before a restart) are tried where they're routed
+        chained_id = previous_response_id if previous_response_id not in self.affinity else None
+        tried: tuple[str, ...] = ()
+        attempts = min(MAX_FAILOVER_ATTEMPTS, len(self.endpoints))
+        while True:
+            endpoint = self.choose(excluded=tried)
+            try:
+                return self._send(send, endpoint, chained_id)
+            except UNKNOWN_CHAIN_ERRORS as e:
+                if chained_id is None or not _is_unknown_chain_error(e):
+                    raise
+                # Stored on another resource, or expired: continue without the chained context
+                with self.lock:
+                    self.affinity_breaks += 1
+                chained_id = None
+            except FAILOVER_ERRORS:
+                tried += (endpoint.name,)
+                if len(tried) == attempts:
+                    raise
+
+    def _send(self, send: Callable, endpoint: Endpoint, previous_response_id: Optional[str]):
+        start_time = time.perf_counter()
+        try:
+            response = send(endpoint, previous_response_id)
+        except FAILOVER_ERRORS as e:
+            self.record(endpoint, time.perf_counter() - start_time, e)
+            raise
+        except Exception:
+            self.record(endpoint, time.perf_counter() - start_time)
+            raise
+        self.record(endpoint, time.perf_counter() - start_time)
+        response_id = getattr(response, "id", None)
+        if response_id:
+            self.remember(response_id, endpoint)
+        return response
+
+    def close(self):
+        """
+        Close the clients, and with them their HTTP connections and transports.
+        """
+        for endpoint in self.endpoints:
+            endpoint.client.close()
+
+    def metrics(self) -> dict:
+        with self.lock:
+            now = time.monotonic()
+            return {
+                "affinity_entries": len(self.affinity),
+                "affinity_breaks": self.affinity_breaks,
+                "endpoints": {
+                    endpoint.name: dict(
+                        endpoint.counts,
+                        weight=endpoint.weight,
+                        outstanding=endpoint.outstanding,
+                        latency_ewma_seconds=endpoint.latency_ewma,
+                        ejected_for_seconds=max(endpoint.ejected_until - now, 0.0)
+                    )
+                    for endpoint in self.endpoints
+                }
+            }
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_unknown_chain_error(error: Exception) -> bool:
+    """
+    Whether the resource rejected the request because it doesn't store previous_response_id,
+    as opposed to any other invalid request or missing resource.
+    """
+    if getattr(error, "code", None) == UNKNOWN_CHAIN_ERROR_CODE:
+        return True
+    message = str(getattr(error, "message", None) or error).lower()
+    return "previous response" in message and "not found" in message
+
+
+_pools: dict[str, EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(endpoint_configs: list[dict], client_options: Callable[[], dict],
+                      options_key: str = "") -> EndpointPool:
+    """
+    Get the process-wide pool for these endpoints, creating the clients on first use.
+    client_options() gives the extra AzureOpenAI options of each client and options_key identifies them.
+    Pools are keyed by endpoint, API version, key, weight and options, so changed settings get a new pool;
+    the clients (and any transport underneath them) are created once per pool and closed at exit.
+    """
+    fingerprint = hashlib.sha256(repr([
+        (config["name"], config["endpoint"], config["api_version"], config["api_key"], config["weight"])
+        for config in endpoint_configs
+    ] + [options_key]).encode("utf-8")).hexdigest()
+
+    with _pools_lock:
+        if fingerprint not in _pools:
+            endpoints = []
+            for config in endpoint_configs:
+                options = client_options()
+                if len(endpoint_configs) > 1:
+                    # The pool fails over to another endpoint instead of retrying the same one
+                    options.setdefault("max_retries", 0)
+                client = AzureOpenAI(azure_endpoint=config["endpoint"], api_key=config["api_key"],
+                                     api_version=config["api_version"], **options)
+                endpoints.append(Endpoint(config["name"], client, config["weight"]))
+            _pools[fingerprint] = EndpointPool(endpoints)
+        return _pools[fingerprint]
+
+
+def close_endpoint_pools():
+    """
+    Close and forget every pool; the next get_endpoint_pool() creates new clients.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_endpoint_pools)
+
+
+def get_endpoint_metrics() -> dict:
+    """
+    Routing and health statistics of every pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {"pools": [pool.metrics() for pool in pools]}
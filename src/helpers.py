@@ -1,7 +1,37 @@
+import json
+import os
 from typing import Any
 from constants import *
 import streamlit as st
 
+# Active vector store IDs read from the pointer file, cached until the file's mtime changes
+_pointer_cache: dict[str, tuple[int, list[str]]] = {}
+
+
+def read_active_vector_store_ids(pointer_path: str) -> list[str]:
+    """
+    Read the active vector store IDs from a pointer file written by rebuild_vector_store.py.
+    The file is replaced atomically on switch-over, so a reader sees either the old or the new list.
+    Returns an empty list if the file is missing or unreadable.
+    """
+    try:
+        mtime = os.stat(pointer_path).st_mtime_ns
+    except OSError:
+        return []
+
+    cached = _pointer_cache.get(pointer_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(pointer_path, "r", encoding="utf-8") as pointer_file:
+            active_ids = [str(item) for item in json.load(pointer_file).get("active", [])]
+    except (OSError, ValueError, AttributeError):
+        return cached[1] if cached else []
+
+    _pointer_cache[pointer_path] = (mtime, active_ids)
+    return active_ids
+
 
 class StreamlitSecretsHelper:
     @staticmethod
@@ -22,9 +52,103 @@ class StreamlitSecretsHelper:
     
     @staticmethod
     def get_vector_store_id_list() -> list[str]:
+        # A pointer file, if configured, takes precedence so stores can be switched without a restart
+        pointer_path = StreamlitSecretsHelper.get_optional_secret(VECTOR_STORE_POINTER_PATH)
+        if pointer_path:
+            active_ids = read_active_vector_store_ids(pointer_path)
+            if active_ids:
+                return active_ids
         csv_string = StreamlitSecretsHelper.get_secret(VECTOR_STORE_ID_LIST)
         return [item.strip() for item in csv_string.split(",") if item.strip()]
 
+    @staticmethod
+    def get_endpoint_configs() -> list[dict]:
+        # Pool entries fall back to the single-endpoint secrets for anything they don't set
+        entries = StreamlitSecretsHelper.get_optional_secret(AZURE_OPENAI_ENDPOINTS) or [
+            {"endpoint": StreamlitSecretsHelper.get_azure_openai_endpoint()}
+        ]
+        configs = []
+        for entry in entries:
+            entry = dict(entry)
+            vector_store_ids = entry.get("vector_store_ids")
+            if isinstance(vector_store_ids, str):
+                vector_store_ids = [item.strip() for item in vector_store_ids.split(",") if item.strip()]
+            configs.append({
+                "name": entry.get("name") or entry["endpoint"],
+                "endpoint": entry["endpoint"],
+                "api_key": entry.get("api_key") or StreamlitSecretsHelper.get_azure_openai_api_key(),
+                "api_version": entry.get("api_version") or StreamlitSecretsHelper.get_azure_openai_api_version(),
+                "model": entry.get("model") or StreamlitSecretsHelper.get_azure_openai_model(),
+                "vector_store_ids": vector_store_ids or StreamlitSecretsHelper.get_vector_store_id_list(),
+                "weight": float(entry.get("weight", 1))
+            })
+        return configs
+
+    @staticmethod
+    def get_file_search_auto_filters() -> bool:
+        # Off unless enabled: a filter matches no file without attributes, so it's only safe once
+        # every file of the configured stores has been tagged at upload
+        value = StreamlitSecretsHelper.get_optional_secret(FILE_SEARCH_AUTO_FILTERS, False)
+        return str(value).strip().lower() in ("true", "1", "yes", "on")
+
+    @staticmethod
+    def get_file_search_language() -> str:
+        return str(StreamlitSecretsHelper.get_optional_secret(FILE_SEARCH_LANGUAGE, ""))
+
+    @staticmethod
+    def get_slo_settings() -> dict:
+        return {
+            ANSWER_OPERATION: float(StreamlitSecretsHelper.get_optional_setting(
+                ANSWER_SLO_SECONDS, DEFAULT_ANSWER_SLO_SECONDS)),
+            SUGGESTIONS_OPERATION: float(StreamlitSecretsHelper.get_optional_setting(
+                SUGGESTIONS_SLO_SECONDS, DEFAULT_SUGGESTIONS_SLO_SECONDS))
+        }
+
+    @staticmethod
+    def get_prefetch_settings() -> dict:
+        enabled = StreamlitSecretsHelper.get_optional_setting(PREFETCH_SUGGESTIONS, False)
+        return {
+            "enabled": str(enabled).strip().lower() in ("true", "1", "yes", "on"),
+            "max_concurrency": int(StreamlitSecretsHelper.get_optional_setting(
+                PREFETCH_MAX_CONCURRENCY, DEFAULT_PREFETCH_MAX_CONCURRENCY)),
+            "session_token_budget": int(StreamlitSecretsHelper.get_optional_setting(
+                PREFETCH_SESSION_TOKEN_BUDGET, DEFAULT_PREFETCH_SESSION_TOKEN_BUDGET))
+        }
+
+    @staticmethod
+    def get_profile_settings() -> dict:
+        enabled = StreamlitSecretsHelper.get_optional_setting(DASHBOARD_PROFILE, False)
+        return {
+            "enabled": str(enabled).strip().lower() in ("true", "1", "yes", "on"),
+            "path": StreamlitSecretsHelper.get_optional_setting(DASHBOARD_PROFILE_PATH, DEFAULT_DASHBOARD_PROFILE_PATH)
+        }
+
+    @staticmethod
+    def get_query_log_dir() -> str:
+        return str(StreamlitSecretsHelper.get_optional_setting(QUERY_LOG_DIR, ""))
+
+    @staticmethod
+    def get_query_stats_path() -> str:
+        return str(StreamlitSecretsHelper.get_optional_setting(QUERY_STATS_PATH, ""))
+
+    @staticmethod
+    def get_cassette_settings() -> dict:
+        # Environment variables win so benchmarks can switch modes without editing secrets
+        mode = StreamlitSecretsHelper.get_optional_setting(CASSETTE_MODE, "")
+        return {
+            "mode": str(mode).strip().lower(),
+            "path": StreamlitSecretsHelper.get_optional_setting(CASSETTE_PATH, DEFAULT_CASSETTE_PATH),
+            "latency_scale": float(StreamlitSecretsHelper.get_optional_setting(REPLAY_LATENCY_SCALE, 1.0))
+        }
+
+    @staticmethod
+    def get_optional_setting(name: str, default: Any = None) -> Any:
+        return os.environ.get(name.upper()) or StreamlitSecretsHelper.get_optional_secret(name, default)
+
     @staticmethod
     def get_secret(name: str) -> Any:
-        return st.secrets[name]
\ No newline at end of file
+        return st.secrets[name]
+
+    @staticmethod
+    def get_optional_secret(name: str, default: Any = None) -> Any:
+        return st.secrets.get(name, default)
\ No newline at end of file
@@ -0,0 +1,225 @@
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from circuit_breaker import CLOSED, get_breaker
+from constants import ANSWER_OPERATION
+
+# ====== PREFETCH NOTES ======
+# Speculative execution for the suggestion buttons. After each turn, the answer
+# and follow-up suggestions for every displayed suggestion are fetched in the
+# background, chained to the current previous_response_id. Submitting a
+# suggestion then takes the prefetched result instead of starting a cold round
+# trip. Speculations left unused when the next turn starts are cancelled (if
+# not started yet) or discarded and counted as waste.
+#
+# Caps: one process-wide pool bounds concurrent speculative calls, new work is
+# skipped while the pool's backlog is full, and each session's speculative
+# token spend stays within the session budget. Spend is only known once a
+# speculation finishes, so each one reserves an estimate (the most expensive
+# speculation seen so far) before it starts; the reservation is settled with
+# the actual usage of the answer and the suggestions call. Nothing is
+# speculated while the answer operation's circuit breaker isn't closed.
+# Waiting for a running speculation is bounded by the answer SLO.
+# ============================
+
+INITIAL_TOKEN_ESTIMATE = 6000   # Reserved per speculation until one has finished
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = 0
+_metrics = {
+    "scheduled": 0,
+    "hits": 0,
+    "misses": 0,
+    "wasted": 0,
+    "cancelled": 0,
+    "failed": 0,
+    "skipped_budget": 0,
+    "skipped_backlog": 0,
+    "skipped_degraded": 0,
+    "tokens_used": 0,
+    "tokens_wasted": 0,
+}
+
+
+def _count(name: str, amount: int = 1):
+    with _executor_lock:
+        _metrics[name] += amount
+
+
+def get_prefetch_metrics() -> dict:
+    """
+    Process-wide prefetch counters, with the hit rate over submitted queries.
+    """
+    with _executor_lock:
+        metrics: dict = dict(_metrics, pending=_pending)
+    lookups = metrics["hits"] + metrics["misses"]
+    metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+    return metrics
+
+
+def _submit(max_concurrency: int, function, *args) -> Optional[Future]:
+    """
+    Run function on the shared pool, or return None if its backlog is already full.
+    """
+    global _executor, _pending
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        if _pending >= max_concurrency * 2:
+            return None
+        _pending += 1
+        future = _executor.submit(function, *args)
+
+    def finished(_):
+        global _pending
+        with _executor_lock:
+            _pending -= 1
+
+    future.add_done_callback(finished)
+    return future
+
+
+def _response_tokens(response) -> int:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", 0) or 0
+
+
+def speculate(client, query: str, previous_response_id: Optional[str], search_context: dict) -> dict:
+    """
+    Fetch what on_submit would fetch for the query: the chained answer and the next suggestions.
+    tokens is the usage of both calls.
+    """
+    response = client.get_response_for_query(query, previous_response_id, search_context=search_context)
+    suggestions_response = client.get_suggestions_response(query, search_context=search_context)
+    return {
+        "response": response,
+        "suggestions": suggestions_response.output_parsed,
+        "search_context": search_context,
+        "tokens": _response_tokens(response) + _response_tokens(suggestions_response),
+    }
+
+
+class SuggestionPrefetcher:
+    """
+    Per-session speculations for the displayed suggestions, kept in st.session_state.
+    """
+
+    def __init__(self, max_concurrency: int, session_token_budget: int):
+        self.max_concurrency = max_concurrency
+        self.session_token_budget = session_token_budget
+        self.previous_response_id: Optional[str] = None
+        self.speculations: dict[str, Future] = {}
+        self.tokens_used = 0
+        self.tokens_reserved = 0
+        self.token_estimate = INITIAL_TOKEN_ESTIMATE
+        self.max_tokens_seen = 0
+        self.hits = 0
+        self.lookups = 0
+        self.lock = threading.Lock()
+
+    def _reserve(self) -> Optional[int]:
+        """
+        Reserve the estimated spend of one speculation, or return None if it would exceed the budget.
+        """
+        with self.lock:
+            estimate = self.token_estimate
+            if self.tokens_used + self.tokens_reserved + estimate > self.session_token_budget:
+                return None
+            self.tokens_reserved += estimate
+            return estimate
+
+    def _settle(self, future: Future, reserved: int):
+        """
+        Replace a speculation's reservation with its actual spend once it's done.
+        """
+        tokens = 0
+        if not future.cancelled():
+            if future.exception() is not None:
+                _count("failed")
+            else:
+                tokens = future.result()["tokens"]
+        with self.lock:
+            self.tokens_reserved -= reserved
+            self.tokens_used += tokens
+            if tokens:
+                self.max_tokens_seen = max(self.max_tokens_seen, tokens)
+                self.token_estimate = self.max_tokens_seen
+        _count("tokens_used", tokens)
+
+    def schedule(self, client, suggestions: list, previous_response_id: Optional[str], search_context: dict):
+        """
+        Discard the previous turn's speculations and start new ones for the displayed suggestions.
+        """
+        self.discard()
+        self.previous_response_id = previous_response_id
+        if get_breaker(ANSWER_OPERATION).state != CLOSED:
+            _count("skipped_degraded", len(suggestions))
+            return
+        for suggestion in suggestions:
+            if suggestion in self.speculations:
+                continue
+            reserved = self._reserve()
+            if reserved is None:
+                _count("skipped_budget")
+                continue
+            future = _submit(self.max_concurrency, speculate, client, suggestion, previous_response_id,
+                             dict(search_context))
+            if future is None:
+                with self.lock:
+                    self.tokens_reserved -= reserved
+                _count("skipped_backlog")
+                continue
+            future.add_done_callback(functools.partial(self._settle, reserved=reserved))
+            self.speculations[suggestion] = future
+            _count("scheduled")
+
+    def take(self, query: str, previous_response_id: Optional[str]) -> Optional[dict]:
+        """
+        Get the speculation for a submitted query, waiting for it up to the answer SLO if it's still running.
+        Returns None (a miss) if the query wasn't prefetched for this turn, or the speculation failed
+        or timed out. The other speculations of the turn are discarded.
+        """
+        self.lookups += 1
+        future = None
+        if previous_response_id == self.previous_response_id:
+            future = self.speculations.pop(query, None)
+        self.discard()
+
+        result: Optional[dict] = None
+        if future is not None:
+            try:
+                result = future.result(timeout=get_breaker(ANSWER_OPERATION).slo_seconds)
+            except FutureTimeoutError:
+                # Answered upstream instead; the speculation's result is wasted when it arrives
+                self._waste(future)
+            except Exception:
+                result = None
+        if result is None:
+            _count("misses")
+            return None
+        self.hits += 1
+        _count("hits")
+        return result
+
+    def discard(self):
+        """
+        Drop every outstanding speculation: unstarted ones are cancelled, the rest count as waste.
+        """
+        for future in self.speculations.values():
+            if future.cancel():
+                _count("cancelled")
+                continue
+            self._waste(future)
+        self.speculations = {}
+
+    @staticmethod
+    def _waste(future: Future):
+        _count("wasted")
+        future.add_done_callback(
+            lambda done: _count("tokens_wasted", done.result()["tokens"])
+            if not done.cancelled() and done.exception() is None else None
+        )
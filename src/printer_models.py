@@ -0,0 +1,34 @@
+import re
+from typing import Optional
+
+# ====== MODEL NOTES ======
+# One definition of a printer model name, shared by upload-time tagging
+# (scripts/file_attributes.py) and query-time filtering (search_filters.py),
+# so a file's model attribute and a query's model filter always agree.
+#
+# A model is a Zebra series prefix plus model number, or one of the numbered
+# Xi/SL/PAX lines: zd421t, zt610, zq630-plus, zt411plus, 105sl. Variant
+# suffixes (zd421t/zd421d, -plus, -rfid) are dropped, so every variant of a
+# printer shares one model value.
+# =========================
+
+_MODEL = (r"((?:zd|zt|zq|zc|zxp|zr|zm|ze|zs|zp|zx|gk|gx|gc|ql|qln|rw|tlp|lp|hc)\d{2,4}"
+          r"|\d{3}(?:xi\d?|sl|pax\d?))[a-z]{0,2}(?:-?plus|-rfid)?")
+MODEL_PATTERN = re.compile(rf"(?<![a-z0-9]){_MODEL}(?![a-z0-9])")
+_MODEL_NAME_PATTERN = re.compile(rf"{_MODEL}$")
+
+
+def normalize_model(name: str) -> Optional[str]:
+    """
+    The model value of a name that is exactly a model (e.g. a path segment), or None.
+    """
+    match = _MODEL_NAME_PATTERN.match(name.lower())
+    return match.group(1) if match else None
+
+
+def find_model(text: str) -> Optional[str]:
+    """
+    The model value of the first model named in free text, or None.
+    """
+    match = MODEL_PATTERN.search(text.lower())
+    return match.group(1) if match else None
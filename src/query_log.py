@@ -0,0 +1,217 @@
+import atexit
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Optional
+
+# ====== QUERY LOG NOTES ======
+# Records every chat turn (query, previous query, how it was answered and how
+# long it took) so scripts/mine_query_log.py can find the queries worth
+# caching, prefetching or routing. Logging is on when the query_log_dir
+# setting (or QUERY_LOG_DIR environment variable) is set.
+#
+# log_turn() only puts the record on a bounded in-memory queue and never
+# blocks: when the queue is full the record is dropped and counted. One
+# background thread drains the queue in batches into gzip-compressed JSONL
+# files named queries-<UTC time>-<pid>-<n>.jsonl.gz, sync-flushed every
+# FLUSH_SECONDS so readers see whole lines, and rotated once a file reaches
+# ROTATE_BYTES of uncompressed records or ROTATE_SECONDS of age.
+#
+# The mined statistics (the query_stats_path setting) feed back into the
+# dashboard: the displayed suggestions are prefetched in the order users
+# most often asked them after the current query, so a tight prefetch budget
+# goes to the likeliest next turn.
+# ==============================
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 500
+FLUSH_SECONDS = 5.0
+ROTATE_BYTES = 64 * 1024 * 1024
+ROTATE_SECONDS = 3600.0
+LOG_FILE_PREFIX = "queries-"
+LOG_FILE_SUFFIX = ".jsonl.gz"
+
+# Words that don't change what a query is about, left out of its cluster key
+CLUSTER_STOP_WORDS = {
+    "a", "an", "the", "my", "your", "i", "do", "does", "how", "what", "why", "when", "where", "which", "can",
+    "is", "are", "to", "of", "on", "in", "for", "with", "and", "or", "it", "this", "that", "me", "please",
+}
+
+
+def query_cluster_key(normalized_query: str) -> str:
+    """
+    Group queries that differ only in filler words or word order: the sorted, de-duplicated content words.
+    """
+    words = sorted({word for word in normalized_query.split() if word not in CLUSTER_STOP_WORDS})
+    return " ".join(words) or normalized_query
+
+
+class QueryLogger:
+    """
+    Buffered, non-blocking writer of turn records into rotating gzip JSONL files.
+    """
+
+    def __init__(self, log_dir: str, queue_size: int = QUEUE_SIZE, rotate_bytes: int = ROTATE_BYTES,
+                 rotate_seconds: float = ROTATE_SECONDS):
+        self.log_dir = log_dir
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.records: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.counts = {"logged": 0, "written": 0, "dropped": 0, "write_errors": 0, "files": 0}
+        self.counts_lock = threading.Lock()
+        self.file: Optional[gzip.GzipFile] = None
+        self.file_bytes = 0
+        self.file_opened_at = 0.0
+        self.stopped = threading.Event()
+        self.writer = threading.Thread(target=self._write_loop, name="query-log", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
+
+    def log_turn(self, record: dict):
+        """
+        Queue a turn record for writing. Never blocks; the record is dropped if the queue is full.
+        """
+        try:
+            self.records.put_nowait(record)
+            counter = "logged"
+        except queue.Full:
+            counter = "dropped"
+        with self.counts_lock:
+            self.counts[counter] += 1
+
+    def _open_file(self) -> gzip.GzipFile:
+        os.makedirs(self.log_dir, exist_ok=True)
+        with self.counts_lock:
+            file_number = self.counts["files"]
+        file_name = (f"{LOG_FILE_PREFIX}{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{os.getpid()}"
+                     f"-{file_number}{LOG_FILE_SUFFIX}")
+        self.file = gzip.GzipFile(os.path.join(self.log_dir, file_name), "wb")
+        self.file_bytes = 0
+        self.file_opened_at = time.monotonic()
+        with self.counts_lock:
+            self.counts["files"] += 1
+        return self.file
+
+    def _close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _write(self, batch: list[dict]):
+        if self.file is not None and (self.file_bytes >= self.rotate_bytes
+                                      or time.monotonic() - self.file_opened_at >= self.rotate_seconds):
+            self._close_file()
+        file = self.file if self.file is not None else self._open_file()
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode("utf-8")
+        file.write(data)
+        # A sync flush ends the compressed stream on a whole line so the file can be read while open
+        file.flush(zlib.Z_SYNC_FLUSH)
+        self.file_bytes += len(data)
+        with self.counts_lock:
+            self.counts["written"] += len(batch)
+
+    def _write_loop(self):
+        while not (self.stopped.is_set() and self.records.empty()):
+            batch = []
+            try:
+                batch.append(self.records.get(timeout=FLUSH_SECONDS))
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self.records.get_nowait())
+            except queue.Empty:
+                pass
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except OSError:
+                with self.counts_lock:
+                    self.counts["write_errors"] += 1
+                self._close_file()
+        self._close_file()
+
+    def close(self):
+        """
+        Write what's still queued and close the current file.
+        """
+        self.stopped.set()
+        self.writer.join(timeout=FLUSH_SECONDS * 2)
+
+    def metrics(self) -> dict:
+        with self.counts_lock:
+            return dict(self.counts, queued=self.records.qsize())
+
+
+_loggers: dict[str, QueryLogger] = {}
+_loggers_lock = threading.Lock()
+
+
+def get_query_logger(log_dir: str) -> Optional[QueryLogger]:
+    """
+    Get the process-wide logger writing to log_dir, or None if no directory is configured.
+    """
+    if not log_dir:
+        return None
+    with _loggers_lock:
+        if log_dir not in _loggers:
+            _loggers[log_dir] = QueryLogger(log_dir)
+        return _loggers[log_dir]
+
+
+def rank_queries(queries: list[str], stats: dict, previous_query: Optional[str] = None) -> list[str]:
+    """
+    Order normalized queries by how often users asked them right after previous_query, then overall.
+    Queries the statistics don't know keep their order, after the known ones.
+    """
+    followups = dict(stats["transitions"].get(previous_query, [])) if previous_query else {}
+    return sorted(queries, key=lambda query: (-followups.get(query, 0), -stats["top_queries"].get(query, 0)))
+
+
+# Loaded statistics, cached until the file's mtime changes
+_stats_cache: dict[str, tuple[int, dict]] = {}
+
+
+def get_query_stats(stats_path: str) -> dict:
+    """
+    The statistics of load_query_stats for stats_path, reloaded when the file changes.
+    Returns empty statistics if no path is configured or the file is missing.
+    """
+    try:
+        mtime = os.stat(stats_path).st_mtime_ns if stats_path else None
+    except OSError:
+        mtime = None
+    if mtime is None:
+        return load_query_stats("")
+
+    cached = _stats_cache.get(stats_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    stats = load_query_stats(stats_path)
+    _stats_cache[stats_path] = (mtime, stats)
+    return stats
+
+
+def load_query_stats(stats_path: str) -> dict:
+    """
+    Load the statistics written by scripts/mine_query_log.py, keyed for lookups:
+    top_queries {query: count}, transitions {query: [(next query, count), ...]} and
+    clusters {cluster key: latency stats}. Returns empty statistics if the file is missing or invalid.
+    """
+    try:
+        with open(stats_path, "r", encoding="utf-8") as stats_file:
+            stats = json.load(stats_file)
+        transitions: dict[str, list] = {}
+        for previous_query, query, count in stats["transitions"]:
+            transitions.setdefault(previous_query, []).append((query, count))
+        return {
+            "top_queries": {query: count for query, count in stats["top_queries"]},
+            "transitions": transitions,
+            "clusters": {
+                cluster: dict(zip(stats["cluster_fields"], values)) for cluster, *values in stats["clusters"]
+            },
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {"top_queries": {}, "transitions": {}, "clusters": {}}
@@ -0,0 +1,232 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import nullcontext
+from typing import Optional
+
+# ====== RERUN PROFILER NOTES ======
+# Opt-in sampling profiler for the dashboard script itself (session state
+# setup, transcript rendering, the bottom widget tree), not the upstream calls.
+# A rerun is profiled when the dashboard_profile setting (or DASHBOARD_PROFILE
+# environment variable) is on, or the page is opened with ?profile=1.
+#
+# While any rerun is profiled, one background thread samples the stacks of the
+# profiled script threads every SAMPLE_INTERVAL_SECONDS. Samples are folded into
+# "rerun;<phase>;<frame>;<frame> <count>" lines, aggregated over every session
+# of the process, and written to the output path for flamegraph.pl/speedscope.
+# Per-phase wall times go to a JSON summary next to it.
+#
+# When profiling is off, start_rerun() only checks the setting and the query
+# parameter and profile_phase() hands back a shared no-op context manager.
+# ==================================
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+FLUSH_SECONDS = 10.0
+RECENT_RERUNS = 200                 # Reruns kept for the phase percentiles
+TOP_FUNCTIONS = 25
+PROFILE_QUERY_PARAM = "profile"
+
+_NO_PHASE = nullcontext()
+_lock = threading.Lock()
+_active: dict[int, dict] = {}       # Script thread ID -> current rerun
+_folded: Counter = Counter()
+_self_samples: Counter = Counter()
+_phase_seconds: dict[str, deque] = defaultdict(lambda: deque(maxlen=RECENT_RERUNS))
+_totals = {"reruns": 0, "interrupted_reruns": 0, "samples": 0}
+_sessions: set = set()
+_output_path: Optional[str] = None
+_flushed_at = 0.0
+_sampler: Optional[threading.Thread] = None
+_wake = threading.Event()
+
+
+def _frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _fold(frame, script_path: str) -> Optional[list[str]]:
+    """
+    The frames from the dashboard script's module frame down to the sampled frame, or None if the
+    thread isn't inside the script (e.g. between reruns).
+    """
+    stack = []
+    while frame is not None:
+        stack.append(frame.f_code)
+        frame = frame.f_back
+    stack.reverse()
+    for index, code in enumerate(stack):
+        if code.co_filename == script_path:
+            return [_frame_name(code) for code in stack[index:]]
+    return None
+
+
+def _sample_loop():
+    while True:
+        _wake.wait()
+        with _lock:
+            runs = dict(_active)
+            if not runs:
+                _wake.clear()
+        if not runs:
+            continue
+        frames = sys._current_frames()
+        with _lock:
+            for thread_id, run in runs.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    # The script thread exited without finishing its rerun
+                    if _active.pop(thread_id, None) is not None:
+                        _finish(run, interrupted=True)
+                    continue
+                stack = _fold(frame, run["script_path"])
+                if not stack:
+                    continue
+                _folded[";".join(["rerun", run["phase"]] + stack)] += 1
+                _self_samples[stack[-1]] += 1
+                _totals["samples"] += 1
+        del frames
+        time.sleep(SAMPLE_INTERVAL_SECONDS)
+
+
+def _finish(run: dict, interrupted: bool):
+    now = time.perf_counter()
+    if run["phase_started"] is not None:
+        run["phases"][run["phase"]] = run["phases"].get(run["phase"], 0.0) + now - run["phase_started"]
+    run["phases"]["total"] = now - run["started"]
+    for phase, seconds in run["phases"].items():
+        _phase_seconds[phase].append(seconds)
+    _totals["reruns"] += 1
+    _totals["interrupted_reruns"] += 1 if interrupted else 0
+
+
+def start_rerun(script_path: str, enabled: bool, output_path: str, query_params=None) -> bool:
+    """
+    Start profiling this rerun if profiling is enabled or requested with ?profile=1.
+    An unfinished previous rerun on this thread (st.rerun(), an exception) is closed first.
+    """
+    thread_id = threading.get_ident()
+    with _lock:
+        stale = _active.pop(thread_id, None)
+        if stale is not None:
+            _finish(stale, interrupted=True)
+
+    requested = query_params is not None and str(query_params.get(PROFILE_QUERY_PARAM, "")).lower() in ("1", "true", "on")
+    if not (enabled or requested):
+        return False
+
+    global _sampler, _output_path
+    with _lock:
+        _output_path = output_path
+        _active[thread_id] = {
+            "script_path": script_path,
+            "phase": "script",
+            "phase_started": None,
+            "phases": {},
+            "started": time.perf_counter()
+        }
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="rerun-profiler", daemon=True)
+            _sampler.start()
+            atexit.register(write_profile)
+        _wake.set()
+    return True
+
+
+class _Phase:
+    def __init__(self, run: dict, name: str):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        with _lock:
+            self.outer = (self.run["phase"], self.run["phase_started"])
+            self.run["phase"] = self.name
+            self.run["phase_started"] = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        with _lock:
+            self.run["phases"][self.name] = (self.run["phases"].get(self.name, 0.0)
+                                             + time.perf_counter() - self.run["phase_started"])
+            self.run["phase"], self.run["phase_started"] = self.outer
+        return False
+
+
+def profile_phase(name: str):
+    """
+    Attribute the samples and wall time of a block of the script to a named phase.
+    """
+    run = _active.get(threading.get_ident())
+    return _Phase(run, name) if run is not None else _NO_PHASE
+
+
+def finish_rerun(session_id: str):
+    """
+    Close this thread's profiled rerun and write the aggregate every FLUSH_SECONDS.
+    """
+    with _lock:
+        run = _active.pop(threading.get_ident(), None)
+        if run is None:
+            return
+        _finish(run, interrupted=False)
+        _sessions.add(session_id)
+        due = time.monotonic() - _flushed_at >= FLUSH_SECONDS
+    if due:
+        write_profile()
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def get_profile_summary() -> dict:
+    """
+    Rerun counts, per-phase wall time percentiles and the functions with the most self samples.
+    """
+    with _lock:
+        phases = {phase: list(seconds) for phase, seconds in _phase_seconds.items() if seconds}
+        return dict(
+            _totals,
+            sessions=len(_sessions),
+            sample_interval_seconds=SAMPLE_INTERVAL_SECONDS,
+            phases={
+                phase: {
+                    "reruns": len(seconds),
+                    "mean_seconds": sum(seconds) / len(seconds),
+                    "p50_seconds": _percentile(seconds, 0.5),
+                    "p95_seconds": _percentile(seconds, 0.95)
+                }
+                for phase, seconds in phases.items()
+            },
+            top_functions=[
+                {"function": name, "self_samples": count, "self_seconds": count * SAMPLE_INTERVAL_SECONDS}
+                for name, count in _self_samples.most_common(TOP_FUNCTIONS)
+            ]
+        )
+
+
+def write_profile():
+    """
+    Write the folded stacks to the output path and the summary to <output path>.json, atomically.
+    """
+    global _flushed_at
+    with _lock:
+        path = _output_path
+        folded = sorted(_folded.items(), key=lambda item: -item[1])
+        _flushed_at = time.monotonic()
+    if not path:
+        return
+    summary = get_profile_summary()
+    for target, content in ((path, "".join(f"{stack} {count}\n" for stack, count in folded)),
+                            (path + ".json", json.dumps(summary, indent=2))):
+        temporary_path = f"{target}.tmp.{os.getpid()}"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as output_file:
+                output_file.write(content)
+            os.replace(temporary_path, target)
+        except OSError:
+            pass
@@ -0,0 +1,66 @@
+from typing import Optional
+
+from printer_models import find_model
+
+# Attribute values written by scripts/file_attributes.py at upload time; both sides
+# take model names from printer_models.py. Files whose model or product couldn't be
+# derived carry "", so every filter below also accepts "" and general documents stay
+# searchable when a query names a model.
+PRODUCT_KEYWORDS = {
+    "desktop": "desktop", "industrial": "industrial", "mobile": "mobile", "card printer": "card",
+    "kiosk": "kiosk", "rfid": "rfid", "print engine": "print-engine", "healthcare": "healthcare"
+}
+FILTERED_KEYS = ("model", "product", "language")
+
+
+def update_search_context(query: str, search_context: dict) -> dict:
+    """
+    Record the model or product family named in the query in the session's search context.
+    A query naming either replaces both, so switching printers never combines two of them;
+    queries naming neither keep the earlier ones, so follow-up questions stay narrowed.
+    """
+    text = query.lower()
+    named = {}
+    model = find_model(text)
+    if model:
+        # The model implies its family; a family keyword next to it ("zd421 rfid") is usually a feature
+        named["model"] = model
+    else:
+        for keyword, product in PRODUCT_KEYWORDS.items():
+            if keyword in text:
+                named["product"] = product
+                break
+    if named:
+        search_context.pop("model", None)
+        search_context.pop("product", None)
+        search_context.update(named)
+    return search_context
+
+
+def build_file_search_filters(search_context: dict) -> Optional[dict]:
+    """
+    Build a file_search attribute filter from the search context, or None if there is nothing to filter on.
+    Each attribute matches its value or "" (files that don't carry the attribute).
+    """
+    filters = [
+        {
+            "type": "or",
+            "filters": [
+                {"type": "eq", "key": key, "value": search_context[key]},
+                {"type": "eq", "key": key, "value": ""}
+            ]
+        }
+        for key in FILTERED_KEYS if search_context.get(key)
+    ]
+    if not filters:
+        return None
+    if len(filters) == 1:
+        return filters[0]
+    return {"type": "and", "filters": filters}
+
+
+def derive_search_filters(query: str, search_context: dict) -> Optional[dict]:
+    """
+    Update the session's search context from the query and build the matching file_search filter.
+    """
+    return build_file_search_filters(update_search_context(query, search_context))